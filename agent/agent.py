@@ -6,15 +6,20 @@ with AI models, handling tool calls, and coordinating between different
 components of the system.
 """
 
-from typing import Dict, List, Any, Callable
+from typing import Dict, List, Any, Callable, Optional
 from utils.pretty_print import pretty_print_conversation
 from utils.chat_utils import chat_completion_request
 from agent.types import AgentResponseEventData, ToolCallResponseEventData, AgentFinishedEventData, ToolCallErrorEventData, AgentCallErrorEventData
 from tools.call_tool import call_tool
+from utils.tracing import span
+from agent.stopping import SessionMonitor
+from utils.journal import SessionJournal, is_finished, pending_tool_calls
 from agent.publishers import publish_agent_response, publish_tool_call_response, publish_tool_call_error, publish_agent_call_error, publish_agent_finished
 
 
-def start_agent(prompt: str, system_prompt: str, tools_schema: List[Dict], tools_map: Dict, plan: bool = False) -> str:
+def start_agent(prompt: str, system_prompt: str, tools_schema: List[Dict], tools_map: Dict, plan: bool = False,
+                monitor: Optional[SessionMonitor] = None, journal: Optional[SessionJournal] = None,
+                messages: Optional[List[Dict]] = None) -> str:
     """
     Run a conversation with the AI agent using the provided prompts and tools.
     
@@ -24,17 +29,43 @@ def start_agent(prompt: str, system_prompt: str, tools_schema: List[Dict], tools
         tools_schema (List[Dict]): OpenAI function calling schema for available tools
         tools_map (Dict): Dictionary mapping tool names to actual Python functions
         plan (bool, optional): Whether to ask the agent to plan first. Defaults to False.
+        monitor (SessionMonitor, optional): Ends the session early once its stopping
+            policy is met, checked after each tool batch
+        journal (SessionJournal, optional): Write-ahead journal every message is recorded in
+        messages (List[Dict], optional): Conversation restored from a journal, continued
+            instead of starting a new one
     
     Returns:
         str: The final response from the agent
     """
-    messages = create_initial_messages(system_prompt, prompt, tools_schema, plan)
+    resuming = messages is not None
+    if not resuming:
+        messages = create_initial_messages(system_prompt, prompt, tools_schema, plan)
 
     # Print initial messages
     for message in messages:
         pretty_print_conversation(message)
+    if journal:
+        journal.sync(messages)
+
+    if resuming:
+        if is_finished(messages):
+            return
+        # Finish the tool calls of a turn that was interrupted, then carry on from its results
+        pending = pending_tool_calls(messages)
+        if pending:
+            _run_tool_calls(pending, messages, tools_map, tools_schema, journal)
+        if messages[-1].get("role") == "tool":
+            publish_tool_call_response(ToolCallResponseEventData(
+                messages=messages,
+                tools_map=tools_map,
+                tools_schema=tools_schema,
+                monitor=monitor,
+                journal=journal
+            ))
+            return
 
-    send_messages_to_agent(messages, tools_schema, tools_map)
+    send_messages_to_agent(messages, tools_schema, tools_map, monitor, journal)
 
 
 def create_initial_messages(system_prompt: str, prompt: str, tools_schema: List[Dict], tools_map: Dict, plan: bool = False) -> List[Dict]:
@@ -67,31 +98,71 @@ def create_initial_messages(system_prompt: str, prompt: str, tools_schema: List[
 def send_messages_to_agent(
     messages: List[Dict[str, str]], 
     tools_schema: List[Dict], 
-    tools_map: Dict[str, Callable[..., Any]]
+    tools_map: Dict[str, Callable[..., Any]],
+    monitor: Optional[SessionMonitor] = None,
+    journal: Optional[SessionJournal] = None
 ) -> None:
 
-    chat_response = chat_completion_request(messages, tool_choice=None, tools=tools_schema)
-    
-    if isinstance(chat_response, Exception):
-        print("Failed to get a valid response:", chat_response)
-        return
+    with span("agent.turn") as turn_span:
+        chat_response = chat_completion_request(messages, tool_choice=None, tools=tools_schema)
         
-    # Process the response
-    current_choice = chat_response.choices[0]
-    assistant_message = {
-        "role": "assistant",
-        "content": current_choice.message.content,
-        "tool_calls": current_choice.message.tool_calls
-    }
-    messages.append(assistant_message)
+        if isinstance(chat_response, Exception):
+            print("Failed to get a valid response:", chat_response)
+            return
+        if monitor:
+            monitor.record_response(chat_response)
+            
+        # Process the response
+        current_choice = chat_response.choices[0]
+        assistant_message = {
+            "role": "assistant",
+            "content": current_choice.message.content,
+            "tool_calls": current_choice.message.tool_calls
+        }
+        messages.append(assistant_message)
+        if journal:
+            journal.sync(messages)
+        turn_span.set_attributes({"agent.finish_reason": current_choice.finish_reason,
+                                  "agent.tool_calls": len(current_choice.message.tool_calls or [])})
+
+    # Published after the turn span closes; the tool calls run when the event is dispatched
     publish_agent_response(AgentResponseEventData(
         chat_response=chat_response,
         messages=messages,
         tools_map=tools_map,
-        tools_schema=tools_schema
+        tools_schema=tools_schema,
+        monitor=monitor,
+        journal=journal
     ))
 
 
+def stop_if_done(event_data: ToolCallResponseEventData) -> bool:
+    """
+    Finish the session if its stopping policy is met, without another model call.
+    
+    Args:
+        event_data (ToolCallResponseEventData): The conversation after a tool batch
+    
+    Returns:
+        bool: True if the session was finished
+    """
+    if not event_data.monitor:
+        return False
+    reason = event_data.monitor.stop_reason()
+    if reason is None:
+        return False
+
+    event_data.messages.append({"role": "assistant", "content": f"Stopping: {reason}."})
+    if event_data.journal:
+        event_data.journal.sync(event_data.messages)
+        event_data.journal.finish(reason)
+    publish_agent_finished(AgentFinishedEventData(
+        messages=event_data.messages,
+        stop_reason=reason
+    ))
+    return True
+
+
 def process_agent_response(event_data: AgentResponseEventData):
     # Handle tool calls if any
 
@@ -105,6 +176,8 @@ def process_agent_response(event_data: AgentResponseEventData):
 
     # Check if conversation should end
     if current_choice.finish_reason == "stop":
+        if event_data.journal:
+            event_data.journal.finish()
         publish_agent_finished(AgentFinishedEventData(
             messages=event_data.messages
         ))
@@ -119,14 +192,28 @@ def process_agent_response(event_data: AgentResponseEventData):
 def _call_chosen_tools(event_data: AgentResponseEventData):
 
     current_choice = event_data.chat_response.choices[0]
+    _run_tool_calls(current_choice.message.tool_calls, event_data.messages, event_data.tools_map,
+                    event_data.tools_schema, event_data.journal)
+
+    publish_tool_call_response(ToolCallResponseEventData(
+        messages=event_data.messages,
+        tools_map=event_data.tools_map,
+        tools_schema=event_data.tools_schema,
+        monitor=event_data.monitor,
+        journal=event_data.journal
+    ))
+    return
+
+
+def _run_tool_calls(tool_calls: List[Any], messages: List[Dict], tools_map: Dict[str, Callable[..., Any]],
+                    tools_schema: List[Dict], journal: Optional[SessionJournal] = None):
 
-    tool_calls = current_choice.message.tool_calls
     for tool_call in tool_calls:
         function = tool_call.function
         try:
 
-            tool_message = call_tool(event_data.tools_map, tool_call)
-            event_data.messages.append(tool_message)
+            tool_message = call_tool(tools_map, tool_call)
+            messages.append(tool_message)
             
         except Exception as e:
             print(f"Tool call failed: {str(e)}")
@@ -136,17 +223,13 @@ def _call_chosen_tools(event_data: AgentResponseEventData):
                 "name": function.name,
                 "content": f"Error: {str(e)}"
             }
-            event_data.messages.append(error_message)
+            messages.append(error_message)
             publish_tool_call_error(ToolCallErrorEventData(
-                messages=event_data.messages,
-                tools_map=event_data.tools_map,
-                tools_schema=event_data.tools_schema,
+                messages=messages,
+                tools_map=tools_map,
+                tools_schema=tools_schema,
                 error=e
             ))
-
-    publish_tool_call_response(ToolCallResponseEventData(
-        messages=event_data.messages,
-        tools_map=event_data.tools_map,
-        tools_schema=event_data.tools_schema
-    ))
-    return
\ No newline at end of file
+        # Each result is journaled as soon as it exists, so a resume never repeats a finished tool call
+        if journal:
+            journal.sync(messages)
@@ -0,0 +1,197 @@
+"""
+Asyncio variant of the AI agent loop.
+
+This module mirrors agent.agent but drives the conversation with an
+AsyncOpenAI client and runs the tool calls of a single assistant turn
+concurrently, bounded by a configurable limit.
+"""
+
+import asyncio
+from typing import Dict, List, Any, Callable, Optional
+from utils.pretty_print import pretty_print_conversation
+from utils.chat_utils import async_chat_completion_request, memory_optimise
+from agent.types import AgentFinishedEventData, ToolCallErrorEventData, AgentCallErrorEventData
+from tools.call_tool import call_tool
+from agent.publishers import publish_tool_call_error, publish_agent_call_error, publish_agent_finished
+from utils.tracing import span
+from agent.stopping import SessionMonitor
+from utils.journal import SessionJournal, is_finished, order_tool_results, pending_tool_calls
+
+DEFAULT_MAX_CONCURRENT_TOOLS = 5
+
+
+async def start_agent_async(prompt: str, system_prompt: str, tools_schema: List[Dict], tools_map: Dict,
+                            plan: bool = False, max_concurrent_tools: int = DEFAULT_MAX_CONCURRENT_TOOLS,
+                            monitor: Optional[SessionMonitor] = None, journal: Optional[SessionJournal] = None,
+                            messages: Optional[List[Dict]] = None) -> Optional[str]:
+    """
+    Run a conversation with the AI agent, executing each turn's tool calls concurrently.
+
+    Args:
+        prompt (str): The user's prompt to the agent
+        system_prompt (str): The system instructions for the agent
+        tools_schema (List[Dict]): OpenAI function calling schema for available tools
+        tools_map (Dict): Dictionary mapping tool names to actual Python functions
+        plan (bool, optional): Whether to ask the agent to plan first. Defaults to False.
+        max_concurrent_tools (int, optional): Maximum number of tool calls executed at once
+        monitor (SessionMonitor, optional): Ends the session early once its stopping
+            policy is met, checked after each tool batch
+        journal (SessionJournal, optional): Write-ahead journal every message is recorded in
+        messages (List[Dict], optional): Conversation restored from a journal, continued
+            instead of starting a new one
+
+    Returns:
+        Optional[str]: The final response from the agent
+    """
+    resuming = messages is not None
+    if not resuming:
+        messages = await create_initial_messages_async(system_prompt, prompt, tools_schema, tools_map, plan)
+
+    # Print initial messages
+    for message in messages:
+        pretty_print_conversation(message)
+    if journal:
+        journal.sync(messages)
+
+    semaphore = asyncio.Semaphore(max_concurrent_tools)
+
+    if resuming:
+        if is_finished(messages):
+            return messages[-1].get("content")
+        # Finish the tool calls of a turn that was interrupted, then carry on from its results
+        pending = pending_tool_calls(messages)
+        if pending:
+            await _call_chosen_tools_async(messages, pending, tools_schema, tools_map, semaphore, journal)
+
+    while True:
+        if messages[-1].get("role") == "tool":
+            reason = monitor.stop_reason() if monitor else None
+            if reason is not None:
+                messages.append({"role": "assistant", "content": f"Stopping: {reason}."})
+                if journal:
+                    journal.sync(messages)
+                    journal.finish(reason)
+                publish_agent_finished(AgentFinishedEventData(
+                    messages=messages,
+                    stop_reason=reason
+                ))
+                return messages[-1]["content"]
+            # memory_optimise may call the summarisation model synchronously
+            messages = await asyncio.to_thread(memory_optimise, messages)
+            if journal:
+                journal.sync(messages)
+
+        with span("agent.turn") as turn_span:
+            chat_response = await async_chat_completion_request(messages, tool_choice=None, tools=tools_schema)
+            if monitor:
+                monitor.record_response(chat_response)
+
+            current_choice = chat_response.choices[0]
+            assistant_message = {
+                "role": "assistant",
+                "content": current_choice.message.content,
+                "tool_calls": current_choice.message.tool_calls
+            }
+            messages.append(assistant_message)
+            if journal:
+                journal.sync(messages)
+            pretty_print_conversation(assistant_message)
+            turn_span.set_attributes({"agent.finish_reason": current_choice.finish_reason,
+                                      "agent.tool_calls": len(current_choice.message.tool_calls or [])})
+
+            if current_choice.finish_reason == "stop":
+                if journal:
+                    journal.finish()
+                publish_agent_finished(AgentFinishedEventData(
+                    messages=messages
+                ))
+                return current_choice.message.content
+
+            elif current_choice.finish_reason == "tool_calls":
+                await _call_chosen_tools_async(messages, current_choice.message.tool_calls,
+                                               tools_schema, tools_map, semaphore, journal)
+                pretty_print_conversation(messages[-1])
+            else:
+                raise ValueError(f"Invalid finish reason: {current_choice.finish_reason}")
+
+
+async def create_initial_messages_async(system_prompt: str, prompt: str, tools_schema: List[Dict],
+                                        tools_map: Dict, plan: bool = False) -> List[Dict]:
+    messages = []
+    if plan:
+        planning_prompt = f"{system_prompt} {prompt} Let's think step by step, make a plan first"
+        messages.append({"role": "user", "content": planning_prompt})
+
+        # Get initial plan
+        try:
+            chat_response = await async_chat_completion_request(messages, tool_choice="none", tools=tools_schema)
+        except Exception as e:
+            publish_agent_call_error(AgentCallErrorEventData(
+                messages=messages,
+                tools_map=tools_map,
+                tools_schema=tools_schema,
+                error=e
+            ))
+            raise
+
+        plan_content = chat_response.choices[0].message.content
+        messages = [
+            {"role": "user", "content": f"{system_prompt} {prompt}"},
+            {"role": "assistant", "content": plan_content}
+        ]
+    else:
+        messages.append({"role": "user", "content": f"{system_prompt} {prompt}"})
+    return messages
+
+
+async def _call_chosen_tools_async(
+    messages: List[Dict],
+    tool_calls: List[Any],
+    tools_schema: List[Dict],
+    tools_map: Dict[str, Callable[..., Any]],
+    semaphore: asyncio.Semaphore,
+    journal: Optional[SessionJournal] = None
+) -> None:
+    """
+    Execute all tool calls of one assistant turn concurrently.
+
+    Tool functions are synchronous, so each call runs in a worker thread. Each
+    result is journaled as soon as its call finishes, so a crash loses no finished
+    call; the conversation gets the results in tool call order, including after
+    results restored from a journal.
+    """
+
+    async def run_one(tool_call):
+        async with semaphore:
+            try:
+                result = await asyncio.to_thread(call_tool, tools_map, tool_call), None
+            except Exception as e:
+                print(f"Tool call failed: {str(e)}")
+                error_message = {
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "name": tool_call.function.name,
+                    "content": f"Error: {str(e)}"
+                }
+                result = error_message, e
+            if journal:
+                journal.record_tool_result(result[0])
+            return result
+
+    results = await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls))
+
+    errors = []
+    for tool_message, error in results:
+        messages.append(tool_message)
+        if error is not None:
+            errors.append(error)
+    # Only reorders when resuming a turn some of whose calls had already finished
+    order_tool_results(messages)
+
+    for error in errors:
+        publish_tool_call_error(ToolCallErrorEventData(
+            messages=messages,
+            tools_map=tools_map,
+            tools_schema=tools_schema,
+            error=error
+        ))
@@ -1,13 +1,18 @@
 from agent.types import ToolCallResponseEventData, ToolCallErrorEventData, AgentFinishedEventData, AgentResponseEventData, AgentCallErrorEventData
-from agent.agent import send_messages_to_agent, process_agent_response
+from agent.agent import send_messages_to_agent, process_agent_response, stop_if_done
 from utils.chat_utils import memory_optimise
 from event import subscribe
 from utils.pretty_print import pretty_print_conversation
 
 def handle_tool_call_response(event_data: ToolCallResponseEventData):
     pretty_print_conversation(event_data.messages[-1])
+    if stop_if_done(event_data):
+        return
     messages = memory_optimise(event_data.messages)
-    send_messages_to_agent(messages, event_data.tools_schema, event_data.tools_map)
+    if event_data.journal:
+        event_data.journal.sync(messages)
+    send_messages_to_agent(messages, event_data.tools_schema, event_data.tools_map, event_data.monitor,
+                           event_data.journal)
 
 def handle_agent_response(event_data: AgentResponseEventData):
     pretty_print_conversation(event_data.messages[-1])
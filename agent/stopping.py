@@ -0,0 +1,164 @@
+"""
+Stopping policies for agent sessions.
+
+The agent loop normally runs until the model answers without tool calls. A
+SessionMonitor lets it stop earlier: as soon as every data point has a value
+that is good enough (by default any value, or one whose confidence meets a
+per data point threshold; a value without a confidence does not, unless the
+policy accepts them), or when the session exceeds a turn, token or wall
+time budget. The monitor is checked after each tool batch, before the
+conversation is sent back to the model. Defaults come from
+config/stopping_policy.json.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+stopping_policy = None
+_stopping_policy_lock = threading.Lock()
+
+
+def get_stopping_policy():
+    """
+    Get the shared stopping policy, creating it from config/stopping_policy.json on first use.
+
+    Returns:
+        StoppingPolicy: The policy
+    """
+    global stopping_policy
+    if stopping_policy is None:
+        with _stopping_policy_lock:
+            if stopping_policy is None:
+                stopping_policy = StoppingPolicy.from_config()
+    return stopping_policy
+
+
+def set_stopping_policy(policy):
+    """
+    Replace the shared stopping policy.
+
+    Args:
+        policy (StoppingPolicy): The policy to use
+    """
+    global stopping_policy
+    stopping_policy = policy
+
+
+@dataclass
+class StoppingPolicy:
+    stop_when_complete: bool = True
+    max_turns: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_wall_time: Optional[float] = None
+    # Minimum confidence for a value to count as found; None accepts any value
+    default_confidence_threshold: Optional[float] = None
+    confidence_thresholds: Dict[str, float] = field(default_factory=dict)
+    # Whether a value given without a confidence meets a threshold
+    accept_missing_confidence: bool = False
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a policy from config/stopping_policy.json.
+
+        Returns:
+            StoppingPolicy: The configured policy, or the defaults if unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'stopping_policy.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in stopping policy configuration: {e}")
+
+        return cls(
+            stop_when_complete=config.get("stop_when_complete", True),
+            max_turns=config.get("max_turns"),
+            max_tokens=config.get("max_tokens"),
+            max_wall_time=config.get("max_wall_time_seconds"),
+            default_confidence_threshold=config.get("default_confidence_threshold"),
+            confidence_thresholds=config.get("confidence_thresholds", {}),
+            accept_missing_confidence=config.get("accept_missing_confidence", False)
+        )
+
+    def threshold_for(self, name: str) -> Optional[float]:
+        return self.confidence_thresholds.get(name, self.default_confidence_threshold)
+
+
+class SessionMonitor:
+    def __init__(self, policy: StoppingPolicy, data_point_manager=None):
+        """
+        Track a session's usage against a stopping policy.
+
+        Args:
+            policy (StoppingPolicy): The limits to enforce
+            data_point_manager (DataPointManager, optional): Session state checked for
+                completeness; without it the session only stops on its budgets
+        """
+        self.policy = policy
+        self.data_point_manager = data_point_manager
+        self.turns = 0
+        self.tokens = 0
+        self.started = time.monotonic()
+
+    def record_response(self, chat_response) -> None:
+        """
+        Count a model turn and its token usage.
+
+        Args:
+            chat_response: The chat completion response of the turn
+        """
+        self.turns += 1
+        usage = getattr(chat_response, "usage", None)
+        if usage is not None:
+            self.tokens += usage.total_tokens or 0
+
+    def unsatisfied_data_points(self):
+        """
+        Get the data points that are missing or whose confidence is below their threshold.
+
+        Returns:
+            List[str]: Names of data points that are not good enough yet
+        """
+        manager = self.data_point_manager
+        unsatisfied = manager.get_missing_data_points()
+        if self.policy.default_confidence_threshold is None and not self.policy.confidence_thresholds:
+            return unsatisfied
+
+        for point in manager.get_current_state():
+            name = point["name"]
+            threshold = self.policy.threshold_for(name)
+            if point["value"] is None or threshold is None or name in unsatisfied:
+                continue
+            confidence = manager.get_confidence(name)
+            if confidence is None:
+                if not self.policy.accept_missing_confidence:
+                    unsatisfied.append(name)
+            elif confidence < threshold:
+                unsatisfied.append(name)
+        return unsatisfied
+
+    def stop_reason(self) -> Optional[str]:
+        """
+        Check whether the session should finish now.
+
+        Returns:
+            Optional[str]: Why the session should stop, or None to continue
+        """
+        policy = self.policy
+        if policy.stop_when_complete and self.data_point_manager is not None \
+                and not self.unsatisfied_data_points():
+            return "all data points found"
+        if policy.max_turns is not None and self.turns >= policy.max_turns:
+            return f"reached the limit of {policy.max_turns} turns"
+        if policy.max_tokens is not None and self.tokens >= policy.max_tokens:
+            return f"reached the limit of {policy.max_tokens} tokens"
+        if policy.max_wall_time is not None and time.monotonic() - self.started >= policy.max_wall_time:
+            return f"reached the time limit of {policy.max_wall_time} seconds"
+        return None
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 @dataclass
 class ResponseEventData:
@@ -7,6 +7,8 @@ class ResponseEventData:
     tools_map: Dict
     tools_schema: List[Dict]
     chat_response: Optional[Dict] = None  # Optional since tool responses don't have this
+    monitor: Optional[Any] = None  # SessionMonitor deciding when to stop early
+    journal: Optional[Any] = None  # SessionJournal recording the conversation
 
 @dataclass
 class LlmErrorEventData:
@@ -34,3 +36,4 @@ class AgentCallErrorEventData(LlmErrorEventData):
 @dataclass
 class AgentFinishedEventData:
     messages: List[Dict]
+    stop_reason: Optional[str] = None  # Set when a stopping policy ended the session
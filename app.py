@@ -1,46 +1,63 @@
-from openai import OpenAI
+import asyncio
+import os
+from typing import Union
 from dotenv import load_dotenv
 from utils.prompt_loader import load_prompt
 from utils.chat_utils import set_client_and_model
-from tools.load import load_tool_schemas
-from tools import scrape, search, update_data
+from utils.llm_transport import create_transport_clients
+from utils.tracing import span
+from tools.registry import get_tool_registry
 from agent.handlers import setup_event_handlers as setup_agent_event_handlers
 from agent.agent import start_agent
-from data_point_manager import get_data_point_manager
+from agent.async_agent import start_agent_async
+from agent.stopping import SessionMonitor, get_stopping_policy
+from utils.journal import SessionJournal
+from data_point_manager import DataPointManager, get_data_point_manager
 
 load_dotenv()
 
 
-def _execute_scraping_agent(entity_name: str, tool_names: list, system_prompt_key: str, 
-                           user_prompt_key: str, dynamic_prompt_inserts: dict = None):
+def _execute_scraping_agent(entity_name: str, tool_names: Union[list, str], system_prompt_key: str, 
+                           user_prompt_key: str, dynamic_prompt_inserts: dict = None,
+                           max_concurrent_tools: int = None, data_point_manager: DataPointManager = None,
+                           journal: SessionJournal = None):
     """
     Common function to execute scraping agents with different configurations.
     
     Args:
         entity_name (str): Name of the entity to search for
-        tool_names (list): List of tool names to load schemas for
+        tool_names (list): List of tool names, or a tool set name
         system_prompt_key (str): Key for the system prompt file
         user_prompt_key (str): Key for the user prompt file
         dynamic_prompt_inserts (dict): Additional replacements for user prompt
+        max_concurrent_tools (int, optional): If set, run the async agent loop with
+            up to this many tool calls executing concurrently
+        data_point_manager (DataPointManager, optional): Session state for this entity,
+            defaults to the global data point manager
+        journal (SessionJournal, optional): Write-ahead journal of the session; if it holds
+            an earlier, unfinished run of the session, that run is resumed
     
     Returns:
         str: Response from the agent with found information
     """
-    # Load tool schemas from JSON files
-    tool_schemas = load_tool_schemas(tool_names)
+    # Tool schemas are generated once from the tool functions and cached
+    tool_registry = get_tool_registry()
+    tool_schemas = tool_registry.schemas(tool_names)
     
-    # Available tool functions
-    available_tools = {
-        "search": search,
-        "scrape": scrape,
-        "update_data": update_data
-    }
-    
-    # Map only the requested tool names to actual functions
-    tools_map = {name: available_tools[name] for name in tool_names}
+    data_point_manager = data_point_manager or get_data_point_manager()
+    data_point_manager.entity_name = entity_name
+    data_point_manager.start_conversation()
+
+    # Replay an earlier run of this session before deciding what is still missing
+    resume_messages = journal.restore(data_point_manager) if journal else None
+    if journal and journal.finished:
+        return "Session already finished"
+
+    # Map only the requested tool names to actual functions, bound to this session's state
+    tools_map = tool_registry.tools_map(tool_names, data_point_manager=data_point_manager)
     
     # Get data points we still need to find
-    data_keys_to_search = get_data_point_manager().get_missing_data_points()
+    data_keys_to_search = data_point_manager.get_missing_data_points()
     
     if len(data_keys_to_search) > 0:
         # Load prompts from files
@@ -49,7 +66,7 @@ def _execute_scraping_agent(entity_name: str, tool_names: list, system_prompt_ke
         # Base replacements
         user_prompt_replacements = {
             "entity_name": entity_name,
-            "links_scraped": str(links_scraped),
+            "links_scraped": str(data_point_manager.get_scraped_links()),
             "data_keys_to_search": str(data_keys_to_search)
         }
         
@@ -59,47 +76,76 @@ def _execute_scraping_agent(entity_name: str, tool_names: list, system_prompt_ke
             
         user_prompt = load_prompt(user_prompt_key, user_prompt_replacements)
         
-        response = start_agent(user_prompt, system_prompt, tool_schemas, tools_map, plan=False)
+        session_attributes = {"session.entity": entity_name, "session.flow": system_prompt_key,
+                              "session.data_points_missing": len(data_keys_to_search)}
+        # Budgets and the completeness check of the stopping policy apply per session
+        monitor = SessionMonitor(get_stopping_policy(), data_point_manager)
+        if journal:
+            journal.attach(data_point_manager)
+            journal.start(entity_name=entity_name, flow=system_prompt_key)
+            session_attributes["session.resumed"] = resume_messages is not None
+        with span("agent.session", **session_attributes):
+            if max_concurrent_tools:
+                return asyncio.run(start_agent_async(user_prompt, system_prompt, tool_schemas, tools_map,
+                                                     plan=False, max_concurrent_tools=max_concurrent_tools,
+                                                     monitor=monitor, journal=journal, messages=resume_messages))
+
+            response = start_agent(user_prompt, system_prompt, tool_schemas, tools_map, plan=False,
+                                   monitor=monitor, journal=journal, messages=resume_messages)
         return response
     
     return "No data points to search for"
 
 
-def website_scrape(entity_name: str, website: str):
+def website_scrape(entity_name: str, website: str, max_concurrent_tools: int = None,
+                   data_point_manager: DataPointManager = None, journal: SessionJournal = None):
     """
     Scrape information about an entity from a specific website using scraping tools.
     
     Args:
         entity_name (str): Name of the entity to search for
         website (str): The website URL to scrape
+        max_concurrent_tools (int, optional): Run the async agent with this tool concurrency
+        data_point_manager (DataPointManager, optional): Session state for this entity
+        journal (SessionJournal, optional): Journal to record the session in, or resume it from
     
     Returns:
         str: Response from the agent with found information
     """
     return _execute_scraping_agent(
         entity_name=entity_name,
-        tool_names=["scrape", "update_data"],
+        tool_names="website_scrape",
         system_prompt_key='website_scrape_system',
         user_prompt_key='website_scrape_user',
-        dynamic_prompt_inserts={"website": website}
+        dynamic_prompt_inserts={"website": website},
+        max_concurrent_tools=max_concurrent_tools,
+        data_point_manager=data_point_manager,
+        journal=journal
     )
 
 
-def internet_search_scrape(entity_name: str):
+def internet_search_scrape(entity_name: str, max_concurrent_tools: int = None,
+                           data_point_manager: DataPointManager = None, journal: SessionJournal = None):
     """
     Search the internet and scrape relevant URLs to find information about an entity.
     
     Args:
         entity_name (str): Name of the entity to search for
+        max_concurrent_tools (int, optional): Run the async agent with this tool concurrency
+        data_point_manager (DataPointManager, optional): Session state for this entity
+        journal (SessionJournal, optional): Journal to record the session in, or resume it from
     
     Returns:
         str: Response from the agent with found information
     """
     return _execute_scraping_agent(
         entity_name=entity_name,
-        tool_names=["search", "scrape", "update_data"],
+        tool_names="search_and_scrape",
         system_prompt_key='internet_search_scrape_system',
-        user_prompt_key='internet_search_scrape_user'
+        user_prompt_key='internet_search_scrape_user',
+        max_concurrent_tools=max_concurrent_tools,
+        data_point_manager=data_point_manager,
+        journal=journal
     )
 
 # Example usage (commented out)
@@ -107,16 +153,16 @@ if __name__ == "__main__":
     entity_name = "Discord"
     website = "https://discord.com/"
 
-    client = OpenAI()
+    # LLM_TRANSPORT_MODE selects live, record, replay, cache or fake_server requests
+    client, async_client = create_transport_clients(
+        os.getenv("LLM_TRANSPORT_MODE", "live"), os.getenv("LLM_TRANSPORT_STORE")
+    )
     GPT_MODEL = "gpt-4-turbo-2024-04-09"
 
     # Initialize chat utilities with client and model
-    set_client_and_model(client, GPT_MODEL)
+    set_client_and_model(client, GPT_MODEL, async_client)
     setup_agent_event_handlers()
 
-    # Initialize global variables
-    links_scraped = []
-
     data_points = [
         {"name": "num_employees", "value": None, "reference": None},
         {"name": "office_locations", "value": None, "reference": None},
@@ -0,0 +1,204 @@
+"""
+Batch runner for researching many entities in one process.
+
+Each entity gets its own DataPointManager and agent session; sessions run in
+parallel on a thread pool and their results are written to a JSONL file as
+they complete.
+
+Input is a JSONL or CSV file. Each JSONL line looks like:
+
+    {"entity_name": "Discord", "website": "https://discord.com/",
+     "data_points": ["num_employees", "office_locations"]}
+
+CSV files use the columns entity_name, website and data_points, with the
+data point names separated by semicolons. The website is optional.
+
+Usage:
+    python -m batch entities.jsonl results.jsonl --workers 8
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+
+from app import website_scrape, internet_search_scrape
+from utils.chat_utils import set_client_and_model
+from utils.llm_transport import TRANSPORT_MODES, create_transport_clients
+from agent.handlers import setup_event_handlers as setup_agent_event_handlers
+from data_point_manager import DataPointManager
+from event import get_event_bus, use_event_bus
+from utils.pretty_print import set_conversation_printing
+from utils.tracing import JsonlSpanExporter, Tracer, get_tracer, set_tracer
+from utils.journal import SessionJournal
+
+DEFAULT_MODEL = "gpt-4-turbo-2024-04-09"
+DEFAULT_WORKERS = 8
+
+
+def load_entities(input_path: str) -> List[Dict]:
+    """
+    Load entity specs from a JSONL or CSV file.
+
+    Args:
+        input_path (str): Path to a .jsonl or .csv file
+
+    Returns:
+        List[Dict]: Entity specs with entity_name, website and data_points keys
+    """
+    path = Path(input_path)
+    entities = []
+
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                entities.append({
+                    "entity_name": row["entity_name"],
+                    "website": row.get("website") or None,
+                    "data_points": [name.strip() for name in row["data_points"].split(";") if name.strip()]
+                })
+    else:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entities.append(json.loads(line))
+
+    for entity in entities:
+        if not entity.get("entity_name") or not entity.get("data_points"):
+            raise ValueError(f"Entity spec needs entity_name and data_points: {entity}")
+
+    return entities
+
+
+def journal_path(journal_dir: str, entity_name: str, flow: str) -> Path:
+    slug = re.sub(r"[^a-z0-9]+", "-", entity_name.lower()).strip("-") or "entity"
+    digest = hashlib.sha1(entity_name.encode("utf-8")).hexdigest()[:8]
+    return Path(journal_dir) / f"{slug}-{digest}.{flow}.jsonl"
+
+
+def run_entity(entity: Dict, max_concurrent_tools: int = None, journal_dir: str = None) -> Dict:
+    """
+    Research a single entity in its own isolated session.
+
+    If a website is given it is scraped first, then the internet search agent
+    looks for whatever data points are still missing. With a journal directory
+    each agent session is journaled there, and an entity researched by an
+    earlier, interrupted run continues where that run stopped.
+
+    Args:
+        entity (Dict): Entity spec with entity_name, data_points and optional website
+        max_concurrent_tools (int, optional): Run the async agent with this tool concurrency
+        journal_dir (str, optional): Directory of session journals
+
+    Returns:
+        Dict: The entity name, data points found and links scraped
+    """
+    data_point_manager = DataPointManager([
+        {"name": name, "value": None, "reference": None} for name in entity["data_points"]
+    ], entity_name=entity["entity_name"])
+
+    journals = {}
+    if journal_dir:
+        journals = {flow: SessionJournal(journal_path(journal_dir, entity["entity_name"], flow))
+                    for flow in ("website_scrape", "internet_search_scrape")}
+
+    # Each session dispatches its agent events on its own bus
+    try:
+        with use_event_bus(get_event_bus().fork()):
+            if entity.get("website"):
+                website_scrape(entity["entity_name"], entity["website"],
+                               max_concurrent_tools=max_concurrent_tools, data_point_manager=data_point_manager,
+                               journal=journals.get("website_scrape"))
+            internet_search_scrape(entity["entity_name"],
+                                   max_concurrent_tools=max_concurrent_tools, data_point_manager=data_point_manager,
+                                   journal=journals.get("internet_search_scrape"))
+    finally:
+        for journal in journals.values():
+            journal.close()
+
+    return {
+        "entity_name": entity["entity_name"],
+        "data_points": data_point_manager.get_current_state(),
+        "links_scraped": data_point_manager.get_scraped_links(),
+        "error": None
+    }
+
+
+def run_batch(input_path: str, output_path: str, max_workers: int = DEFAULT_WORKERS,
+              max_concurrent_tools: int = None, journal_dir: str = None) -> int:
+    """
+    Research every entity in the input file on a pool of worker threads.
+
+    Args:
+        input_path (str): Path to the JSONL or CSV entity file
+        output_path (str): Path of the JSONL file results are written to
+        max_workers (int): Number of agent sessions running at once
+        max_concurrent_tools (int, optional): Tool concurrency within each session
+        journal_dir (str, optional): Directory of session journals; rerunning a batch
+            with the same directory resumes its unfinished sessions
+
+    Returns:
+        int: Number of entities that failed
+    """
+    entities = load_entities(input_path)
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, open(output_path, "w") as out:
+        futures = {executor.submit(run_entity, entity, max_concurrent_tools, journal_dir): entity for entity in entities}
+        for future in as_completed(futures):
+            entity = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Research failed for {entity['entity_name']}: {str(e)}")
+                failures += 1
+                result = {
+                    "entity_name": entity["entity_name"],
+                    "data_points": None,
+                    "links_scraped": None,
+                    "error": str(e)
+                }
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Research many entities in parallel")
+    parser.add_argument("input_path", help="JSONL or CSV file of entities and data points")
+    parser.add_argument("output_path", help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of parallel sessions")
+    parser.add_argument("--max-concurrent-tools", type=int, default=None,
+                        help="Use the async agent with this many concurrent tool calls per session")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="OpenAI model for the agent")
+    parser.add_argument("--llm-mode", choices=TRANSPORT_MODES, default="live",
+                        help="Send LLM requests live, record them, replay them or serve them from a fake server")
+    parser.add_argument("--llm-store", default=None, help="Directory of recorded LLM request/response pairs")
+    parser.add_argument("--journal-dir", default=None,
+                        help="Journal sessions here; rerun with the same directory to resume after a crash")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the agent conversations")
+    parser.add_argument("--trace", default=None,
+                        help="Write OTLP/JSON trace spans to this file and print a latency summary")
+    args = parser.parse_args()
+
+    if args.quiet:
+        set_conversation_printing(False)
+    if args.trace:
+        set_tracer(Tracer(JsonlSpanExporter(args.trace)))
+
+    client, async_client = create_transport_clients(args.llm_mode, args.llm_store)
+    set_client_and_model(client, args.model, async_client)
+    setup_agent_event_handlers()
+
+    failed = run_batch(args.input_path, args.output_path, args.workers, args.max_concurrent_tools, args.journal_dir)
+    print(f"Batch finished with {failed} failures")
+
+    tracer = get_tracer()
+    if tracer:
+        tracer.flush()
+        print(tracer.histogram.format_summary())
@@ -0,0 +1,96 @@
+"""
+Benchmark of the direct fetch fast path against Firecrawl.
+
+Fetches the fixture site's static pages (on 127.0.0.1) and pages of its
+single-page app (on localhost) through tools.scrape.fetch_and_cache_markdown,
+once with Firecrawl only and once with the direct fetcher in front of it.
+Reports latency per path, Firecrawl requests, fallbacks by reason and the
+path each domain learned. The fake Firecrawl latency stands in for a
+headless browser render. Caching is disabled so every page is fetched.
+
+Usage:
+    python -m benchmarks.bench_direct_fetch --rounds 5 --firecrawl-latency 1.0 --print-markdown
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.fake_firecrawl import FakeFirecrawlServer
+from benchmarks.fake_site import FakeSiteServer
+from tools.scrape import fetch_and_cache_markdown
+from utils.direct_fetch import DirectFetcher, set_direct_fetcher
+from utils.firecrawl_client import FirecrawlClient, set_firecrawl_client
+from utils.scrape_cache import set_scrape_cache
+from utils.tracing import LatencyHistogram
+from utils.url_frontier import DomainPoliteness, set_domain_politeness
+
+
+def run(urls, firecrawl_server: FakeFirecrawlServer, fetcher) -> dict:
+    set_direct_fetcher(fetcher)
+    histogram = LatencyHistogram()
+    requests_before = firecrawl_server.requests
+    start = time.perf_counter()
+    for url in urls:
+        page_start = time.perf_counter()
+        fetch_and_cache_markdown(url)
+        histogram.record("static" if "/static/" in url else "app", time.perf_counter() - page_start)
+    result = {
+        "seconds": time.perf_counter() - start,
+        "firecrawl_requests": firecrawl_server.requests - requests_before,
+        "latency": {name: {key: entry[key] for key in ("count", "mean_ms", "p50_ms", "p95_ms")}
+                    for name, entry in histogram.summary().items()}
+    }
+    if fetcher:
+        result["direct_fetch"] = fetcher.stats()
+        result["domains"] = fetcher.domains()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark direct fetching against Firecrawl")
+    parser.add_argument("--rounds", type=int, default=5, help="Times each fixture page is fetched")
+    parser.add_argument("--app-pages", type=int, default=4, help="Single-page app URLs per round")
+    parser.add_argument("--site-latency", type=float, default=0.02, help="Fixture site latency per request")
+    parser.add_argument("--firecrawl-latency", type=float, default=1.0, help="Fake Firecrawl latency per scrape")
+    parser.add_argument("--print-markdown", action="store_true", help="Print the direct markdown of each static page")
+    parser.add_argument("--output", default=None, help="Optional JSON file to write results to")
+    args = parser.parse_args()
+
+    set_scrape_cache(None)
+    set_domain_politeness(DomainPoliteness(max_concurrency=64, min_interval=0))
+
+    with FakeSiteServer(latency=args.site_latency) as site, \
+            FakeFirecrawlServer(latency=args.firecrawl_latency) as firecrawl_server:
+        firecrawl_client = FirecrawlClient(api_key="fake", api_url=firecrawl_server.base_url)
+        set_firecrawl_client(firecrawl_client)
+        urls = []
+        for round_index in range(args.rounds):
+            urls.extend(site.static_urls())
+            urls.extend(site.url(f"/app/page/{round_index}-{index}", "localhost") for index in range(args.app_pages))
+
+        fetcher = DirectFetcher()
+        if args.print_markdown:
+            for url in site.static_urls():
+                print(f"==> {url}\n{fetcher.fetch_direct(url)}\n")
+
+        results = {
+            "firecrawl_only": run(urls, firecrawl_server, None),
+            "direct_fetch": run(urls, firecrawl_server, fetcher)
+        }
+        fetcher.close()
+        firecrawl_client.close()
+    set_direct_fetcher(None)
+
+    for name, result in results.items():
+        latency = ", ".join(f"{page} mean {entry['mean_ms']:.1f}ms p95 {entry['p95_ms']:.1f}ms"
+                            for page, entry in result["latency"].items())
+        print(f"{name:>15}: {result['seconds']:.2f}s, {result['firecrawl_requests']} Firecrawl requests; {latency}")
+    stats = results["direct_fetch"]["direct_fetch"]
+    print(f"direct: {stats['direct']} pages, fallbacks {stats['fallbacks']}, {stats['skipped']} skipped by "
+          f"learned domains, {stats['probes']} probes")
+    print(f"domains: {results['direct_fetch']['domains']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
@@ -0,0 +1,92 @@
+"""
+Benchmark of Firecrawl round trips against a local stand-in server.
+
+Compares scraping a burst of URLs with a new connection per request (as
+FirecrawlApp does), with the pooled FirecrawlClient, and with scrape_many's
+batch job. Caching is disabled so every page is fetched.
+
+Usage:
+    python -m benchmarks.bench_firecrawl_client --urls 10 --latency 0.05
+"""
+
+import argparse
+import json
+import time
+
+import httpx
+
+from benchmarks.fake_firecrawl import FakeFirecrawlServer
+from data_point_manager import DataPointManager
+from utils.direct_fetch import set_direct_fetcher
+from utils.firecrawl_client import FirecrawlClient, set_firecrawl_client
+from utils.scrape_cache import set_scrape_cache
+from utils.relevance import set_relevance_filter
+from utils.page_store import set_page_store
+from utils.url_frontier import DomainPoliteness, set_domain_politeness
+from tools.scrape import scrape
+from tools.scrape_many import scrape_many
+
+
+def unpooled_scrapes(base_url: str, urls: list) -> None:
+    for url in urls:
+        with httpx.Client(base_url=base_url) as http:
+            http.post("/v1/scrape", json={"url": url, "formats": ["markdown"]}).raise_for_status()
+
+
+def new_manager() -> DataPointManager:
+    # Each scenario gets its own session, so no URL counts as already scraped
+    return DataPointManager([{"name": "num_employees", "value": None, "reference": None}], "Example")
+
+
+def pooled_scrapes(urls: list) -> None:
+    manager = new_manager()
+    for url in urls:
+        scrape(url, data_point_manager=manager)
+
+
+def timed(server: FakeFirecrawlServer, fn) -> dict:
+    requests_before, connections_before = server.requests, server.connections
+    start = time.perf_counter()
+    fn()
+    return {
+        "seconds": time.perf_counter() - start,
+        "requests": server.requests - requests_before,
+        "connections": server.connections - connections_before
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Firecrawl client round trips")
+    parser.add_argument("--urls", type=int, default=10, help="Number of URLs per burst")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server latency per request")
+    parser.add_argument("--page-size", type=int, default=20000, help="Characters per fake page")
+    parser.add_argument("--output", default=None, help="Optional JSON file to write results to")
+    args = parser.parse_args()
+
+    set_scrape_cache(None)
+    set_relevance_filter(None)
+    set_page_store(None)
+    # Fake pages only exist on the Firecrawl stand-in
+    set_direct_fetcher(None)
+    # Every URL is on one domain; per-domain spacing would dominate the timings
+    set_domain_politeness(DomainPoliteness(max_concurrency=64, min_interval=0))
+
+    with FakeFirecrawlServer(latency=args.latency, page_size=args.page_size) as server:
+        client = FirecrawlClient(api_key="fake", api_url=server.base_url)
+        set_firecrawl_client(client)
+        urls = [f"https://example.com/page/{index}" for index in range(args.urls)]
+
+        results = {
+            "unpooled_serial": timed(server, lambda: unpooled_scrapes(server.base_url, urls)),
+            "pooled_serial": timed(server, lambda: pooled_scrapes(urls)),
+            "scrape_many_batch": timed(server, lambda: scrape_many(urls, data_point_manager=new_manager())),
+        }
+        client.close()
+
+    for name, result in results.items():
+        print(f"{name:>18}: {result['seconds']:.3f}s, {result['requests']} requests, "
+              f"{result['connections']} connections")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,114 @@
+"""
+Benchmark of the per-turn overhead of memory_optimise.
+
+Simulates agent sessions where every turn appends an assistant tool call and a
+large tool message, then runs memory_optimise as the agent loop does. The
+summarisation call is answered by a stub client so only the token accounting
+and trimming overhead is measured. The previous implementation, which looked
+up the encoding and re-encoded the whole conversation every turn, is timed
+alongside for comparison.
+
+Usage:
+    python -m benchmarks.bench_memory_optimise --turns 100 --tool-message-kb 50
+"""
+
+import argparse
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+import tiktoken
+
+import utils.chat_utils as chat_utils
+from utils.chat_utils import set_client_and_model, memory_optimise
+
+MODEL = "gpt-4-turbo-2024-04-09"
+
+
+class StubSummaryClient:
+    """Answers summarisation requests instantly with a fixed summary."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        message = SimpleNamespace(content="Scraped several pages; num_employees still missing.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def legacy_memory_optimise(messages: list):
+    # The implementation before incremental accounting, kept as the baseline
+    system_prompt = messages[0]["content"]
+    encoding = tiktoken.encoding_for_model(chat_utils.GPT_MODEL)
+
+    if len(messages) > 24 or len(encoding.encode(str(messages), disallowed_special=())) > 10000:
+        latest_messages = messages[-12:]
+        len(encoding.encode(str(latest_messages), disallowed_special=()))
+        early_messages = messages[:len(messages) - len(latest_messages)]
+        response = chat_utils.client.chat.completions.create(
+            model="gpt-3.5-turbo", messages=[{"role": "user", "content": str(early_messages)}]
+        )
+        system_prompt = f"{system_prompt}; Here is a summary of past actions taken so far: {response.choices[0].message.content}"
+        return [{"role": "system", "content": system_prompt}] + latest_messages
+
+    return messages
+
+
+def make_tool_message(turn: int, size_kb: int) -> dict:
+    line = f"Turn {turn}: company headcount, offices and products are listed on this page. "
+    content = (line * (size_kb * 1024 // len(line) + 1))[:size_kb * 1024]
+    return {"role": "tool", "tool_call_id": f"call_{turn}", "name": "scrape", "content": content}
+
+
+def run_session(optimise, turns: int, size_kb: int) -> list:
+    """
+    Run one simulated session and return the memory_optimise time of every turn.
+    """
+    messages = [{"role": "user", "content": "Find num_employees and office_locations for Discord"}]
+    timings = []
+    for turn in range(turns):
+        messages.append({"role": "assistant", "content": None, "tool_calls": None})
+        messages.append(make_tool_message(turn, size_kb))
+        start = time.perf_counter()
+        messages = optimise(messages)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarise(timings: list) -> dict:
+    ordered = sorted(timings)
+    return {
+        "turns": len(timings),
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "total_s": sum(timings)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark memory_optimise per-turn overhead")
+    parser.add_argument("--turns", type=int, default=100, help="Turns per session")
+    parser.add_argument("--tool-message-kb", type=int, default=50, help="Size of each tool message in KB")
+    parser.add_argument("--sessions", type=int, default=3, help="Number of sessions to average over")
+    parser.add_argument("--output", default=None, help="Optional JSON file to write results to")
+    args = parser.parse_args()
+
+    set_client_and_model(StubSummaryClient(), MODEL)
+
+    results = {}
+    for name, optimise in (("legacy", legacy_memory_optimise), ("incremental", memory_optimise)):
+        timings = []
+        for _ in range(args.sessions):
+            timings.extend(run_session(optimise, args.turns, args.tool_message_kb))
+        results[name] = summarise(timings)
+        print(f"{name:>12}: mean {results[name]['mean_ms']:.2f} ms/turn, "
+              f"p95 {results[name]['p95_ms']:.2f} ms/turn")
+
+    results["speedup"] = results["legacy"]["mean_ms"] / results["incremental"]["mean_ms"]
+    print(f"speedup: {results['speedup']:.1f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
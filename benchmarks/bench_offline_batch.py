@@ -0,0 +1,93 @@
+"""
+Offline benchmark of the Batch API research mode.
+
+Runs offline_batch.run_offline_batch for a set of synthetic entities against
+the Batch API stand-in and the fake Firecrawl server, and reports wall time,
+LLM requests and data points found. With --fail-first-model the first model
+of the search_parse and extract routes answers with empty JSON, so every
+request escalates to a second batch round.
+
+Usage:
+    python -m benchmarks.bench_offline_batch --entities 200 --single-shot --output offline.json
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from openai import AsyncOpenAI
+
+from benchmarks.bench_pipeline import MODEL, git_commit, make_entities
+from benchmarks.fake_firecrawl import FakeFirecrawlServer
+from benchmarks.fake_openai import BatchOpenAIServer
+from offline_batch import run_offline_batch
+from utils.direct_fetch import set_direct_fetcher
+from utils.firecrawl_client import FirecrawlClient, set_firecrawl_client
+from utils.model_router import ModelRouter, set_model_router
+from utils.scrape_cache import set_scrape_cache
+from utils.search_cache import set_search_cache
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Batch API research against local fakes")
+    parser.add_argument("--entities", type=int, default=200, help="Number of synthetic entities")
+    parser.add_argument("--single-shot", action="store_true", help="Also extract from each entity's website")
+    parser.add_argument("--batch-latency", type=float, default=0.5, help="Seconds for the fake to complete a batch")
+    parser.add_argument("--scrape-latency", type=float, default=0.05, help="Fake Firecrawl latency per request")
+    parser.add_argument("--fail-first-model", action="store_true",
+                        help="Route through a small model that returns empty JSON, forcing escalation")
+    parser.add_argument("--output", default=None, help="Optional JSON file to write results to")
+    args = parser.parse_args()
+
+    set_scrape_cache(None)
+    set_search_cache(None)
+    # Fake pages only exist on the Firecrawl stand-in
+    set_direct_fetcher(None)
+    small_model = "gpt-4o-mini"
+    if args.fail_first_model:
+        set_model_router(ModelRouter({"search_parse": [small_model, None], "extract": [small_model, None]}))
+    else:
+        set_model_router(ModelRouter())
+
+    with tempfile.TemporaryDirectory() as work_dir, \
+            BatchOpenAIServer(batch_latency=args.batch_latency, latency=0,
+                              fail_first_model=small_model if args.fail_first_model else None) as llm_server, \
+            FakeFirecrawlServer(latency=args.scrape_latency) as firecrawl_server:
+        firecrawl_client = FirecrawlClient(api_key="fake", api_url=firecrawl_server.base_url)
+        set_firecrawl_client(firecrawl_client)
+        async_client = AsyncOpenAI(api_key="fake", base_url=llm_server.base_url, max_retries=0)
+
+        input_path = Path(work_dir) / "entities.jsonl"
+        output_path = Path(work_dir) / "results.jsonl"
+        with open(input_path, "w") as f:
+            for entity in make_entities(args.entities):
+                f.write(json.dumps(entity) + "\n")
+
+        start = time.perf_counter()
+        failures = run_offline_batch(str(input_path), str(output_path), async_client, MODEL,
+                                     single_shot=args.single_shot, work_dir=work_dir, poll_interval=0.5)
+        elapsed = time.perf_counter() - start
+        firecrawl_client.close()
+
+        with open(output_path) as f:
+            results = [json.loads(line) for line in f]
+        found = sum(1 for result in results for point in result["data_points"] or [] if point["value"] is not None)
+        total = sum(len(result["data_points"] or []) for result in results)
+        summary = {
+            "commit": git_commit(),
+            "settings": vars(args),
+            "wall_seconds": elapsed,
+            "entities_per_minute": len(results) / elapsed * 60,
+            "llm_requests": llm_server.requests,
+            "batches": len(llm_server.batches),
+            "data_points_found": found,
+            "data_points_total": total,
+            "failures": failures
+        }
+
+    print(f"{summary['entities_per_minute']:.0f} entities/min, {summary['llm_requests']} LLM requests in "
+          f"{summary['batches']} batches, {found}/{total} data points found")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
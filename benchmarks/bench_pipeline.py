@@ -0,0 +1,262 @@
+"""
+End-to-end offline benchmark of the agent pipeline.
+
+Runs batch.run_entity (website_scrape followed by internet_search_scrape) for
+a set of synthetic entities against the scripted fake OpenAI server and the
+fake Firecrawl server, so the agent loop, memory_optimise and the tools are
+exercised without network access. Reports, per concurrency level, wall time
+and turns per entity, prompt and completion tokens, peak RSS and throughput
+in entities per minute, and writes them to JSON for comparing commits.
+Latency and token use per model route are reported alongside.
+
+The scrape and search caches are disabled so every run does the same work.
+The relevance filter, pre-extraction, near-duplicate detection and a page
+store in a temporary directory are enabled whatever config/ says, so runs of
+different checkouts send the model the same pages.
+Peak RSS is the process high-water mark, so levels run in increasing order
+of concurrency.
+
+Usage:
+    python -m benchmarks.bench_pipeline --entities 16 --concurrency 1 4 8 --output pipeline.json
+"""
+
+import argparse
+import contextvars
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from openai import AsyncOpenAI, OpenAI
+
+from batch import run_entity
+from benchmarks.fake_firecrawl import FakeFirecrawlServer
+from benchmarks.fake_openai import ScriptedOpenAIServer, slugify
+from agent.handlers import setup_event_handlers as setup_agent_event_handlers
+from utils.chat_utils import set_client_and_model
+from utils.model_router import ModelRouter, set_model_router
+from utils.page_store import PageStore, set_page_store
+from utils.direct_fetch import set_direct_fetcher
+from utils.firecrawl_client import FirecrawlClient, set_firecrawl_client
+from utils.pretty_print import set_conversation_printing
+from utils.prefetcher import Prefetcher, set_prefetcher
+from utils.pre_extraction import PreExtractor, set_pre_extractor
+from utils.relevance import RelevanceFilter, set_relevance_filter
+from utils.near_duplicates import NearDuplicateDetector, set_near_duplicate_detector
+from utils.scrape_cache import set_scrape_cache
+from utils.search_cache import set_search_cache
+from utils.tracing import JsonlSpanExporter, Tracer, set_tracer
+from utils.url_frontier import DomainPoliteness, set_domain_politeness
+
+MODEL = "gpt-4-turbo-2024-04-09"
+DATA_POINTS = ["num_employees", "office_locations", "main_product"]
+
+# Usage totals of the entity being researched in the current context
+_entity_usage = contextvars.ContextVar("entity_usage", default=None)
+
+
+def _record_usage(kwargs: Dict, response) -> None:
+    usage = _entity_usage.get()
+    if usage is None:
+        return
+    usage["llm_calls"] += 1
+    if kwargs.get("tools"):
+        usage["turns"] += 1
+    if response.usage is not None:
+        usage["prompt_tokens"] += response.usage.prompt_tokens
+        usage["completion_tokens"] += response.usage.completion_tokens
+
+
+class MeteredClient:
+    """Wraps an OpenAI client and adds each response's usage to the current entity."""
+
+    def __init__(self, client: OpenAI):
+        self.client = client
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        response = self.client.chat.completions.create(**kwargs)
+        _record_usage(kwargs, response)
+        return response
+
+
+class AsyncMeteredClient:
+    """Async counterpart of MeteredClient."""
+
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        response = await self.client.chat.completions.create(**kwargs)
+        _record_usage(kwargs, response)
+        return response
+
+
+def make_entities(count: int, data_points: Optional[List[str]] = None) -> List[Dict]:
+    return [
+        {
+            "entity_name": f"Company {index}",
+            "website": f"https://{slugify(f'Company {index}')}.example.com/",
+            "data_points": list(data_points or DATA_POINTS)
+        }
+        for index in range(count)
+    ]
+
+
+def run_one(entity: Dict, max_concurrent_tools: Optional[int]) -> Dict:
+    usage = {"llm_calls": 0, "turns": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    _entity_usage.set(usage)
+    start = time.perf_counter()
+    result = run_entity(entity, max_concurrent_tools)
+    usage["seconds"] = time.perf_counter() - start
+    usage["data_points_found"] = sum(1 for point in result["data_points"] if point["value"] is not None)
+    return usage
+
+
+def run_level(entities: List[Dict], concurrency: int, max_concurrent_tools: Optional[int]) -> Dict:
+    """
+    Research all entities with the given number of parallel sessions.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Each session gets a fresh context so its usage counter is its own
+        futures = [
+            executor.submit(contextvars.Context().run, run_one, entity, max_concurrent_tools)
+            for entity in entities
+        ]
+        per_entity = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    seconds = sorted(entry["seconds"] for entry in per_entity)
+    return {
+        "concurrency": concurrency,
+        "entities": len(entities),
+        "wall_seconds": elapsed,
+        "entities_per_minute": len(entities) / elapsed * 60,
+        "seconds_per_entity": {
+            "mean": statistics.mean(seconds),
+            "p50": seconds[len(seconds) // 2],
+            "max": seconds[-1]
+        },
+        "turns_per_entity": statistics.mean(entry["turns"] for entry in per_entity),
+        "llm_calls_per_entity": statistics.mean(entry["llm_calls"] for entry in per_entity),
+        "prompt_tokens": sum(entry["prompt_tokens"] for entry in per_entity),
+        "completion_tokens": sum(entry["completion_tokens"] for entry in per_entity),
+        "data_points_found": sum(entry["data_points_found"] for entry in per_entity),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline against local fakes")
+    parser.add_argument("--entities", type=int, default=16, help="Number of synthetic entities")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8],
+                        help="Numbers of parallel sessions to measure")
+    parser.add_argument("--max-concurrent-tools", type=int, default=None,
+                        help="Use the async agent with this many concurrent tool calls per session")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake OpenAI latency per request")
+    parser.add_argument("--scrape-latency", type=float, default=0.05, help="Fake Firecrawl latency per request")
+    parser.add_argument("--page-size", type=int, default=20000, help="Characters per fake page")
+    parser.add_argument("--script", default=None,
+                        help="JSON file of tool call steps keyed by website_scrape / internet_search_scrape")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Prefetch this many search-suggested URLs per search (0 disables prefetching)")
+    parser.add_argument("--routes", default=None,
+                        help="JSON file of models per route, as in config/model_routes.json")
+    parser.add_argument("--data-points", nargs="+", default=DATA_POINTS, help="Data points to research per entity")
+    parser.add_argument("--no-pre-extraction", action="store_true",
+                        help="Leave every data point to the model instead of pre-extracting common ones")
+    parser.add_argument("--no-near-duplicates", action="store_true",
+                        help="Send near-duplicate pages to the model in full")
+    parser.add_argument("--print-conversations", action="store_true", help="Print the agent conversations")
+    parser.add_argument("--trace", default=None, help="Write OTLP/JSON trace spans to this file")
+    parser.add_argument("--output", default=None, help="Optional JSON file to write results to")
+    args = parser.parse_args()
+
+    set_conversation_printing(args.print_conversations)
+    # Always trace so the latency breakdown is reported; spans are only written with --trace
+    tracer = Tracer(JsonlSpanExporter(args.trace) if args.trace else None)
+    set_tracer(tracer)
+
+    scripts = None
+    if args.script:
+        with open(args.script) as f:
+            scripts = json.load(f)
+
+    routes = None
+    if args.routes:
+        with open(args.routes) as f:
+            routes = json.load(f)
+    router = ModelRouter(routes)
+    set_model_router(router)
+
+    set_scrape_cache(None)
+    set_search_cache(None)
+    # Fake pages only exist on the Firecrawl stand-in
+    set_direct_fetcher(None)
+    set_relevance_filter(RelevanceFilter(top_k=8, token_budget=3000, max_section_tokens=600))
+    set_pre_extractor(None if args.no_pre_extraction else PreExtractor())
+    set_near_duplicate_detector(None if args.no_near_duplicates else NearDuplicateDetector())
+    prefetcher = Prefetcher(top_n=args.prefetch) if args.prefetch else None
+    set_prefetcher(prefetcher)
+    # Every fake page is local, so per-domain rate limits would only measure the limiter
+    set_domain_politeness(DomainPoliteness(max_concurrency=64, min_interval=0))
+
+    with ScriptedOpenAIServer(scripts, latency=args.llm_latency) as llm_server, \
+            FakeFirecrawlServer(latency=args.scrape_latency, page_size=args.page_size) as firecrawl_server, \
+            tempfile.TemporaryDirectory() as page_dir:
+        set_page_store(PageStore(page_dir, chunk_size=6000, inline_threshold=8000))
+        firecrawl_client = FirecrawlClient(api_key="fake", api_url=firecrawl_server.base_url)
+        set_firecrawl_client(firecrawl_client)
+        client = OpenAI(api_key="fake", base_url=llm_server.base_url, max_retries=0)
+        async_client = AsyncOpenAI(api_key="fake", base_url=llm_server.base_url, max_retries=0)
+        set_client_and_model(MeteredClient(client), MODEL, AsyncMeteredClient(async_client))
+        setup_agent_event_handlers()
+
+        levels = []
+        for concurrency in sorted(args.concurrency):
+            level = run_level(make_entities(args.entities, args.data_points), concurrency, args.max_concurrent_tools)
+            levels.append(level)
+            print(f"concurrency {concurrency:>3}: {level['entities_per_minute']:.1f} entities/min, "
+                  f"{level['seconds_per_entity']['mean']:.2f}s/entity, "
+                  f"{level['turns_per_entity']:.1f} turns/entity, "
+                  f"{level['prompt_tokens']} prompt + {level['completion_tokens']} completion tokens, "
+                  f"peak RSS {level['peak_rss_mb']:.0f} MB")
+        firecrawl_client.close()
+    tracer.flush()
+
+    print(tracer.histogram.format_summary())
+    print(router.format_stats())
+    if prefetcher:
+        prefetcher.close()
+        print(f"prefetch: {prefetcher.stats()}")
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "settings": vars(args),
+        "levels": levels,
+        "span_latency": tracer.histogram.summary(),
+        "model_routes": router.stats(),
+        "prefetch": prefetcher.stats() if prefetcher else None
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
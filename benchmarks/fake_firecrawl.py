@@ -0,0 +1,148 @@
+"""
+Local stand-in for the Firecrawl REST API.
+
+Implements /v1/scrape, /v1/search and the /v1/batch/scrape job endpoints with
+configurable latency and page sizes, and counts requests and TCP connections
+so connection reuse can be measured. Point FirecrawlClient at base_url to use
+it.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class FakeFirecrawlServer:
+    def __init__(self, latency: float = 0.05, page_size: int = 20000,
+                 pages: Optional[Dict[str, str]] = None, search_results: int = 5,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            latency (float): Seconds added to every scrape, search and batch job
+            page_size (int): Size in characters of generated page markdown
+            pages (Dict[str, str], optional): Fixed markdown for specific URLs
+            search_results (int): Number of results returned per search
+            host (str): Interface to bind to
+            port (int): Port to bind to, 0 picks a free port
+        """
+        self.latency = latency
+        self.page_size = page_size
+        self.pages = pages or {}
+        self.search_results = search_results
+        self.jobs = {}
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_for(self, url: str) -> str:
+        if url in self.pages:
+            return self.pages[url]
+        header = f"# Page {url}\n\n## About\n\nThe company behind {url} has 1,200 employees.\n\n" \
+                 "Offices: Austin, Berlin and Singapore.\n\n"
+        filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+        body = (filler * (self.page_size // len(filler) + 1))[:max(self.page_size - len(header), 0)]
+        return header + body
+
+    def document_for(self, url: str) -> Dict:
+        return {"markdown": self.page_for(url), "metadata": {"sourceURL": url, "statusCode": 200}}
+
+    def respond(self, method: str, path: str, body: Dict):
+        """
+        Build the response for a request.
+
+        Returns:
+            Tuple[int, Dict]: HTTP status code and JSON response body
+        """
+        if method == "POST" and path == "/v1/scrape":
+            time.sleep(self.latency)
+            return 200, {"success": True, "data": self.document_for(body["url"])}
+
+        if method == "POST" and path == "/v1/search":
+            time.sleep(self.latency)
+            slug = "-".join(body["query"].lower().split())
+            results = [
+                {"url": f"https://example.com/{slug}/{index}", "title": f"{body['query']} result {index}",
+                 "description": f"Result {index} for {body['query']}"}
+                for index in range(min(body.get("limit", self.search_results), self.search_results))
+            ]
+            return 200, {"success": True, "data": results}
+
+        if method == "POST" and path == "/v1/batch/scrape":
+            job_id = uuid.uuid4().hex
+            with self._lock:
+                self.jobs[job_id] = {"urls": body["urls"], "ready_at": time.monotonic() + self.latency}
+            return 200, {"success": True, "id": job_id, "url": f"{self.base_url}/v1/batch/scrape/{job_id}"}
+
+        if method == "GET" and path.startswith("/v1/batch/scrape/"):
+            job = self.jobs.get(path.rsplit("/", 1)[-1])
+            if job is None:
+                return 404, {"success": False, "error": "Job not found"}
+            if time.monotonic() < job["ready_at"]:
+                return 200, {"success": True, "status": "scraping", "completed": 0, "total": len(job["urls"])}
+            return 200, {
+                "success": True, "status": "completed", "completed": len(job["urls"]), "total": len(job["urls"]),
+                "data": [self.document_for(url) for url in job["urls"]]
+            }
+
+        return 404, {"success": False, "error": f"Unknown endpoint {method} {path}"}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps connections open so clients can reuse them
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                with server._lock:
+                    server.requests += 1
+                status, payload = server.respond(method, self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeFirecrawlServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
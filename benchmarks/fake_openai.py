@@ -0,0 +1,300 @@
+"""
+Scripted stand-in for the OpenAI chat completions API.
+
+Extends FakeOpenAIServer so that instead of replaying recorded pairs it plays
+a scripted sequence of tool calls for every agent session, answers search
+result parsing with JSON and summarisation with a fixed summary. Each session
+is identified from its first request and tracked through the ids of the tool
+calls it was given, so sessions survive memory_optimise trimming their
+messages and many sessions can share one server.
+
+BatchOpenAIServer adds the files and batches endpoints of the Batch API on
+top, completing each batch after a delay with the same scripted answers.
+
+A script maps each agent flow to a list of steps; each step is a list of tool
+calls with argument templates. String arguments are formatted with
+{entity_name}, {website} and {slug}; the special arguments "{data_updates}"
+and "{first_data_update}" become update_data entries for all, or the first
+of, the data points the session was asked to find.
+"""
+
+import ast
+import itertools
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import Dict, List, Optional, Tuple
+
+from utils.llm_transport import FakeOpenAIServer
+
+DEFAULT_SCRIPTS = {
+    "website_scrape": [
+        [{"name": "scrape", "arguments": {"url": "{website}"}}],
+        [{"name": "scrape_many", "arguments": {"urls": ["{website}about", "{website}careers"]}}],
+        [{"name": "update_data", "arguments": {"datas_update": "{first_data_update}"}}],
+    ],
+    "internet_search_scrape": [
+        [{"name": "search", "arguments": {"query": "{entity_name} company facts", "entity_name": "{entity_name}"}}],
+        # The first result FakeFirecrawlServer returns for the search above
+        [{"name": "scrape", "arguments": {"url": "https://example.com/{slug}-company-facts/0"}}],
+        [{"name": "update_data", "arguments": {"datas_update": "{data_updates}"}}],
+    ],
+}
+
+# Approximate characters per token used for the usage figures
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(value) -> int:
+    return max(1, len(json.dumps(value)) // CHARS_PER_TOKEN)
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "entity"
+
+
+class ScriptedOpenAIServer(FakeOpenAIServer):
+    def __init__(self, scripts: Optional[Dict[str, List]] = None, latency: float = 0.05,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            scripts (Dict[str, List], optional): Tool call steps keyed by flow name
+                ("website_scrape" or "internet_search_scrape"), defaults to DEFAULT_SCRIPTS
+            latency (float): Seconds added to every completion
+            host (str): Interface to bind to
+            port (int): Port to bind to, 0 picks a free port
+        """
+        # Responses are scripted, so no store of recorded pairs is needed
+        super().__init__(None, host, port)
+        self.scripts = scripts or DEFAULT_SCRIPTS
+        self.latency = latency
+        self.fill_info_found = False
+        self.sessions = {}
+        self.requests = 0
+        self._session_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def respond(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        if path.rstrip("/") != "/v1/chat/completions":
+            return 404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}
+
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        return 200, self.complete(body)
+
+    def complete(self, body: Dict) -> Dict:
+        """
+        Build the chat completion for a request body.
+        """
+        messages = body.get("messages", [])
+        if body.get("tools"):
+            message, finish_reason = self._agent_turn(messages, [t["function"]["name"] for t in body["tools"]])
+        elif (body.get("response_format") or {}).get("type") == "json_object":
+            message, finish_reason = self._parse_search_result(messages), "stop"
+        else:
+            message = {"role": "assistant", "content": "Scraped several pages; some data points are still missing."}
+            finish_reason = "stop"
+
+        prompt_tokens = estimate_tokens(messages)
+        completion_tokens = estimate_tokens(message)
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def _start_session(self, messages: List[Dict], tool_names: List[str]) -> str:
+        prompt = "\n".join(str(message.get("content") or "") for message in messages)
+        entity = re.search(r"Entity to search: (.+)", prompt)
+        website = re.search(r"Website to focus on: (\S+)", prompt)
+        data_points = re.search(r"Data points to find:\s*(\[.*?\])", prompt, re.S)
+
+        entity_name = entity.group(1).strip() if entity else "Entity"
+        session = {
+            "flow": "internet_search_scrape" if "search" in tool_names else "website_scrape",
+            "entity_name": entity_name,
+            "website": website.group(1) if website else f"https://{slugify(entity_name)}.example.com/",
+            "slug": slugify(entity_name),
+            "data_points": ast.literal_eval(data_points.group(1)) if data_points else [],
+        }
+        with self._lock:
+            session_id = f"s{next(self._session_ids)}"
+            self.sessions[session_id] = session
+        return session_id
+
+    def _agent_turn(self, messages: List[Dict], tool_names: List[str]) -> Tuple[Dict, str]:
+        # The last tool call we issued carries the session and step it belongs to
+        session_id, step = None, -1
+        for message in reversed(messages):
+            for tool_call in message.get("tool_calls") or []:
+                match = re.match(r"call_(s\d+)_(\d+)_\d+$", tool_call.get("id", ""))
+                if match:
+                    session_id, step = match.group(1), int(match.group(2))
+                    break
+            if session_id:
+                break
+        if session_id is None:
+            session_id = self._start_session(messages, tool_names)
+
+        session = self.sessions[session_id]
+        steps = self.scripts.get(session["flow"], [])
+        step += 1
+        if step >= len(steps):
+            return {"role": "assistant", "content": f"Finished researching {session['entity_name']}."}, "stop"
+
+        tool_calls = [
+            {
+                "id": f"call_{session_id}_{step}_{index}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(self._fill(call["arguments"], session))}
+            }
+            for index, call in enumerate(steps[step])
+        ]
+        return {"role": "assistant", "content": None, "tool_calls": tool_calls}, "tool_calls"
+
+    def _fill(self, value, session: Dict):
+        if value in ("{data_updates}", "{first_data_update}"):
+            names = session["data_points"] if value == "{data_updates}" else session["data_points"][:1]
+            return [
+                {"data_point": name, "value": f"{name} of {session['entity_name']}", "reference": session["website"]}
+                for name in names
+            ]
+        if isinstance(value, str):
+            return value.format(**{key: session[key] for key in ("entity_name", "website", "slug")})
+        if isinstance(value, list):
+            return [self._fill(item, session) for item in value]
+        if isinstance(value, dict):
+            return {key: self._fill(item, session) for key, item in value.items()}
+        return value
+
+    def _parse_search_result(self, messages: List[Dict]) -> Dict:
+        prompt = str(messages[-1].get("content") or "") if messages else ""
+        urls = list(dict.fromkeys(re.findall(r"https?://[^\s'\"\],]+", prompt)))[:3]
+        info_found = []
+        request = re.search(r"information about (.+?) regarding these data points: (.+)", prompt)
+        if self.fill_info_found and request:
+            entity_name, names = request.group(1), [name.strip() for name in request.group(2).split(",")]
+            reference = urls[0] if urls else None
+            info_found = [{"data_point": name, "value": f"{name} of {entity_name}", "reference": reference}
+                          for name in names if name]
+        return {"role": "assistant", "content": json.dumps({"related_urls": urls, "info_found": info_found})}
+
+
+class BatchOpenAIServer(ScriptedOpenAIServer):
+    def __init__(self, batch_latency: float = 0.5, fail_first_model: Optional[str] = None, **kwargs):
+        """
+        Scripted server that also implements the Batch API file and batch endpoints.
+
+        Batches move from validating to in_progress and complete after
+        batch_latency seconds. Extraction requests are answered with every
+        requested data point found.
+
+        Args:
+            batch_latency (float): Seconds from submitting a batch to its completion
+            fail_first_model (str, optional): Answer requests for this model with empty
+                JSON, to exercise escalation to the next model
+            **kwargs: Passed to ScriptedOpenAIServer
+        """
+        super().__init__(**kwargs)
+        self.batch_latency = batch_latency
+        self.fail_first_model = fail_first_model
+        self.fill_info_found = True
+        self.files = {}
+        self.batches = {}
+        self._ids = itertools.count(1)
+
+    def respond_upload(self, path: str, content_type: str, data: bytes) -> Tuple[int, Dict]:
+        if path.rstrip("/") != "/v1/files":
+            return super().respond_upload(path, content_type, data)
+
+        message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + data)
+        fields, filename, content = {}, "upload.jsonl", b""
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                filename = part.get_filename() or filename
+                content = part.get_payload(decode=True)
+            else:
+                fields[name] = part.get_content().strip()
+        return 200, self._store_file(filename, content, fields.get("purpose", "batch"))
+
+    def respond(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        if path.rstrip("/") == "/v1/batches":
+            input_file = self.files.get(body.get("input_file_id"))
+            if input_file is None:
+                return 404, {"error": {"message": "No such file", "type": "invalid_request_error"}}
+            batch_id = f"batch_{next(self._ids)}"
+            batch = {
+                "id": batch_id, "object": "batch", "endpoint": body.get("endpoint"), "errors": None,
+                "input_file_id": input_file["id"], "completion_window": body.get("completion_window"),
+                "status": "validating", "output_file_id": None, "error_file_id": None,
+                "created_at": int(time.time()), "metadata": body.get("metadata"),
+                "request_counts": {"total": 0, "completed": 0, "failed": 0}
+            }
+            with self._lock:
+                self.batches[batch_id] = batch
+            threading.Thread(target=self._process_batch, args=(batch_id,), daemon=True).start()
+            return 200, batch
+        return super().respond(path, body)
+
+    def respond_get(self, path: str):
+        parts = path.strip("/").split("/")
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+            with self._lock:
+                batch = self.batches.get(parts[2])
+                return (200, dict(batch)) if batch else (404, {"error": {"message": "No such batch"}})
+        if parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+            stored = self.files.get(parts[2])
+            return (200, stored["content"]) if stored else (404, {"error": {"message": "No such file"}})
+        return super().respond_get(path)
+
+    def _store_file(self, filename: str, content: bytes, purpose: str) -> Dict:
+        file_id = f"file-{next(self._ids)}"
+        entry = {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                 "filename": filename, "purpose": purpose, "status": "processed"}
+        with self._lock:
+            self.files[file_id] = {**entry, "content": content}
+        return entry
+
+    def _process_batch(self, batch_id: str) -> None:
+        with self._lock:
+            batch = self.batches[batch_id]
+            batch["status"] = "in_progress"
+            batch["in_progress_at"] = int(time.time())
+        time.sleep(self.batch_latency)
+
+        lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+        output = []
+        for line in filter(str.strip, lines):
+            request = json.loads(line)
+            body = request["body"]
+            if body.get("model") == self.fail_first_model:
+                completion = self.complete({**body, "response_format": {"type": "json_object"}})
+                completion["choices"][0]["message"]["content"] = "{}"
+            else:
+                completion = self.complete(body)
+            with self._lock:
+                self.requests += 1
+            output.append(json.dumps({
+                "id": f"batch_req_{next(self._ids)}", "custom_id": request["custom_id"], "error": None,
+                "response": {"status_code": 200, "request_id": f"req_{next(self._ids)}", "body": completion}
+            }))
+
+        output_file = self._store_file(f"{batch_id}_output.jsonl", ("\n".join(output) + "\n").encode("utf-8"),
+                                       "batch_output")
+        with self._lock:
+            batch.update({
+                "status": "completed", "output_file_id": output_file["id"], "completed_at": int(time.time()),
+                "request_counts": {"total": len(output), "completed": len(output), "failed": 0}
+            })
@@ -0,0 +1,96 @@
+"""
+Local web server serving fixture pages for the direct fetch path.
+
+Serves benchmarks/fixtures/site: static HTML pages under /static/, and a
+single-page app shell for every path under /app/, as a client-side routed
+site would. Latency is configurable and requests are counted. The same
+server is reachable as 127.0.0.1 and as localhost, which the direct fetcher
+treats as two domains.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "site"
+
+
+class FakeSiteServer:
+    def __init__(self, latency: float = 0.02, root: Path = FIXTURE_DIR, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            latency (float): Seconds added to every response
+            root (Path): Directory of fixture pages
+            host (str): Interface to bind to
+            port (int): Port to bind to, 0 picks a free port
+        """
+        self.latency = latency
+        self.root = root
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def url(self, path: str, host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{self.port}{path}"
+
+    def static_urls(self, host: str = "127.0.0.1"):
+        return [self.url(f"/static/{page.name}", host) for page in sorted((self.root / "static").glob("*.html"))]
+
+    def respond(self, path: str):
+        """
+        Build the response for a GET request.
+
+        Returns:
+            Tuple[int, str, bytes]: HTTP status code, content type and body
+        """
+        path = path.split("?", 1)[0]
+        if path.startswith("/app/") or path == "/app":
+            return 200, "text/html; charset=utf-8", (self.root / "app" / "index.html").read_bytes()
+        page = (self.root / path.lstrip("/")).resolve()
+        if self.root.resolve() in page.parents and page.is_file():
+            content_type = "text/html; charset=utf-8" if page.suffix == ".html" else "application/octet-stream"
+            return 200, content_type, page.read_bytes()
+        return 404, "text/html; charset=utf-8", b"<html><body><h1>Not found</h1></body></html>"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server.latency)
+                status, content_type, body = server.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeSiteServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -2,9 +2,19 @@
 Data Points Manager for handling scraping session state.
 
 This module provides centralized management of data points and scraping state
-for AI agent sessions.
+for AI agent sessions. Data points are indexed by name, the set of missing data
+points is maintained as values change, all access is guarded by a lock so
+concurrent tool calls can share a manager, and listeners are notified of every
+change.
 """
 
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from utils.near_duplicates import FingerprintIndex
+from utils.url_frontier import UrlFrontier
+
 data_point_manager = None
 
 def get_data_point_manager(initial_data_points=None):
@@ -16,49 +26,153 @@ def get_data_point_manager(initial_data_points=None):
             data_point_manager = DataPointManager(initial_data_points)
     return data_point_manager
 
+@dataclass
+class DataPointChange:
+    name: str
+    previous_value: Any
+    value: Any
+    reference: Optional[str]
+    confidence: Optional[float] = None
+
+
 class DataPointManager:
-    def __init__(self, initial_data_points):
+    def __init__(self, initial_data_points, entity_name=None):
         """
         Initialize the data points manager.
         
         Args:
             initial_data_points (List[dict]): Initial data points structure
+            entity_name (str, optional): Name of the entity the session researches
         """
         self.data_points = initial_data_points
-        self.links_scraped = []
+        self.entity_name = entity_name
+        self.frontier = UrlFrontier()
+        self.page_fingerprints = FingerprintIndex()
+
+        self._lock = threading.RLock()
+        self._listeners = []
+        # First data point with each name, as update_data_point always updated the first match
+        self._index = {}
+        for obj in initial_data_points:
+            self._index.setdefault(obj["name"], obj)
+        self._position = {name: position for position, name in enumerate(self._index)}
+        self._missing = {obj["name"] for obj in self._index.values() if obj["value"] is None}
+        self._missing_snapshot = None
+        self._confidence = {}
     
-    def update_data_point(self, name, value, reference):
+    def update_data_point(self, name, value, reference, confidence=None):
         """
-        Update a specific data point.
+        Update a specific data point and notify listeners of the change.
         
         Args:
             name (str): Name of the data point to update
             value (str): Value to set
             reference (str): Reference URL or source
+            confidence (float, optional): How certain the value is, from 0 to 1
+        
+        Returns:
+            bool: True if a data point with this name exists
         """
-        for obj in self.data_points:
-            if obj["name"] == name:
-                obj["value"] = value
-                obj["reference"] = reference
-                break
+        with self._lock:
+            obj = self._index.get(name)
+            if obj is None:
+                return False
+
+            change = DataPointChange(name, obj["value"], value, reference, confidence)
+            obj["value"] = value
+            obj["reference"] = reference
+            self._confidence[name] = confidence
+
+            if value is None:
+                self._missing.add(name)
+            else:
+                self._missing.discard(name)
+            self._missing_snapshot = None
+            listeners = list(self._listeners)
+
+        # Notify outside the lock so listeners may read the manager
+        for listener in listeners:
+            try:
+                listener(change)
+            except Exception as e:
+                print(f"Data point listener failed: {str(e)}")
+        return True
     
     def get_missing_data_points(self):
         """
         Get list of data point names that still need values.
         
         Returns:
-            List[str]: Names of data points with None values
+            List[str]: Names of data points with None values, in their original order
         """
-        return [obj["name"] for obj in self.data_points if obj["value"] is None]
+        with self._lock:
+            if self._missing_snapshot is None:
+                self._missing_snapshot = tuple(sorted(self._missing, key=self._position.__getitem__))
+            return list(self._missing_snapshot)
+    
+    def missing_count(self):
+        """
+        Get the number of data points that still need values.
+        
+        Returns:
+            int: Number of data points with None values
+        """
+        return len(self._missing)
+    
+    def get_confidence(self, name):
+        """
+        Get the confidence given with the current value of a data point.
+        
+        Args:
+            name (str): Name of the data point
+        
+        Returns:
+            Optional[float]: The confidence, or None if none was given
+        """
+        with self._lock:
+            return self._confidence.get(name)
     
     def get_current_state(self):
         """
         Get current state of all data points.
         
         Returns:
-            List[dict]: Current data points with their values and references
+            List[dict]: Snapshot of the data points with their values and references
+        """
+        with self._lock:
+            return [dict(obj) for obj in self.data_points]
+    
+    def add_listener(self, listener: Callable[[DataPointChange], None]):
+        """
+        Subscribe to data point changes.
+        
+        Args:
+            listener (Callable[[DataPointChange], None]): Called after every update
+        """
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[DataPointChange], None]):
         """
-        return self.data_points
+        Unsubscribe from data point changes.
+        
+        Args:
+            listener (Callable[[DataPointChange], None]): A previously added listener
+        """
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+    
+    def start_conversation(self):
+        """
+        Start a new agent conversation on this session's state.
+        
+        Near duplicates are only detected among the pages of the current
+        conversation, as the agent has not seen the pages of earlier ones,
+        e.g. those of the website flow when the search flow starts.
+        """
+        with self._lock:
+            self.page_fingerprints = FingerprintIndex()
     
     def add_scraped_link(self, link):
         """
@@ -66,15 +180,33 @@ class DataPointManager:
         
         Args:
             link (str): URL that was scraped
+        
+        Returns:
+            bool: True if no spelling of the link had been scraped in this session
         """
-        if link not in self.links_scraped:
-            self.links_scraped.append(link)
+        return self.frontier.mark_fetched(link)
+    
+    def has_scraped_link(self, link):
+        """
+        Check whether a link, in any spelling, was already scraped in this session.
+        
+        Args:
+            link (str): URL to check
+        
+        Returns:
+            bool: True if the page was already scraped
+        """
+        return self.frontier.is_fetched(link)
     
     def get_scraped_links(self):
         """
         Get list of already scraped links.
         
         Returns:
-            List[str]: URLs that have been scraped
+            List[str]: URLs that have been scraped, one per distinct page
         """
-        return self.links_scraped 
\ No newline at end of file
+        return self.frontier.fetched_urls()
+    
+    @property
+    def links_scraped(self):
+        return self.get_scraped_links() 
\ No newline at end of file
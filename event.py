@@ -1,11 +1,199 @@
-subscribers = {}
+"""
+Event bus connecting the steps of an agent session.
 
-def subscribe(event_name, fn):
-    if event_name not in subscribers:
-        subscribers[event_name] = []
-    subscribers[event_name].append(fn)
+publish() queues an event instead of calling subscribers straight away. The
+outermost publish on a thread drains the queue in a loop, so a handler that
+publishes the next event returns before that event is handled. Stack depth
+and the number of live event payloads therefore stay constant however many
+turns a session runs.
 
-def publish(event_name, data):
-    if event_name in subscribers:
-        for fn in subscribers[event_name]:
-            fn(data)
+Events are dispatched highest priority first (FIFO within a priority), and
+subscribers of one event are called highest priority first. Subscribers may
+be coroutine functions. Each session can use its own bus through
+use_event_bus(); otherwise the module level default bus is used. Handling
+of each event is recorded as an "event.<name>" span when tracing is enabled.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from utils.tracing import span
+
+
+class EventBus:
+    def __init__(self, subscribers=None):
+        """
+        Initialize an event bus.
+
+        Args:
+            subscribers (dict, optional): Subscriber table to share with another bus
+        """
+        self.subscribers = subscribers if subscribers is not None else {}
+        self._sequence = itertools.count()
+        # Queue and dispatch state are per thread, so sessions running on
+        # different threads never drain each other's events
+        self._local = threading.local()
+        self._background_tasks = set()
+
+    def _state(self):
+        local = self._local
+        if not hasattr(local, "queue"):
+            local.queue = []
+            local.dispatching = False
+        return local
+
+    def fork(self):
+        """
+        Create a bus with the same subscribers but its own event queue.
+
+        Returns:
+            EventBus: A bus for a single session
+        """
+        return EventBus(self.subscribers)
+
+    def subscribe(self, event_name, fn, priority=0):
+        """
+        Subscribe a function to an event.
+
+        Args:
+            event_name (str): Name of the event
+            fn (Callable): Function called with the event data, may be async
+            priority (int): Subscribers with higher priority are called first
+        """
+        handlers = self.subscribers.setdefault(event_name, [])
+        handlers.append((priority, fn))
+        # Stable sort keeps subscription order within a priority
+        handlers.sort(key=lambda handler: -handler[0])
+
+    def unsubscribe(self, event_name, fn):
+        """
+        Remove a function from an event's subscribers.
+
+        Args:
+            event_name (str): Name of the event
+            fn (Callable): The subscribed function
+        """
+        if event_name in self.subscribers:
+            self.subscribers[event_name] = [
+                (priority, handler) for priority, handler in self.subscribers[event_name] if handler is not fn
+            ]
+
+    def _enqueue(self, event_name, data, priority):
+        heapq.heappush(self._state().queue, (-priority, next(self._sequence), event_name, data))
+
+    def publish(self, event_name, data, priority=0):
+        """
+        Queue an event and, unless already dispatching on this thread, dispatch the queue.
+
+        Args:
+            event_name (str): Name of the event
+            data: Event data passed to the subscribers
+            priority (int): Events with higher priority are dispatched first
+        """
+        self._enqueue(event_name, data, priority)
+        state = self._state()
+        if state.dispatching:
+            return
+
+        state.dispatching = True
+        try:
+            while state.queue:
+                _, _, name, event_data = heapq.heappop(state.queue)
+                with span(f"event.{name}"):
+                    for _, fn in list(self.subscribers.get(name, [])):
+                        result = fn(event_data)
+                        if asyncio.iscoroutine(result):
+                            self._run_coroutine(result)
+                # Drop the reference so handled payloads can be freed
+                event_data = None
+        except BaseException:
+            state.queue.clear()
+            raise
+        finally:
+            state.dispatching = False
+
+    async def publish_async(self, event_name, data, priority=0):
+        """
+        Queue an event and dispatch the queue, awaiting async subscribers.
+
+        Args:
+            event_name (str): Name of the event
+            data: Event data passed to the subscribers
+            priority (int): Events with higher priority are dispatched first
+        """
+        self._enqueue(event_name, data, priority)
+        state = self._state()
+        if state.dispatching:
+            return
+
+        state.dispatching = True
+        try:
+            while state.queue:
+                _, _, name, event_data = heapq.heappop(state.queue)
+                with span(f"event.{name}"):
+                    for _, fn in list(self.subscribers.get(name, [])):
+                        result = fn(event_data)
+                        if asyncio.iscoroutine(result):
+                            await result
+                event_data = None
+        except BaseException:
+            state.queue.clear()
+            raise
+        finally:
+            state.dispatching = False
+
+    def _run_coroutine(self, coroutine):
+        # Called from sync dispatch: run to completion, or schedule on the running loop
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(coroutine)
+            return
+        task = loop.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+
+default_bus = EventBus()
+_current_bus = ContextVar("event_bus", default=None)
+
+
+def get_event_bus():
+    """
+    Get the bus for the current session.
+
+    Returns:
+        EventBus: The bus set by use_event_bus(), or the default bus
+    """
+    return _current_bus.get() or default_bus
+
+
+@contextmanager
+def use_event_bus(bus):
+    """
+    Route subscribe/publish calls in this context to a specific bus.
+
+    Args:
+        bus (EventBus): The session's bus
+    """
+    token = _current_bus.set(bus)
+    try:
+        yield bus
+    finally:
+        _current_bus.reset(token)
+
+
+def subscribe(event_name, fn, priority=0):
+    get_event_bus().subscribe(event_name, fn, priority)
+
+
+def publish(event_name, data, priority=0):
+    get_event_bus().publish(event_name, data, priority)
+
+
+async def publish_async(event_name, data, priority=0):
+    await get_event_bus().publish_async(event_name, data, priority)
@@ -0,0 +1,273 @@
+"""
+Offline research of many entities through the OpenAI Batch API.
+
+For overnight runs where throughput and cost matter more than latency. Instead
+of running an agent session per entity, every entity gets one web search
+whose results are parsed with the parse_search_result prompt, and optionally
+a single-shot extraction of its website with the extract_data_points prompt.
+All extraction requests are collected into Batch API input files, submitted
+and polled asynchronously, and the data points found are merged back into
+each entity's DataPointManager.
+
+Requests whose response is invalid or empty JSON are resubmitted with the
+next model of their route ("search_parse" or "extract"), so a cheap first
+model can handle most of the work. Results are written in the same JSONL
+format as the batch runner.
+
+Batches are named after the run. An interrupted run, or one that gave up
+waiting after --timeout, can be rerun with the same --run-name to pick up the
+batches it already submitted instead of paying for them again.
+
+Usage:
+    python -m offline_batch entities.jsonl results.jsonl --single-shot
+    python -m offline_batch entities.jsonl results.jsonl --single-shot --run-name extract-1760000000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from batch import DEFAULT_MODEL, DEFAULT_WORKERS, load_entities
+from data_point_manager import DataPointManager
+from tools.scrape import fetch_markdown
+from tools.search import build_parse_prompt, get_search_results, parse_extraction
+from utils.batch_api import BatchError, BatchRequest, BatchRunner
+from utils.model_router import get_model_router
+from utils.prompt_loader import load_prompt
+from utils.relevance import get_relevance_filter
+
+# Characters of a website page sent for single-shot extraction when no relevance filter is configured
+MAX_PAGE_CHARS = 40000
+
+
+def build_search_query(entity: Dict) -> str:
+    return f"{entity['entity_name']} {' '.join(name.replace('_', ' ') for name in entity['data_points'])}"
+
+
+def build_extract_prompt(entity: Dict, markdown_content: str) -> str:
+    """
+    Build the single-shot extraction prompt for an entity's website.
+
+    Args:
+        entity (Dict): Entity spec with entity_name, website and data_points
+        markdown_content (str): The website's markdown
+
+    Returns:
+        str: The extract_data_points prompt
+    """
+    relevance_filter = get_relevance_filter()
+    if relevance_filter:
+        markdown_content = relevance_filter.filter(markdown_content, entity["entity_name"], entity["data_points"])
+    else:
+        markdown_content = markdown_content[:MAX_PAGE_CHARS]
+
+    return load_prompt('extract_data_points', {
+        "entity_name": entity["entity_name"],
+        "website": entity["website"],
+        "page_content": markdown_content,
+        "data_points": ', '.join(entity["data_points"])
+    })
+
+
+def collect_prompts(index: int, entity: Dict, single_shot: bool) -> Dict[str, Dict]:
+    """
+    Gather the inputs of an entity's extraction requests.
+
+    Args:
+        index (int): Position of the entity, used in the request custom ids
+        entity (Dict): Entity spec
+        single_shot (bool): Also extract from the entity's website, if it has one
+
+    Returns:
+        Dict[str, Dict]: Route and prompt of each request, keyed by custom id
+    """
+    prompts = {}
+    search_result_str = get_search_results(build_search_query(entity))
+    prompts[f"{index}:search"] = {
+        "route": "search_parse",
+        "prompt": build_parse_prompt(search_result_str, entity["entity_name"], entity["data_points"])
+    }
+
+    if single_shot and entity.get("website"):
+        try:
+            prompts[f"{index}:extract"] = {
+                "route": "extract",
+                "prompt": build_extract_prompt(entity, fetch_markdown(entity["website"]))
+            }
+        except Exception as e:
+            print(f"Unable to scrape the url {entity['website']}: {str(e)}")
+    return prompts
+
+
+async def run_extractions(prompts: Dict[str, Dict], runner: BatchRunner, default_model: str,
+                          name: str) -> Dict[str, Optional[Dict]]:
+    """
+    Run extraction prompts as batches, escalating rejected requests along their route.
+
+    Args:
+        prompts (Dict[str, Dict]): Route and prompt keyed by custom id
+        runner (BatchRunner): Submits and polls the batches
+        default_model (str): Model used for None entries of the routes
+        name (str): Prefix of the batch input files
+
+    Returns:
+        Dict[str, Optional[Dict]]: The parsed extraction of each custom id, or None
+    """
+    router = get_model_router()
+    results = {custom_id: None for custom_id in prompts}
+    pending = dict(prompts)
+    round_index = 0
+
+    while pending:
+        requests = []
+        for custom_id, entry in pending.items():
+            models = router.models(entry["route"], default_model)
+            if round_index < len(models):
+                requests.append(BatchRequest(custom_id, {
+                    "model": models[round_index],
+                    "messages": [{"role": "user", "content": entry["prompt"]}],
+                    "response_format": {"type": "json_object"}
+                }))
+        if not requests:
+            break
+
+        print(f"Submitting {len(requests)} extraction requests (round {round_index + 1})")
+        responses = await runner.run(requests, f"{name}-round{round_index}")
+
+        rejected = {}
+        for request in requests:
+            body = responses.get(request.custom_id)
+            content = body["choices"][0]["message"]["content"] if body else None
+            parsed = parse_extraction(content)
+            if parsed is not None:
+                results[request.custom_id] = parsed
+            else:
+                rejected[request.custom_id] = pending[request.custom_id]
+        pending = rejected
+        round_index += 1
+
+    return results
+
+
+def merge_extraction(data_point_manager: DataPointManager, extraction: Optional[Dict]) -> int:
+    """
+    Fill the data points an extraction found that are still missing.
+
+    Args:
+        data_point_manager (DataPointManager): The entity's session state
+        extraction (Optional[Dict]): Parsed response with an "info_found" list
+
+    Returns:
+        int: Number of data points filled
+    """
+    if not extraction:
+        return 0
+
+    filled = 0
+    missing = set(data_point_manager.get_missing_data_points())
+    for info in extraction.get("info_found") or []:
+        if not isinstance(info, dict):
+            continue
+        name = info.get("data_point")
+        if name in missing and info.get("value") not in (None, ""):
+            data_point_manager.update_data_point(name, info["value"], info.get("reference"))
+            missing.discard(name)
+            filled += 1
+    return filled
+
+
+def run_offline_batch(input_path: str, output_path: str, async_client, default_model: str = DEFAULT_MODEL,
+                      single_shot: bool = False, max_workers: int = DEFAULT_WORKERS, work_dir: str = ".cache/batches",
+                      poll_interval: float = 30.0, run_name: Optional[str] = None,
+                      timeout: Optional[float] = None) -> int:
+    """
+    Research every entity in the input file with batched extractions.
+
+    Args:
+        input_path (str): Path to the JSONL or CSV entity file
+        output_path (str): Path of the JSONL file results are written to
+        async_client (AsyncOpenAI): Client for the files and batches endpoints
+        default_model (str): Model used for None entries of the routes
+        single_shot (bool): Also extract from each entity's website
+        max_workers (int): Number of searches and scrapes running at once
+        work_dir (str): Directory for batch input files and the batch manifest
+        poll_interval (float): Longest wait between batch status checks
+        run_name (str, optional): Name of the run's batches; reuse the name of an
+            interrupted run to resume it. Defaults to a new name.
+        timeout (float, optional): Seconds to wait for each batch before giving up
+
+    Returns:
+        int: Number of entities whose inputs could not be gathered
+
+    Raises:
+        BatchError: If a batch is still running after timeout seconds
+    """
+    entities = load_entities(input_path)
+    failures = 0
+    errors = {}
+    prompts = {}
+
+    # Searches and scrapes are I/O bound and go through the shared clients and caches
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(collect_prompts, index, entity, single_shot) for index, entity in enumerate(entities)]
+        for index, future in enumerate(futures):
+            try:
+                prompts.update(future.result())
+            except Exception as e:
+                print(f"Research failed for {entities[index]['entity_name']}: {str(e)}")
+                errors[index] = str(e)
+                failures += 1
+
+    run_name = run_name or f"extract-{int(time.time())}"
+    runner = BatchRunner(async_client, work_dir=work_dir, poll_interval=poll_interval, timeout=timeout)
+    print(f"Running extractions as {run_name}")
+    try:
+        extractions = asyncio.run(run_extractions(prompts, runner, default_model, run_name))
+    except BatchError as e:
+        print(f"{str(e)}; rerun with --run-name {run_name} to pick up the submitted batches")
+        raise
+
+    with open(output_path, "w") as out:
+        for index, entity in enumerate(entities):
+            data_point_manager = DataPointManager([
+                {"name": name, "value": None, "reference": None} for name in entity["data_points"]
+            ], entity_name=entity["entity_name"])
+            # The entity's own website is the more reliable source
+            merge_extraction(data_point_manager, extractions.get(f"{index}:extract"))
+            merge_extraction(data_point_manager, extractions.get(f"{index}:search"))
+            if f"{index}:extract" in prompts:
+                data_point_manager.add_scraped_link(entity["website"])
+
+            out.write(json.dumps({
+                "entity_name": entity["entity_name"],
+                "data_points": data_point_manager.get_current_state(),
+                "links_scraped": data_point_manager.get_scraped_links(),
+                "error": errors.get(index)
+            }) + "\n")
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Research many entities with the OpenAI Batch API")
+    parser.add_argument("input_path", help="JSONL or CSV file of entities and data points")
+    parser.add_argument("output_path", help="JSONL file to write results to")
+    parser.add_argument("--single-shot", action="store_true",
+                        help="Also extract the data points from each entity's website in one request")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of parallel searches and scrapes")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="OpenAI model for routes without an explicit model")
+    parser.add_argument("--work-dir", default=".cache/batches", help="Directory for batch input files")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="Longest wait between batch status checks")
+    parser.add_argument("--run-name", default=None,
+                        help="Name of the run's batches; pass the name of an interrupted run to resume it")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds to wait for each batch before giving up")
+    args = parser.parse_args()
+
+    failed = run_offline_batch(args.input_path, args.output_path, AsyncOpenAI(), args.model, args.single_shot,
+                               args.workers, args.work_dir, args.poll_interval, args.run_name, args.timeout)
+    print(f"Offline batch finished with {failed} failures")
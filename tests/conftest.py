@@ -0,0 +1,85 @@
+import pytest
+from openai import AsyncOpenAI, OpenAI
+
+import agent.stopping
+import event
+import utils.chat_utils
+import utils.direct_fetch
+import utils.firecrawl_client
+import utils.memory
+import utils.model_router
+import utils.near_duplicates
+import utils.page_store
+import utils.pre_extraction
+import utils.prefetcher
+import utils.pretty_print
+import utils.relevance
+import utils.scrape_cache
+import utils.search_cache
+import utils.token_counter
+import utils.url_frontier
+from agent.handlers import setup_event_handlers as setup_agent_event_handlers
+from agent.stopping import StoppingPolicy
+from benchmarks.fake_firecrawl import FakeFirecrawlServer
+from benchmarks.fake_openai import ScriptedOpenAIServer
+from event import EventBus
+from utils.firecrawl_client import FirecrawlClient
+from utils.memory import MemoryPolicy
+from utils.model_router import ModelRouter
+from utils.url_frontier import DomainPoliteness, FetchedRegistry
+
+
+@pytest.fixture
+def plain_scrapes(monkeypatch):
+    """
+    Turn off every shared scrape layer, whatever config/ enables, so tools fetch every
+    page from Firecrawl and pass it on unchanged. Restored after the test.
+    """
+    for module, name in [(utils.scrape_cache, "scrape_cache"), (utils.relevance, "relevance_filter"),
+                         (utils.page_store, "page_store"), (utils.direct_fetch, "direct_fetcher"),
+                         (utils.prefetcher, "prefetcher"), (utils.near_duplicates, "near_duplicate_detector"),
+                         (utils.pre_extraction, "pre_extractor")]:
+        # False is how the get_ functions remember a disabled layer
+        monkeypatch.setattr(module, name, False)
+    monkeypatch.setattr(utils.url_frontier, "domain_politeness", DomainPoliteness(max_concurrency=64, min_interval=0))
+    monkeypatch.setattr(utils.url_frontier, "fetched_registry", FetchedRegistry())
+
+
+@pytest.fixture
+def word_tokens(monkeypatch):
+    """
+    Count a message's tokens as the words of its text, so conversations can be measured
+    without a tiktoken encoding and token budgets are easy to reason about.
+    """
+    monkeypatch.setattr(utils.token_counter, "count_message_tokens", lambda message, model_name: len(str(message).split()))
+
+
+@pytest.fixture
+def fake_services(monkeypatch, plain_scrapes, word_tokens):
+    """
+    Point the agent at local stand-ins for OpenAI and Firecrawl, with the default scripts.
+
+    Yields:
+        Tuple[ScriptedOpenAIServer, FakeFirecrawlServer]: The running servers; tests may
+            replace the OpenAI server's scripts
+    """
+    monkeypatch.setattr(utils.search_cache, "search_cache", False)
+    monkeypatch.setattr(utils.model_router, "model_router", ModelRouter())
+    monkeypatch.setattr(utils.pretty_print, "print_conversation", False)
+    monkeypatch.setattr(agent.stopping, "stopping_policy", StoppingPolicy())
+    monkeypatch.setattr(utils.memory, "memory_policy", MemoryPolicy())
+    monkeypatch.setattr(event, "default_bus", EventBus())
+    setup_agent_event_handlers()
+
+    with ScriptedOpenAIServer(latency=0) as llm_server, \
+            FakeFirecrawlServer(latency=0.01, page_size=2000) as firecrawl_server:
+        firecrawl_client = FirecrawlClient(api_key="fake", api_url=firecrawl_server.base_url)
+        monkeypatch.setattr(utils.firecrawl_client, "firecrawl_client", firecrawl_client)
+        monkeypatch.setattr(utils.chat_utils, "client", OpenAI(api_key="fake", base_url=llm_server.base_url, max_retries=0))
+        monkeypatch.setattr(utils.chat_utils, "async_client",
+                            AsyncOpenAI(api_key="fake", base_url=llm_server.base_url, max_retries=0))
+        monkeypatch.setattr(utils.chat_utils, "GPT_MODEL", "gpt-4-turbo-2024-04-09")
+        try:
+            yield llm_server, firecrawl_server
+        finally:
+            firecrawl_client.close()
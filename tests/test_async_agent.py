@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent.async_agent import start_agent_async
+from app import website_scrape
+from data_point_manager import DataPointManager
+from event import subscribe
+
+DATA_POINTS = ["num_employees", "office_locations"]
+
+LOOKUP_SCHEMA = [{
+    "type": "function",
+    "function": {"name": "lookup", "description": "Look up a page",
+                 "parameters": {"type": "object", "properties": {"url": {"type": "string"}}, "required": ["url"]}}
+}]
+
+
+class SlowLookup:
+    """
+    Tool that takes a while and records how many of its calls overlap.
+    """
+    def __init__(self, seconds=0.05):
+        self.seconds = seconds
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        if url.endswith("broken"):
+            raise RuntimeError("page is broken")
+        return f"content of {url}"
+
+
+def make_manager(entity_name="Acme"):
+    return DataPointManager([{"name": name, "value": None, "reference": None} for name in DATA_POINTS],
+                            entity_name=entity_name)
+
+
+def test_website_scrape_runs_the_async_loop_to_completion(fake_services):
+    llm_server, firecrawl_server = fake_services
+    manager = make_manager()
+
+    response = website_scrape("Acme", "https://acme.example.com/", max_concurrent_tools=2,
+                              data_point_manager=manager)
+
+    # scrape, scrape_many and update_data turns, then the closing answer
+    assert response == "Finished researching Acme."
+    assert llm_server.requests == 4
+    assert manager.get_current_state()[0]["value"] == "num_employees of Acme"
+    assert manager.get_missing_data_points() == ["office_locations"]
+    assert set(manager.get_scraped_links()) == {"https://acme.example.com/", "https://acme.example.com/about",
+                                                "https://acme.example.com/careers"}
+
+
+def run_lookups(llm_server, urls, lookup, max_concurrent_tools):
+    llm_server.scripts = {"website_scrape": [[{"name": "lookup", "arguments": {"url": url}} for url in urls]]}
+    return asyncio.run(start_agent_async("Entity to search: Acme", "Research companies.", LOOKUP_SCHEMA,
+                                         {"lookup": lookup}, max_concurrent_tools=max_concurrent_tools))
+
+
+def test_tool_calls_of_a_turn_run_concurrently_up_to_the_limit(fake_services):
+    llm_server, _ = fake_services
+    finished = []
+    subscribe("agent_finished", finished.append)
+    urls = [f"https://acme.example.com/{page}" for page in ("slow", "a", "b", "c", "d")]
+    lookup = SlowLookup()
+
+    response = run_lookups(llm_server, urls, lookup, max_concurrent_tools=2)
+
+    assert response == "Finished researching Acme."
+    assert lookup.peak == 2
+    # Results are added in tool call order, whichever call finished first
+    tool_messages = [message for message in finished[0].messages if message.get("role") == "tool"]
+    assert [message["tool_call_id"] for message in tool_messages] == [f"call_s0_0_{index}" for index in range(5)]
+    assert [message["content"] for message in tool_messages] == [f"content of {url}" for url in urls]
+
+
+def test_failed_tool_calls_are_published_after_the_turn_finishes(fake_services):
+    llm_server, _ = fake_services
+    errors = []
+    # Ahead of the default handler, which re-raises the error
+    subscribe("tool_call_error_response", errors.append, priority=1)
+    urls = [f"https://acme.example.com/{page}" for page in ("broken", "a", "b")]
+
+    with pytest.raises(RuntimeError, match="page is broken"):
+        run_lookups(llm_server, urls, SlowLookup(), max_concurrent_tools=3)
+
+    tool_messages = [message for message in errors[0].messages if message.get("role") == "tool"]
+    assert [message["content"] for message in tool_messages] == [
+        "Error: page is broken", "content of https://acme.example.com/a", "content of https://acme.example.com/b"
+    ]
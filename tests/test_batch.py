@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+import batch
+from batch import load_entities, run_batch, run_entity
+
+ENTITIES = [
+    {"entity_name": "Acme Robotics", "website": "https://acme.example.com/", "data_points": ["num_employees", "main_product"]},
+    {"entity_name": "Globex", "website": None, "data_points": ["num_employees"]},
+    {"entity_name": "Initech", "website": "https://initech.example.com/", "data_points": ["office_locations"]},
+]
+
+
+def test_entities_load_from_jsonl_and_csv(tmp_path):
+    jsonl_path = tmp_path / "entities.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(entity) for entity in ENTITIES) + "\n\n")
+    csv_path = tmp_path / "entities.csv"
+    csv_path.write_text("entity_name,website,data_points\n"
+                        "Acme Robotics,https://acme.example.com/,num_employees; main_product\n"
+                        "Globex,,num_employees\n")
+
+    assert load_entities(str(jsonl_path)) == ENTITIES
+    assert load_entities(str(csv_path)) == ENTITIES[:2]
+
+
+@pytest.mark.parametrize("entity", [{"entity_name": "Acme"}, {"entity_name": "", "data_points": ["num_employees"]},
+                                    {"entity_name": "Acme", "data_points": []}])
+def test_entities_need_a_name_and_data_points(tmp_path, entity):
+    path = tmp_path / "entities.jsonl"
+    path.write_text(json.dumps(entity) + "\n")
+
+    with pytest.raises(ValueError, match="entity_name and data_points"):
+        load_entities(str(path))
+
+
+def test_run_entity_scrapes_the_website_then_searches_for_the_rest(fake_services):
+    result = run_entity(ENTITIES[0])
+
+    assert result["error"] is None
+    assert [(point["name"], point["value"]) for point in result["data_points"]] == [
+        ("num_employees", "num_employees of Acme Robotics"), ("main_product", "main_product of Acme Robotics")
+    ]
+    assert set(result["links_scraped"]) == {
+        "https://acme.example.com/", "https://acme.example.com/about", "https://acme.example.com/careers",
+        "https://example.com/acme-robotics-company-facts/0"
+    }
+
+
+@pytest.mark.parametrize("max_concurrent_tools", [None, 2])
+def test_parallel_sessions_keep_their_own_state(fake_services, tmp_path, max_concurrent_tools):
+    input_path = tmp_path / "entities.jsonl"
+    input_path.write_text("\n".join(json.dumps(entity) for entity in ENTITIES))
+    output_path = tmp_path / "results.jsonl"
+
+    failures = run_batch(str(input_path), str(output_path), max_workers=3, max_concurrent_tools=max_concurrent_tools)
+
+    assert failures == 0
+    results = {result["entity_name"]: result for result in map(json.loads, output_path.read_text().splitlines())}
+    assert set(results) == {entity["entity_name"] for entity in ENTITIES}
+    for entity in ENTITIES:
+        # Every value belongs to the entity's own session
+        assert [(point["name"], point["value"]) for point in results[entity["entity_name"]]["data_points"]] == [
+            (name, f"{name} of {entity['entity_name']}") for name in entity["data_points"]
+        ]
+    # Initech's website scrape finds its only data point, so it is never searched for
+    assert set(results["Initech"]["links_scraped"]) == {
+        "https://initech.example.com/", "https://initech.example.com/about", "https://initech.example.com/careers"
+    }
+    assert results["Globex"]["links_scraped"] == ["https://example.com/globex-company-facts/0"]
+
+
+def test_failed_entities_are_written_with_their_error(fake_services, monkeypatch, tmp_path):
+    def internet_search_scrape(entity_name, **kwargs):
+        if entity_name == "Globex":
+            raise RuntimeError("search failed")
+        return "done"
+
+    monkeypatch.setattr(batch, "internet_search_scrape", internet_search_scrape)
+    input_path = tmp_path / "entities.jsonl"
+    input_path.write_text("\n".join(json.dumps(entity) for entity in ENTITIES[:2]))
+    output_path = tmp_path / "results.jsonl"
+
+    failures = run_batch(str(input_path), str(output_path), max_workers=2)
+
+    assert failures == 1
+    results = {result["entity_name"]: result for result in map(json.loads, output_path.read_text().splitlines())}
+    assert results["Globex"] == {"entity_name": "Globex", "data_points": None, "links_scraped": None,
+                                 "error": "search failed"}
+    assert results["Acme Robotics"]["error"] is None
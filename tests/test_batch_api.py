@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+from openai import AsyncOpenAI
+
+from benchmarks.fake_openai import BatchOpenAIServer
+from utils.batch_api import BatchError, BatchRequest, BatchRunner, parse_batch_output, write_batch_file
+
+
+def extraction_request(custom_id: str, entity_name: str) -> BatchRequest:
+    return BatchRequest(custom_id, {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": f"Find information about {entity_name} regarding these data "
+                                                 f"points: num_employees"}],
+        "response_format": {"type": "json_object"}
+    })
+
+
+def info_found(body):
+    return json.loads(body["choices"][0]["message"]["content"])["info_found"]
+
+
+@pytest.fixture
+def server():
+    with BatchOpenAIServer(batch_latency=0.05, latency=0) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return AsyncOpenAI(api_key="fake", base_url=server.base_url, max_retries=0)
+
+
+def make_runner(client, tmp_path, **kwargs) -> BatchRunner:
+    return BatchRunner(client, work_dir=str(tmp_path), poll_interval=0.05, initial_poll_interval=0.01, **kwargs)
+
+
+def test_batch_files_round_trip(tmp_path):
+    path = write_batch_file([extraction_request("0:search", "Acme")], tmp_path / "in" / "batch.jsonl")
+    line = json.loads(path.read_text())
+    assert line["custom_id"] == "0:search"
+    assert line["url"] == "/v1/chat/completions"
+
+    output = "\n".join([
+        json.dumps({"custom_id": "ok", "error": None, "response": {"status_code": 200, "body": {"id": "1"}}}),
+        json.dumps({"custom_id": "rejected", "error": None, "response": {"status_code": 400, "body": {}}}),
+        json.dumps({"custom_id": "failed", "error": {"message": "boom"}, "response": None}),
+    ])
+    assert parse_batch_output(output) == {"ok": {"id": "1"}, "rejected": None, "failed": None}
+
+
+def test_run_splits_requests_and_matches_results(server, client, tmp_path):
+    requests = [extraction_request(f"{index}:search", f"Company {index}") for index in range(5)]
+    runner = make_runner(client, tmp_path, max_requests_per_batch=2)
+
+    results = asyncio.run(runner.run(requests, "test"))
+
+    assert len(server.batches) == 3
+    assert set(results) == {request.custom_id for request in requests}
+    assert info_found(results["3:search"])[0]["value"] == "num_employees of Company 3"
+
+
+def test_wait_times_out(client, server, tmp_path):
+    server.batch_latency = 5
+    runner = make_runner(client, tmp_path, timeout=0.2)
+
+    with pytest.raises(BatchError, match="still in_progress"):
+        asyncio.run(runner.run([extraction_request("0:search", "Acme")], "slow"))
+
+
+def test_run_under_same_name_resumes_submitted_batches(server, client, tmp_path):
+    requests = [extraction_request(f"{index}:search", f"Company {index}") for index in range(3)]
+    batch_ids = asyncio.run(make_runner(client, tmp_path).submit(requests, "nightly"))
+    # A run killed while writing the manifest leaves a partial line
+    with open(tmp_path / "manifest.jsonl", "a") as f:
+        f.write('{"name": "nightly", "batch')
+
+    results = asyncio.run(make_runner(client, tmp_path).run(requests, "nightly"))
+
+    assert list(server.batches) == batch_ids
+    assert all(results[request.custom_id] for request in requests)
+
+    # Later submissions are not lost to the partial line
+    runner = make_runner(client, tmp_path)
+    asyncio.run(runner.submit(requests, "next"))
+    assert len(runner.submitted("next")) == 1
+
+
+def test_other_names_and_changed_inputs_are_submitted_again(server, client, tmp_path):
+    requests = [extraction_request(f"{index}:search", f"Company {index}") for index in range(3)]
+    runner = make_runner(client, tmp_path)
+    asyncio.run(runner.submit(requests, "nightly"))
+
+    asyncio.run(runner.run(requests, "other"))
+    asyncio.run(runner.run(requests[:2], "nightly"))
+
+    assert len(server.batches) == 3
+    assert [entry["requests"] for entry in runner.submitted("nightly")] == [3, 2]
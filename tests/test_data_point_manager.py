@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from data_point_manager import DataPointManager
+
+NAMES = [f"point_{index}" for index in range(50)]
+
+
+def make_manager(names=NAMES) -> DataPointManager:
+    return DataPointManager([{"name": name, "value": None, "reference": None} for name in names], "Acme")
+
+
+def test_missing_data_points_keep_their_original_order():
+    manager = make_manager(["num_employees", "founding_year", "headquarters"])
+
+    manager.update_data_point("founding_year", "1999", "https://acme.com")
+    assert manager.get_missing_data_points() == ["num_employees", "headquarters"]
+
+    manager.update_data_point("founding_year", None, None)
+    assert manager.get_missing_data_points() == ["num_employees", "founding_year", "headquarters"]
+    assert manager.missing_count() == 3
+
+
+def test_updates_go_to_the_first_data_point_with_a_name():
+    manager = DataPointManager([{"name": "office", "value": None, "reference": None},
+                                {"name": "office", "value": None, "reference": None}])
+
+    assert manager.update_data_point("office", "Paris", "https://acme.com", confidence=0.7)
+    assert not manager.update_data_point("unknown", "x", None)
+
+    assert [point["value"] for point in manager.get_current_state()] == ["Paris", None]
+    assert manager.get_confidence("office") == 0.7
+    assert manager.get_missing_data_points() == []
+
+
+def test_state_snapshots_are_copies():
+    manager = make_manager(["num_employees"])
+
+    manager.get_current_state()[0]["value"] = "changed"
+    manager.get_missing_data_points().clear()
+
+    assert manager.get_current_state()[0]["value"] is None
+    assert manager.get_missing_data_points() == ["num_employees"]
+
+
+def test_concurrent_updates_keep_the_missing_set_consistent():
+    manager = make_manager()
+    changes = []
+    manager.add_listener(changes.append)
+    start = threading.Barrier(8)
+
+    def fill(worker):
+        start.wait(timeout=5)
+        for name in NAMES[worker::8]:
+            # Every update is seen by a reader racing with the writers
+            assert manager.update_data_point(name, f"value of {name}", f"https://acme.com/{worker}")
+            assert name not in manager.get_missing_data_points()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(fill, range(8)))
+
+    assert manager.get_missing_data_points() == []
+    assert manager.missing_count() == 0
+    assert sorted(change.name for change in changes) == sorted(NAMES)
+    assert all(point["value"] == f"value of {point['name']}" for point in manager.get_current_state())
+
+
+def test_listeners_can_read_the_manager_and_failing_listeners_are_skipped(capsys):
+    manager = make_manager(["num_employees", "founding_year"])
+    seen = []
+
+    def failing(change):
+        raise RuntimeError("listener broke")
+
+    def reader(change):
+        seen.append((change.name, change.previous_value, change.value, manager.get_missing_data_points()))
+
+    manager.add_listener(failing)
+    manager.add_listener(reader)
+    manager.update_data_point("num_employees", "1,200", "https://acme.com")
+    manager.remove_listener(reader)
+    manager.update_data_point("num_employees", "1,300", "https://acme.com")
+
+    assert seen == [("num_employees", None, "1,200", ["founding_year"])]
+    assert capsys.readouterr().out.count("Data point listener failed: listener broke") == 2
@@ -0,0 +1,122 @@
+import socket
+
+import pytest
+
+from benchmarks.fake_site import FakeSiteServer
+from utils.direct_fetch import DirectFetcher, DirectFetchRejected
+
+ARTICLE = "<p>" + "Globex makes widgets for industrial customers in many countries. " * 10 + "</p>"
+
+
+class ScriptedSiteServer(FakeSiteServer):
+    """Fixture site with extra pages for each reason a direct fetch falls back."""
+
+    app_is_static = False
+
+    def respond(self, path):
+        if path == "/report.pdf":
+            return 200, "application/pdf", b"%PDF-1.4 " + b"x" * 1000
+        if path == "/huge":
+            return 200, "text/html", b"<html><body>" + ARTICLE.encode() * 100 + b"</body></html>"
+        if path == "/thin":
+            return 200, "text/html", b"<html><body><p>Coming soon.</p></body></html>"
+        if path == "/notes.txt":
+            return 200, "text/plain", ARTICLE[3:-4].encode()
+        if path.startswith("/app/") and self.app_is_static:
+            return 200, "text/html", f"<html><body>{ARTICLE}</body></html>".encode()
+        return super().respond(path)
+
+
+@pytest.fixture
+def site():
+    with ScriptedSiteServer(latency=0) as site:
+        yield site
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = DirectFetcher(max_bytes=5000, timeout=2.0, learn_after=2, reprobe_every=3)
+    yield fetcher
+    fetcher.close()
+
+
+def closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/"
+
+
+def test_static_page_is_fetched_without_fallback(site, fetcher):
+    fallback_calls = []
+
+    markdown = fetcher.fetch(site.url("/static/about.html"), fallback_calls.append)
+
+    assert fallback_calls == []
+    assert "# About Acme Robotics" in markdown
+    assert "<" not in markdown
+    assert fetcher.stats()["direct"] == 1
+
+
+def test_plain_text_is_served_as_is(site, fetcher):
+    assert fetcher.fetch_direct(site.url("/notes.txt")).startswith("Globex makes widgets")
+
+
+@pytest.mark.parametrize("path, reason", [
+    ("/missing.html", "status_404"),
+    ("/report.pdf", "content_type"),
+    ("/huge", "too_large"),
+    ("/thin", "thin"),
+    ("/app/dashboard", "javascript"),
+])
+def test_fetch_direct_rejects_with_reason(site, fetcher, path, reason):
+    with pytest.raises(DirectFetchRejected) as rejected:
+        fetcher.fetch_direct(site.url(path))
+    assert rejected.value.reason == reason
+
+
+def test_connection_errors_fall_back(fetcher):
+    url = closed_port_url()
+
+    assert fetcher.fetch(url, lambda fallback_url: f"firecrawl {fallback_url}") == f"firecrawl {url}"
+    assert fetcher.stats()["fallbacks"] == {"error": 1}
+
+
+def test_domain_learns_to_skip_direct_path_and_reprobes(site, fetcher):
+    fallback_calls = []
+
+    def fallback(url):
+        fallback_calls.append(url)
+        return "rendered"
+
+    for index in range(8):
+        fetcher.fetch(site.url(f"/app/page/{index}", "localhost"), fallback)
+
+    stats = fetcher.stats()
+    assert len(fallback_calls) == 8
+    # Two fallbacks teach the domain; of the six skips after that, every third is a probe
+    assert stats["fallbacks"] == {"javascript": 4}
+    assert stats["probes"] == 2
+    assert stats["skipped"] == 4
+    assert site.requests == 4
+    assert fetcher.domains() == {"localhost": {"direct": 0, "fallbacks": 4, "path": "firecrawl"}}
+    assert not fetcher.prefers_direct(site.url("/app/other", "localhost"))
+
+    # Learning is per domain
+    assert fetcher.prefers_direct(site.url("/app/other"))
+    fetcher.fetch(site.url("/static/team.html"), fallback)
+    assert fetcher.domains()["127.0.0.1"]["path"] == "direct"
+
+
+def test_successful_probe_brings_domain_back_to_direct(site, fetcher):
+    for index in range(2):
+        fetcher.fetch(site.url(f"/app/page/{index}", "localhost"), lambda url: "rendered")
+    assert fetcher.domains()["localhost"]["path"] == "firecrawl"
+
+    site.app_is_static = True
+    results = [fetcher.fetch(site.url(f"/app/page/{index}", "localhost"), lambda url: "rendered")
+               for index in range(2, 5)]
+
+    assert results[:2] == ["rendered", "rendered"]
+    assert results[2].startswith("Globex makes widgets")
+    assert fetcher.domains()["localhost"] == {"direct": 1, "fallbacks": 2, "path": "direct"}
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+
+import pytest
+
+from event import EventBus, get_event_bus, publish, subscribe, use_event_bus
+
+
+def test_handler_publishing_returns_before_the_next_event_is_handled():
+    bus = EventBus()
+    calls = []
+
+    def on_turn(turn):
+        calls.append(f"start {turn}")
+        if turn < 3:
+            bus.publish("turn", turn + 1)
+        calls.append(f"end {turn}")
+
+    bus.subscribe("turn", on_turn)
+    bus.publish("turn", 1)
+
+    assert calls == ["start 1", "end 1", "start 2", "end 2", "start 3", "end 3"]
+
+
+def test_long_chains_of_events_do_not_grow_the_stack():
+    bus = EventBus()
+    handled = []
+
+    def on_turn(turn):
+        handled.append(turn)
+        if turn < 5000:
+            bus.publish("turn", turn + 1)
+
+    bus.subscribe("turn", on_turn)
+    bus.publish("turn", 1)
+
+    assert len(handled) == 5000
+
+
+def test_events_are_dispatched_by_priority_then_in_order():
+    bus = EventBus()
+    handled = []
+
+    def on_start(_):
+        for name, priority in [("low", 0), ("first", 1), ("second", 1), ("urgent", 5)]:
+            bus.publish(name, name, priority)
+
+    bus.subscribe("start", on_start)
+    for name in ("low", "first", "second", "urgent"):
+        bus.subscribe(name, handled.append)
+    bus.publish("start", None)
+
+    assert handled == ["urgent", "first", "second", "low"]
+
+
+def test_subscribers_are_called_by_priority_then_in_subscription_order():
+    bus = EventBus()
+    calls = []
+    bus.subscribe("event", lambda _: calls.append("a"))
+    bus.subscribe("event", lambda _: calls.append("b"))
+    bus.subscribe("event", lambda _: calls.append("first"), priority=10)
+
+    bus.publish("event", None)
+
+    assert calls == ["first", "a", "b"]
+
+
+def test_failing_handler_clears_the_queue():
+    bus = EventBus()
+    handled = []
+
+    def on_start(_):
+        bus.publish("queued", "lost")
+        raise RuntimeError("handler failed")
+
+    bus.subscribe("start", on_start)
+    bus.subscribe("queued", handled.append)
+
+    with pytest.raises(RuntimeError):
+        bus.publish("start", None)
+    bus.publish("queued", "next")
+
+    assert handled == ["next"]
+
+
+def test_async_subscribers_are_awaited():
+    bus = EventBus()
+    handled = []
+
+    async def on_turn(turn):
+        await asyncio.sleep(0)
+        handled.append(turn)
+        if turn < 3:
+            await bus.publish_async("turn", turn + 1)
+
+    bus.subscribe("turn", on_turn)
+    asyncio.run(bus.publish_async("turn", 1))
+
+    assert handled == [1, 2, 3]
+
+
+def test_threads_dispatch_their_own_events():
+    bus = EventBus()
+    both_dispatching = threading.Barrier(2)
+    handled = {}
+
+    def on_event(data):
+        thread, count = data
+        handled.setdefault(thread, []).append(count)
+        if count == 0:
+            # Both threads are inside a dispatch loop here; each must still handle its own next event
+            both_dispatching.wait(timeout=5)
+        if count < 2:
+            bus.publish("event", (thread, count + 1))
+
+    bus.subscribe("event", on_event)
+    threads = [threading.Thread(target=bus.publish, args=("event", (name, 0))) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handled == {"a": [0, 1, 2], "b": [0, 1, 2]}
+
+
+def test_forked_buses_share_subscribers_but_not_queues():
+    handled = []
+    bus = EventBus()
+    bus.subscribe("event", handled.append)
+    session_bus = bus.fork()
+
+    with use_event_bus(session_bus):
+        assert get_event_bus() is session_bus
+        publish("event", "session")
+        subscribe("other", handled.append)
+    assert get_event_bus() is not session_bus
+
+    assert handled == ["session"]
+    assert "other" in bus.subscribers
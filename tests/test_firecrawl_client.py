@@ -0,0 +1,142 @@
+import pytest
+
+import utils.firecrawl_client
+import utils.scrape_cache
+from benchmarks.fake_firecrawl import FakeFirecrawlServer
+from data_point_manager import DataPointManager
+from tools.scrape import scrape
+from tools.scrape_many import scrape_many
+from utils.firecrawl_client import FirecrawlClient, FirecrawlError
+from utils.scrape_cache import ScrapeCache
+
+
+@pytest.fixture
+def server():
+    with FakeFirecrawlServer(latency=0.01, page_size=500) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    client = FirecrawlClient(api_key="fake", api_url=server.base_url)
+    yield client
+    client.close()
+
+
+class PagedFirecrawlServer(FakeFirecrawlServer):
+    """Returns completed batch jobs one document per page, linked by "next"."""
+
+    def respond(self, method, path, body):
+        status, payload = super().respond(method, path.split("?")[0], body)
+        if method != "GET" or payload.get("status") != "completed":
+            return status, payload
+        index = int(path.split("skip=")[1]) if "skip=" in path else 0
+        page = {**payload, "data": payload["data"][index:index + 1]}
+        if index + 1 < len(payload["data"]):
+            page["next"] = f"{self.base_url}{path.split('?')[0]}?skip={index + 1}"
+        return status, page
+
+
+class RedirectingServer(FakeFirecrawlServer):
+    """Reports each page under its canonical URL, without a trailing slash."""
+
+    def document_for(self, url):
+        return super().document_for(url.rstrip("/"))
+
+
+class FailingBatchServer(FakeFirecrawlServer):
+    def respond(self, method, path, body):
+        status, payload = super().respond(method, path, body)
+        if method == "GET" and path.startswith("/v1/batch/scrape/"):
+            return 200, {"success": True, "status": "failed"}
+        return status, payload
+
+
+def test_scrape_url_returns_document(server, client):
+    document = client.scrape_url("https://example.com/about")
+
+    assert document["markdown"].startswith("# Page https://example.com/about")
+    assert document["metadata"]["sourceURL"] == "https://example.com/about"
+
+
+def test_pooled_client_reuses_one_connection(server, client):
+    for index in range(5):
+        client.scrape_url(f"https://example.com/{index}")
+
+    assert server.requests == 5
+    assert server.connections == 1
+
+
+def test_error_responses_raise_firecrawl_error(server, client):
+    with pytest.raises(FirecrawlError, match="404"):
+        client._request("POST", "/v1/unknown")
+
+
+def test_batch_scrape_returns_markdown_by_requested_url():
+    with RedirectingServer(latency=0.01, pages={"https://example.com/team": "# Team\n\n42 people"}) as server:
+        client = FirecrawlClient(api_key="fake", api_url=server.base_url)
+        urls = ["https://example.com/team/", "https://example.com/jobs"]
+
+        results = client.batch_scrape_urls(urls, poll_interval=0.01)
+        client.close()
+
+    # The job reports its own spelling of each URL; results keep the requested one
+    assert set(results) == set(urls)
+    assert results["https://example.com/team/"] == "# Team\n\n42 people"
+    assert results["https://example.com/jobs"].startswith("# Page https://example.com/jobs")
+
+
+def test_batch_scrape_follows_next_pages():
+    with PagedFirecrawlServer(latency=0.01, page_size=200) as server:
+        client = FirecrawlClient(api_key="fake", api_url=server.base_url)
+        urls = [f"https://example.com/{index}" for index in range(3)]
+
+        results = client.batch_scrape_urls(urls, poll_interval=0.01)
+        client.close()
+
+    assert set(results) == set(urls)
+
+
+def test_batch_scrape_raises_on_failed_job():
+    with FailingBatchServer(latency=0.01) as server:
+        client = FirecrawlClient(api_key="fake", api_url=server.base_url)
+        with pytest.raises(FirecrawlError, match="failed"):
+            client.batch_scrape_urls(["https://example.com/a", "https://example.com/b"], poll_interval=0.01)
+        client.close()
+
+
+def test_batch_scrape_times_out(server, client):
+    server.latency = 5
+
+    with pytest.raises(FirecrawlError, match="timed out"):
+        client.batch_scrape_urls(["https://example.com/a", "https://example.com/b"], poll_interval=0.01, timeout=0.1)
+
+
+def test_scrape_many_uses_one_batch_job(plain_scrapes, monkeypatch, server, client):
+    monkeypatch.setattr(utils.firecrawl_client, "firecrawl_client", client)
+    manager = DataPointManager([{"name": "num_employees", "value": None, "reference": None}], "Example")
+    urls = [f"https://example.com/page/{index}" for index in range(4)]
+
+    content = scrape_many(urls, data_point_manager=manager)
+
+    # One request starts the job, the rest poll it; no single scrapes
+    assert server.requests < len(urls)
+    assert all(f"## {url}\n# Page {url}" in content for url in urls)
+    assert manager.has_scraped_link("https://example.com/page/0/")
+
+
+
+def test_pages_scraped_earlier_are_returned_again_from_the_cache(plain_scrapes, monkeypatch, server, client, tmp_path):
+    monkeypatch.setattr(utils.firecrawl_client, "firecrawl_client", client)
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite"), 10_000_000, 3600)
+    monkeypatch.setattr(utils.scrape_cache, "scrape_cache", cache)
+    manager = DataPointManager([{"name": "num_employees", "value": None, "reference": None}], "Example")
+    url = "https://example.com/team"
+
+    first = scrape(url, data_point_manager=manager)
+    requests = server.requests
+
+    # Another spelling of the page, e.g. from a flow whose conversation never saw it
+    assert scrape(f"{url}/", data_point_manager=manager) == first
+    assert f"## {url}/\n{first}" in scrape_many([f"{url}/"], data_point_manager=manager)
+    assert server.requests == requests
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+
+from openai.types.chat import ChatCompletionMessageToolCall
+
+from agent.async_agent import _call_chosen_tools_async
+from data_point_manager import DataPointManager
+from utils.journal import SessionJournal, order_tool_results, pending_tool_calls
+
+
+def wait(seconds: float) -> str:
+    time.sleep(seconds)
+    return f"waited {seconds}"
+
+
+TOOLS_MAP = {"wait": wait}
+
+
+def tool_call(call_id: str, seconds: float) -> ChatCompletionMessageToolCall:
+    return ChatCompletionMessageToolCall(id=call_id, type="function",
+                                         function={"name": "wait", "arguments": json.dumps({"seconds": seconds})})
+
+
+def new_turn():
+    # The first call finishes last and the last call first
+    return [{"role": "user", "content": "Research Acme"},
+            {"role": "assistant", "content": None,
+             "tool_calls": [tool_call("a", 0.2), tool_call("b", 0.1), tool_call("c", 0)]}]
+
+
+def result_ids(messages):
+    return [message["tool_call_id"] for message in messages if message.get("role") == "tool"]
+
+
+def run_tools(messages, tool_calls, journal):
+    asyncio.run(_call_chosen_tools_async(messages, tool_calls, [], TOOLS_MAP, asyncio.Semaphore(4), journal))
+
+
+def restore(path):
+    return SessionJournal(str(path)).restore(DataPointManager([], "Acme"))
+
+
+def journaled_result_ids(path):
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    return [record["message"]["tool_call_id"] for record in records
+            if record["type"] == "message" and record["message"]["role"] == "tool"]
+
+
+def test_order_tool_results_follows_each_turns_tool_calls():
+    messages = new_turn() + [{"role": "tool", "tool_call_id": call_id, "content": ""} for call_id in "cab"]
+    messages += [{"role": "assistant", "content": None, "tool_calls": [tool_call("d", 0), tool_call("e", 0)]},
+                 {"role": "tool", "tool_call_id": "e", "content": ""},
+                 {"role": "tool", "tool_call_id": "d", "content": ""}]
+
+    order_tool_results(messages)
+
+    assert result_ids(messages) == ["a", "b", "c", "d", "e"]
+
+
+def test_results_journaled_as_they_finish_are_restored_in_call_order(tmp_path):
+    path = tmp_path / "session.jsonl"
+    journal = SessionJournal(str(path))
+    messages = new_turn()
+    journal.sync(messages)
+
+    run_tools(messages, messages[-1]["tool_calls"], journal)
+    journal.sync(messages)
+    journal.close()
+
+    assert result_ids(messages) == ["a", "b", "c"]
+    assert journaled_result_ids(path) == ["c", "b", "a"]
+    assert result_ids(restore(path)) == ["a", "b", "c"]
+
+
+def test_resumed_turn_keeps_call_order(tmp_path):
+    path = tmp_path / "session.jsonl"
+    journal = SessionJournal(str(path))
+    messages = new_turn()
+    journal.sync(messages)
+    # Crash after the fastest call finished
+    journal.record_tool_result({"role": "tool", "tool_call_id": "c", "name": "wait", "content": "waited 0"})
+    journal.close()
+
+    journal = SessionJournal(str(path))
+    messages = journal.restore(DataPointManager([], "Acme"))
+    pending = pending_tool_calls(messages)
+    assert [call.id for call in pending] == ["a", "b"]
+
+    run_tools(messages, pending, journal)
+    journal.sync(messages)
+    journal.close()
+
+    assert result_ids(messages) == ["a", "b", "c"]
+    assert result_ids(restore(path)) == ["a", "b", "c"]
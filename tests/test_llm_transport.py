@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletion, ChatCompletionMessageToolCall
+
+from utils.llm_transport import (AsyncTransportClient, CompletionStore, ReplayMissError, TransportClient,
+                                 create_transport_clients, request_key)
+
+TOOL_CALL = {"id": "call_1", "type": "function", "function": {"name": "search", "arguments": '{"query": "Acme"}'}}
+REQUEST = {
+    "model": "gpt-4o",
+    "messages": [{"role": "user", "content": "Research Acme"},
+                 {"role": "assistant", "content": None, "tool_calls": [TOOL_CALL]},
+                 {"role": "tool", "tool_call_id": "call_1", "content": "Acme has 1,200 employees"}],
+    "tools": [{"type": "function", "function": {"name": "search", "parameters": {"type": "object"}}}],
+}
+
+
+def completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    })
+
+
+class CountingClient:
+    """Stands in for OpenAI; answers every request with the number of requests so far."""
+
+    def __init__(self):
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **request):
+        self.requests += 1
+        return completion(f"answer {self.requests}")
+
+
+class AsyncCountingClient(CountingClient):
+    async def create(self, **request):
+        return super().create(**request)
+
+
+def test_request_key_ignores_transport_options_and_message_types():
+    as_objects = dict(REQUEST, messages=[REQUEST["messages"][0],
+                                         {"role": "assistant", "content": None,
+                                          "tool_calls": [ChatCompletionMessageToolCall.model_validate(TOOL_CALL)]},
+                                         REQUEST["messages"][2]])
+
+    assert request_key(REQUEST) == request_key(dict(as_objects, timeout=30, tool_choice=None))
+    assert request_key(REQUEST) != request_key(dict(REQUEST, model="gpt-4o-mini"))
+
+
+def test_recorded_responses_replay_without_a_client(tmp_path):
+    store = CompletionStore(str(tmp_path))
+    live = CountingClient()
+
+    recorded = TransportClient("record", store, live).create(**REQUEST)
+    replayed = TransportClient("replay", store).create(**REQUEST)
+
+    assert live.requests == 1
+    assert replayed == recorded
+    with pytest.raises(ReplayMissError):
+        TransportClient("replay", store).create(**dict(REQUEST, model="gpt-4o-mini"))
+
+
+def test_cache_mode_only_sends_new_requests(tmp_path):
+    live = CountingClient()
+    client = TransportClient("cache", CompletionStore(str(tmp_path)), live)
+
+    first = client.create(**REQUEST)
+    again = client.create(**REQUEST)
+    other = client.create(**dict(REQUEST, model="gpt-4o-mini"))
+
+    assert live.requests == 2
+    assert again.choices[0].message.content == first.choices[0].message.content == "answer 1"
+    assert other.choices[0].message.content == "answer 2"
+
+
+def test_async_client_replays_pairs_recorded_by_the_sync_client(tmp_path):
+    store = CompletionStore(str(tmp_path))
+    TransportClient("record", store, CountingClient()).create(**REQUEST)
+    live = AsyncCountingClient()
+
+    replayed = asyncio.run(AsyncTransportClient("cache", store, live).create(**REQUEST))
+
+    assert replayed.choices[0].message.content == "answer 1"
+    assert live.requests == 0
+
+
+def test_fake_server_serves_recorded_pairs_over_http(tmp_path):
+    TransportClient("record", CompletionStore(str(tmp_path)), CountingClient()).create(**REQUEST)
+
+    client, _ = create_transport_clients("fake_server", str(tmp_path))
+    try:
+        response = client.chat.completions.create(**REQUEST)
+        with pytest.raises(Exception, match="No recorded response"):
+            client.chat.completions.create(**dict(REQUEST, model="gpt-4o-mini"))
+    finally:
+        client.fake_server.stop()
+
+    assert response.choices[0].message.content == "answer 1"
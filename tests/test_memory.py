@@ -0,0 +1,109 @@
+import pytest
+
+import utils.chat_utils
+import utils.memory
+from utils.chat_utils import memory_optimise
+from utils.memory import SUMMARY_PREFIX, MemoryPolicy, RollingSummary, build_summary_prompt
+
+HEAD = [
+    {"role": "system", "content": "You research companies"},
+    {"role": "user", "content": "Find num_employees for Acme"},
+]
+
+
+def turn(index):
+    return [
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": f"call_{index}", "type": "function", "function": {"name": "scrape", "arguments": "{}"}}
+        ]},
+        {"role": "tool", "tool_call_id": f"call_{index}", "content": f"page {index}"},
+    ]
+
+
+def turns(*indexes):
+    return [message for index in indexes for message in turn(index)]
+
+
+@pytest.fixture
+def summaries(monkeypatch, word_tokens):
+    """
+    Record what each trim sends to the summary model, answering "summary 1", "summary 2", ...
+    """
+    calls = []
+
+    def summarize(previous_summary, evicted_messages):
+        calls.append((previous_summary, evicted_messages))
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(utils.chat_utils, "client", object())
+    monkeypatch.setattr(utils.chat_utils, "GPT_MODEL", "gpt-4o")
+    monkeypatch.setattr(utils.chat_utils, "_summarize", summarize)
+    monkeypatch.setattr(utils.memory, "memory_policy", MemoryPolicy(
+        max_tokens=1_000_000, max_messages=8, keep_recent_tokens=1_000_000, keep_recent_messages=3
+    ))
+    return calls
+
+
+def summary_message(text):
+    return {"role": "system", "content": f"{SUMMARY_PREFIX}{text}"}
+
+
+def test_trimmed_messages_are_folded_into_one_summary_after_the_head(summaries):
+    messages = memory_optimise(HEAD + turns(0, 1, 2, 3))
+
+    assert summaries == [(None, turns(0, 1))]
+    # The kept messages start at an assistant message, never at one of its tool results
+    assert list(messages) == HEAD + [summary_message("summary 1")] + turns(2, 3)
+    assert messages.token_total == sum(len(str(message).split()) for message in messages)
+
+
+def test_later_trims_only_summarise_newly_evicted_messages(summaries):
+    messages = memory_optimise(HEAD + turns(0, 1, 2, 3))
+    messages.extend(turns(4, 5))
+
+    messages = memory_optimise(messages)
+
+    assert summaries[1] == ("summary 1", turns(2, 3))
+    assert list(messages) == HEAD + [summary_message("summary 2")] + turns(4, 5)
+    assert messages.rolling_summary.evicted == 8
+    assert messages.rolling_summary.updates == 2
+
+
+def test_short_conversations_are_left_alone(summaries):
+    messages = memory_optimise(HEAD + turns(0, 1))
+
+    assert summaries == []
+    assert list(messages) == HEAD + turns(0, 1)
+
+
+def test_background_summaries_are_applied_by_the_next_call(summaries):
+    utils.memory.memory_policy.background = True
+
+    messages = memory_optimise(HEAD + turns(0, 1, 2, 3))
+    assert list(messages) == HEAD + turns(0, 1, 2, 3)
+    assert messages.rolling_summary.pending is not None
+
+    messages = memory_optimise(messages)
+
+    assert summaries == [(None, turns(0, 1))]
+    assert list(messages) == HEAD + [summary_message("summary 1")] + turns(2, 3)
+    assert messages.rolling_summary.pending is None
+
+
+def test_restored_conversations_continue_their_summary(summaries):
+    restored = HEAD + [summary_message("earlier work")] + turns(2, 3, 4, 5)
+
+    summary = RollingSummary.from_messages(restored)
+    assert (summary.head, summary.text) == (2, "earlier work")
+
+    messages = memory_optimise(restored)
+    assert summaries == [("earlier work", turns(2, 3))]
+    assert list(messages) == HEAD + [summary_message("summary 1")] + turns(4, 5)
+
+
+def test_summary_prompt_holds_the_previous_summary_and_new_messages():
+    first = build_summary_prompt(None, turns(0))
+    later = build_summary_prompt("Scraped acme.com", turns(1))
+
+    assert "(nothing yet)" in first and "call_0" in first
+    assert "Scraped acme.com" in later and "call_1" in later and "call_0" not in later
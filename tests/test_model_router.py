@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from utils.model_router import ModelRouter
+
+
+def test_complete_escalates_rejected_responses():
+    router = ModelRouter({"extract": ["small", None]})
+    calls = []
+
+    def request(model):
+        calls.append(model)
+        return f"{model} answer"
+
+    response = router.complete("extract", request, "large", accept=lambda answer: answer.startswith("large"))
+
+    assert calls == ["small", "large"]
+    assert response == "large answer"
+
+
+@pytest.mark.parametrize("routes", [{"extract": []}, {"extract": [None]}])
+def test_complete_raises_for_route_without_models(routes):
+    router = ModelRouter(routes)
+
+    with pytest.raises(ValueError, match="route 'extract'"):
+        router.complete("extract", lambda model: model, None)
+
+
+def test_complete_async_raises_for_route_without_models():
+    router = ModelRouter({"extract": []})
+
+    async def request(model):
+        return model
+
+    with pytest.raises(ValueError, match="route 'extract'"):
+        asyncio.run(router.complete_async("extract", request, None))
+
+
+def test_explicit_model_bypasses_empty_route():
+    router = ModelRouter({"extract": []})
+
+    assert router.complete("extract", lambda model: model, None, model="pinned") == "pinned"
@@ -0,0 +1,81 @@
+import pytest
+
+import utils.near_duplicates
+from data_point_manager import DataPointManager
+from tools.scrape import prepare_page_for_agent
+from utils.near_duplicates import FingerprintIndex, NearDuplicateDetector, PageFingerprint, simhash
+
+PRESS_RELEASE = "\n".join(
+    f"Acme Robotics announced its quarter {index} results, with revenue up {index} percent in region {index}."
+    for index in range(30)
+)
+
+
+@pytest.fixture
+def detector():
+    return NearDuplicateDetector(max_distance=10, min_containment=0.8, min_chars=500)
+
+
+def test_simhash_distance_tracks_similarity():
+    edited = PRESS_RELEASE.replace("quarter 7 results", "quarter seven results")
+    unrelated = "\n".join(f"Globex opened a warehouse in city {index} for {index} workers." for index in range(30))
+
+    assert simhash(PRESS_RELEASE) == simhash(PRESS_RELEASE)
+    assert (simhash(PRESS_RELEASE) ^ simhash(edited)).bit_count() <= 10
+    assert (simhash(PRESS_RELEASE) ^ simhash(unrelated)).bit_count() > 10
+
+
+def test_closest_ignores_pages_beyond_max_distance():
+    index = FingerprintIndex()
+    index.add(PageFingerprint("https://a.com/", 0b0000, None))
+    index.add(PageFingerprint("https://b.com/", 0b1111, None))
+
+    assert index.closest(0b0111, max_distance=1)[1].url == "https://b.com/"
+    assert index.closest(0b0111, max_distance=1, exclude="https://b.com/") is None
+    assert index.closest(0b0011, max_distance=1) is None
+    assert index.closest(0b0011, max_distance=2)[0] == 2
+
+
+def test_page_with_new_lines_is_cut_down_to_them(detector):
+    index = FingerprintIndex()
+    assert detector.deduplicate("https://acme.com/news", PRESS_RELEASE, index) == (PRESS_RELEASE, None)
+
+    mirror = PRESS_RELEASE + "\nContact: press@acme.example.com"
+    content, note = detector.deduplicate("https://mirror.example.com/acme", mirror, index)
+
+    assert content == "Contact: press@acme.example.com"
+    assert note.startswith("[This page is a near duplicate of https://acme.com/news")
+    assert "only its lines that are not on that page follow" in note
+
+
+def test_page_with_nothing_new_is_replaced_by_a_note(detector):
+    index = FingerprintIndex()
+    detector.deduplicate("https://acme.com/news", PRESS_RELEASE, index)
+
+    content, note = detector.deduplicate("https://acme.com/news?lang=en", PRESS_RELEASE.upper(), index)
+
+    assert content == ""
+    assert "has nothing that page does not" in note
+    assert detector.stats()["session_duplicates"] == 1
+
+
+def test_short_and_same_url_pages_are_passed_on(detector):
+    index = FingerprintIndex()
+    detector.deduplicate("https://acme.com/news", PRESS_RELEASE, index)
+
+    assert detector.deduplicate("https://acme.com/news", PRESS_RELEASE, index) == (PRESS_RELEASE, None)
+    assert detector.deduplicate("https://acme.com/short", PRESS_RELEASE[:400], index) == (PRESS_RELEASE[:400], None)
+
+
+def test_pages_of_an_earlier_conversation_are_not_duplicates(plain_scrapes, monkeypatch, detector):
+    monkeypatch.setattr(utils.near_duplicates, "near_duplicate_detector", detector)
+    manager = DataPointManager([{"name": "num_employees", "value": None, "reference": None}], "Acme Robotics")
+    manager.start_conversation()
+    prepare_page_for_agent("https://acme.com/news", PRESS_RELEASE, manager)
+
+    # The search flow starts a new conversation on the entity's state
+    manager.start_conversation()
+
+    assert prepare_page_for_agent("https://mirror.example.com/acme", PRESS_RELEASE, manager) == PRESS_RELEASE
+    assert prepare_page_for_agent("https://acme.com/news?lang=en", PRESS_RELEASE, manager).startswith(
+        "[This page is a near duplicate of https://mirror.example.com/acme")
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from utils.page_store import PageStore
+
+
+def page(index: int, size: int = 1000) -> str:
+    header = f"# Page {index}\n\n"
+    return header + "x" * (size - len(header))
+
+
+def make_store(tmp_path, **kwargs) -> PageStore:
+    return PageStore(str(tmp_path / "pages"), chunk_size=100, inline_threshold=50, **kwargs)
+
+
+def test_put_and_read_back(tmp_path):
+    store = make_store(tmp_path)
+    handle = store.put("https://example.com/1", page(1))
+
+    assert store.metadata(handle)["outline"] == [{"heading": "Page 1", "level": 1, "offset": 0}]
+    chunk = store.read(handle)
+    assert chunk["content"].startswith("# Page 1")
+    assert chunk["next_offset"] == 100
+
+
+def test_metadata_is_written_before_the_page(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    written = []
+    write_atomic = store._write_atomic
+    monkeypatch.setattr(store, "_write_atomic", lambda target, data: (written.append(target.suffix),
+                                                                      write_atomic(target, data)))
+
+    store.put("https://example.com/1", page(1))
+
+    assert written == [".json", ".md"]
+
+
+def test_crash_before_page_is_published_leaves_no_handle(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    write_atomic = store._write_atomic
+
+    def crash_on_page(target, data):
+        if target.suffix == ".md":
+            raise OSError("disk full")
+        write_atomic(target, data)
+
+    monkeypatch.setattr(store, "_write_atomic", crash_on_page)
+    with pytest.raises(OSError):
+        store.put("https://example.com/1", page(1))
+    monkeypatch.undo()
+
+    # The retry publishes the page with its metadata
+    handle = store.put("https://example.com/1", page(1))
+    assert store.read(handle)["size"] == 1000
+
+
+def test_page_without_metadata_is_written_again(tmp_path):
+    store = make_store(tmp_path)
+    handle = store.put("https://example.com/1", page(1))
+    store._meta_path(handle).unlink()
+
+    assert store.put("https://example.com/1", page(1)) == handle
+    assert store.metadata(handle)["url"] == "https://example.com/1"
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    store = make_store(tmp_path, max_bytes=3000)
+    handles = []
+    for index in range(3):
+        handles.append(store.put(f"https://example.com/{index}", page(index)))
+        # Distinct modification times on coarse filesystem clocks
+        os.utime(store._page_path(handles[-1]), (time.time() - 100 + index, time.time() - 100 + index))
+
+    store.read(handles[0])
+    handles.append(store.put("https://example.com/3", page(3)))
+
+    with pytest.raises(KeyError, match="evicted"):
+        store.read(handles[1])
+    for handle in (handles[0], handles[2], handles[3]):
+        assert store.read(handle)["size"] == 1000
+    assert not store._meta_path(handles[1]).exists()
+
+
+def test_page_larger_than_the_limit_is_kept(tmp_path):
+    store = make_store(tmp_path, max_bytes=500)
+    first = store.put("https://example.com/1", page(1))
+    second = store.put("https://example.com/2", page(2))
+
+    assert store.read(second)["size"] == 1000
+    with pytest.raises(KeyError):
+        store.metadata(first)
+
+
+def test_existing_pages_count_towards_the_limit(tmp_path):
+    make_store(tmp_path).put("https://example.com/1", page(1))
+
+    store = make_store(tmp_path, max_bytes=1500)
+    store.put("https://example.com/2", page(2))
+
+    assert len(list((tmp_path / "pages").glob("*/*.md"))) == 1
@@ -0,0 +1,59 @@
+import utils.pre_extraction
+from data_point_manager import DataPointManager
+from tools.scrape import prepare_page_for_agent
+from utils.pre_extraction import PreExtractor
+
+
+def make_manager() -> DataPointManager:
+    return DataPointManager([{"name": name, "value": None, "reference": None}
+                             for name in ("num_employees", "founding_year")], "Acme")
+
+
+def test_extract_finds_values_without_entity_name():
+    extractions = PreExtractor().extract("Globex was founded in 2011 and has 1,200 employees.",
+                                         ["num_employees", "founding_year"])
+
+    assert {extraction.name: extraction.value for extraction in extractions} == {
+        "num_employees": "1,200", "founding_year": "2011"
+    }
+
+
+def test_match_near_entity_name_keeps_its_confidence():
+    [extraction] = PreExtractor().extract("Acme was founded in 2011.", ["founding_year"], entity_name="Acme")
+
+    assert extraction.confidence == 0.9
+
+
+def test_match_far_from_entity_name_is_penalised():
+    text = "Acme makes anvils. " + "Filler text. " * 50 + "Globex was founded in 2011."
+    [extraction] = PreExtractor().extract(text, ["founding_year"], entity_name="Acme")
+
+    assert extraction.confidence == 0.72
+
+
+def test_match_in_text_without_entity_name_is_penalised():
+    [extraction] = PreExtractor().extract("Globex was founded in 2011.", ["founding_year"], entity_name="Acme")
+
+    assert extraction.confidence == 0.72
+
+
+def test_search_results_about_another_company_fill_nothing():
+    manager = make_manager()
+
+    filled = PreExtractor().apply("Globex was founded in 2011 and has 1,200 employees.", manager,
+                                  reference="https://globex.example.com", entity_name="Acme")
+
+    assert filled == []
+    assert manager.get_missing_data_points() == ["num_employees", "founding_year"]
+
+
+def test_scraped_page_about_another_company_fills_nothing(plain_scrapes, monkeypatch):
+    monkeypatch.setattr(utils.pre_extraction, "pre_extractor", PreExtractor())
+    manager = make_manager()
+    page = "# Globex\n\nGlobex was founded in 2011."
+
+    assert prepare_page_for_agent("https://globex.example.com", page, manager) == page
+    assert manager.get_missing_data_points() == ["num_employees", "founding_year"]
+
+    prepare_page_for_agent("https://acme.example.com", "# Acme\n\nAcme was founded in 1999.", manager)
+    assert manager.get_missing_data_points() == ["num_employees"]
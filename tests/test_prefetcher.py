@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+import utils.firecrawl_client
+import utils.prefetcher
+import utils.scrape_cache
+from benchmarks.fake_firecrawl import FakeFirecrawlServer
+from tools.scrape import fetch_markdown
+from tools.search import _prefetch_page
+from utils.firecrawl_client import FirecrawlClient
+from utils.prefetcher import Prefetcher
+from utils.scrape_cache import ScrapeCache
+
+
+class BlockingFetch:
+    """
+    Fetch function that records its calls and holds them until released.
+    """
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, url):
+        self.calls.append(url)
+        self.started.set()
+        assert self.release.wait(timeout=5)
+        return f"# {url}"
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = Prefetcher(top_n=3, max_workers=1)
+    yield prefetcher
+    prefetcher.close()
+
+
+def test_prefetch_fills_the_scrape_cache_and_later_scrapes_claim_it(plain_scrapes, monkeypatch, tmp_path, prefetcher):
+    cache = ScrapeCache(str(tmp_path / "scrapes.sqlite"), max_bytes=1_000_000, default_ttl=3600)
+    monkeypatch.setattr(utils.scrape_cache, "scrape_cache", cache)
+    monkeypatch.setattr(utils.prefetcher, "prefetcher", prefetcher)
+
+    with FakeFirecrawlServer(latency=0.01, page_size=500) as server:
+        client = FirecrawlClient(api_key="fake", api_url=server.base_url)
+        monkeypatch.setattr(utils.firecrawl_client, "firecrawl_client", client)
+        try:
+            assert prefetcher.prefetch(["https://acme.com/about", "https://acme.com/team"], _prefetch_page) == 2
+            # Claimed in another spelling, waiting for the fetch if it is still running
+            about = fetch_markdown("https://ACME.com/about/")
+            team = fetch_markdown("https://acme.com/team")
+        finally:
+            client.close()
+
+    assert about == server.page_for("https://acme.com/about")
+    assert team == server.page_for("https://acme.com/team")
+    assert server.requests == 2
+    assert cache.get("https://acme.com/about") == about
+    stats = prefetcher.stats()
+    assert stats["hits"] + stats["in_flight_hits"] == 2
+    assert stats["hit_rate"] == 1.0 and stats["unclaimed"] == 0
+
+
+def test_prefetch_takes_top_n_and_skips_urls_already_prefetched(prefetcher):
+    fetch = BlockingFetch()
+    fetch.release.set()
+    urls = [f"https://acme.com/{page}" for page in ("a", "b", "c", "d")]
+
+    assert prefetcher.prefetch(urls, fetch) == 3
+    assert prefetcher.prefetch(["https://acme.com/b/", "https://acme.com/d"], fetch) == 1
+    assert prefetcher.claim("https://acme.com/unknown") is None
+    assert prefetcher.stats()["issued"] == 4
+
+
+def test_claim_waits_for_an_in_flight_prefetch(prefetcher):
+    fetch = BlockingFetch()
+    prefetcher.prefetch(["https://acme.com/about"], fetch)
+    assert fetch.started.wait(timeout=5)
+
+    threading.Timer(0.05, fetch.release.set).start()
+
+    assert prefetcher.claim("https://acme.com/about") == "# https://acme.com/about"
+    assert prefetcher.stats()["in_flight_hits"] == 1
+    # A claim takes the page, so a second scrape fetches it again
+    assert prefetcher.claim("https://acme.com/about") is None
+
+
+def test_failed_prefetches_are_not_claimed(prefetcher):
+    def failing(url):
+        raise RuntimeError("site down")
+
+    prefetcher.prefetch(["https://acme.com/about"], failing)
+
+    assert prefetcher.claim("https://acme.com/about") is None
+    assert prefetcher.stats()["failed"] == 1
+
+
+def test_evicted_prefetches_are_cancelled_before_they_run():
+    prefetcher = Prefetcher(top_n=3, max_workers=1, max_entries=1)
+    fetch = BlockingFetch()
+    try:
+        prefetcher.prefetch(["https://acme.com/blocker"], fetch)
+        assert fetch.started.wait(timeout=5)
+        prefetcher.prefetch(["https://acme.com/queued"], fetch)
+        prefetcher.prefetch(["https://acme.com/latest"], fetch)
+        fetch.release.set()
+
+        assert prefetcher.claim("https://acme.com/latest") == "# https://acme.com/latest"
+        assert fetch.calls == ["https://acme.com/blocker", "https://acme.com/latest"]
+        assert prefetcher.stats()["wasted"] == 2
+    finally:
+        prefetcher.close()
+
+
+def test_close_cancels_queued_prefetches():
+    prefetcher = Prefetcher(top_n=3, max_workers=1)
+    fetch = BlockingFetch()
+    prefetcher.prefetch(["https://acme.com/a", "https://acme.com/b", "https://acme.com/c"], fetch)
+    assert fetch.started.wait(timeout=5)
+
+    prefetcher.close()
+    fetch.release.set()
+
+    assert fetch.calls == ["https://acme.com/a"]
+    assert prefetcher.stats()["wasted"] == 3
+    assert prefetcher.stats()["unclaimed"] == 0
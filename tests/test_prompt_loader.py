@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from utils import prompt_loader
+from utils.prompt_loader import PromptRegistry, load_prompt
+
+
+def write_template(path, text, mtime):
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    write_template(tmp_path / "greeting.txt", "Hello {entity_name}", 1_000_000)
+    registry = PromptRegistry(tmp_path, required_placeholders={"greeting": {"entity_name"}}, check_interval=0)
+    registry.load_all()
+    monkeypatch.setattr(prompt_loader, "prompt_registry", registry)
+    return registry
+
+
+def test_templates_are_reloaded_when_their_mtime_changes(tmp_path, registry):
+    assert load_prompt("greeting", {"entity_name": "Acme"}) == "Hello Acme"
+
+    write_template(tmp_path / "greeting.txt", "Hi {entity_name}!", 1_000_100)
+
+    assert load_prompt("greeting", {"entity_name": "Acme"}) == "Hi Acme!"
+    assert registry.get("greeting").mtime == 1_000_100
+
+
+def test_templates_are_not_reread_while_their_mtime_is_unchanged(tmp_path, registry):
+    template = registry.get("greeting")
+
+    # Same mtime: the cached template stays even though the text differs
+    write_template(tmp_path / "greeting.txt", "Changed {entity_name}", 1_000_000)
+
+    assert registry.get("greeting") is template
+    assert load_prompt("greeting", {"entity_name": "Acme"}) == "Hello Acme"
+
+
+def test_mtime_is_only_checked_once_per_interval(tmp_path, registry):
+    registry.check_interval = 3600
+    registry.get("greeting")
+
+    write_template(tmp_path / "greeting.txt", "Hi {entity_name}!", 1_000_100)
+
+    assert load_prompt("greeting", {"entity_name": "Acme"}) == "Hello Acme"
+
+
+def test_reloaded_templates_are_validated(tmp_path, registry):
+    write_template(tmp_path / "greeting.txt", "Hello there", 1_000_100)
+
+    with pytest.raises(ValueError, match="missing required placeholders"):
+        registry.get("greeting")
+
+
+def test_deleted_templates_keep_serving_the_loaded_version(tmp_path, registry):
+    (tmp_path / "greeting.txt").unlink()
+
+    assert load_prompt("greeting", {"entity_name": "Acme"}) == "Hello Acme"
+    with pytest.raises(FileNotFoundError):
+        registry.get("farewell")
+
+
+def test_shipped_templates_render_their_required_placeholders():
+    replacements = {"entity_name": "Acme", "website": "https://acme.com", "links_scraped": "[]",
+                    "data_keys_to_search": "['num_employees']"}
+
+    prompt = load_prompt("website_scrape_user", replacements)
+
+    assert "Acme" in prompt and "https://acme.com" in prompt and "num_employees" in prompt
@@ -0,0 +1,46 @@
+from utils.relevance import CHARS_PER_TOKEN, RelevanceFilter, estimate_tokens, split_sections
+
+
+def table_page(rows: int) -> str:
+    lines = ["# Company directory", "| Name | Employees | Headquarters |", "| --- | --- | --- |"]
+    lines.extend(f"| Company {index} | {index * 10} | City {index} |" for index in range(rows))
+    return "\n".join(lines)
+
+
+def test_split_sections_breaks_page_without_blank_lines_at_lines():
+    page = table_page(2000)
+    sections = split_sections(page, 100)
+
+    assert len(sections) > 1
+    assert all(estimate_tokens(section) <= 101 for section in sections)
+    assert "\n".join(sections) == page
+
+
+def test_split_sections_breaks_single_long_line_at_characters():
+    page = "word " * 5000
+    sections = split_sections(page, 100)
+
+    assert len(sections) > 1
+    assert all(len(section) <= 100 * CHARS_PER_TOKEN for section in sections)
+
+
+def test_filter_keeps_relevant_rows_of_page_without_blank_lines():
+    page = table_page(2000) + "\n| Acme | 4,200 staff | Berlin |"
+    relevance_filter = RelevanceFilter(top_k=4, token_budget=500, max_section_tokens=100)
+
+    filtered = relevance_filter.filter(page, "Acme", ["num_employees"])
+
+    assert "showing 0 of" not in filtered
+    assert "| Acme | 4,200 staff | Berlin |" in filtered
+    assert estimate_tokens(filtered) < 700
+
+
+def test_filter_keeps_truncated_best_section_when_none_fits():
+    page = "# Team\n" + "Acme has many employees in every office. " * 2000
+    relevance_filter = RelevanceFilter(top_k=4, token_budget=200, max_section_tokens=100000)
+
+    filtered = relevance_filter.filter(page, "Acme", ["num_employees"])
+
+    assert filtered.startswith("# Team\nAcme has many employees")
+    assert "showing 1 of 1 sections" in filtered
+    assert estimate_tokens(filtered) < 300
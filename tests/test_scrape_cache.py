@@ -0,0 +1,98 @@
+import sqlite3
+import zlib
+
+import pytest
+
+import utils.disk_cache
+from utils.disk_cache import DiskCache
+from utils.scrape_cache import ScrapeCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(utils.disk_cache, "time", clock)
+    return clock
+
+
+def test_values_round_trip_compressed(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=1_000_000)
+    page = "# Acme Robotics — Über uns\n\n" + "Acme builds robots. " * 500
+
+    cache.set("https://acme.com/about", page)
+
+    assert cache.get("https://acme.com/about") == page
+    with sqlite3.connect(str(tmp_path / "cache.sqlite")) as conn:
+        stored, size = conn.execute("SELECT value, size FROM entries").fetchone()
+    assert size == len(stored) < len(page) / 10
+    assert zlib.decompress(stored).decode("utf-8") == page
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=1_000_000, default_ttl=60)
+    cache.set("default", "a")
+    cache.set("short", "b", ttl=10)
+
+    clock.now += 30
+    assert cache.get("short") is None
+    assert cache.get("default") == "a"
+
+    clock.now += 31
+    assert cache.get("default") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "expirations": 2, "evictions": 0, "entries": 0, "bytes": 0}
+
+
+@pytest.mark.parametrize("eviction, survivors", [
+    ("lru", {"a", "c", "d"}),
+    ("lfu", {"a", "c", "d"}),
+    ("fifo", {"b", "c", "d"}),
+])
+def test_eviction_policies(tmp_path, clock, eviction, survivors):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=1_000_000, eviction=eviction, max_entries=3)
+    for key in "abc":
+        clock.now += 1
+        cache.set(key, key)
+    clock.now += 1
+    cache.get("a")
+
+    clock.now += 1
+    cache.set("d", "d")
+
+    assert {key for key in "abcd" if cache.get(key) is not None} == survivors
+    assert cache.stats()["evictions"] == 1
+
+
+def test_total_size_is_bounded(tmp_path, clock):
+    one_page = len(zlib.compress(("x" * 1000).encode("utf-8")))
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=one_page * 2)
+    for key in "abc":
+        clock.now += 1
+        cache.set(key, key * 1000)
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] <= one_page * 2
+
+    # A value too large for the whole cache is not stored at all
+    cache.set("huge", "y" * 1000 + "".join(map(str, range(2000))))
+    assert cache.get("huge") is None
+    assert cache.get("c") == "c" * 1000
+
+
+def test_scrape_cache_shares_entries_between_spellings_and_uses_domain_ttls(tmp_path, clock):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite"), 1_000_000, default_ttl=3600,
+                        domain_ttls={"wikipedia.org": 86400})
+
+    cache.set("https://en.wikipedia.org/wiki/Acme", "# Acme")
+    cache.set("https://acme.com/about/", "# About")
+
+    clock.now += 7200
+    assert cache.get("https://acme.com/about") is None
+    assert cache.get("HTTPS://en.wikipedia.org/wiki/Acme/") == "# Acme"
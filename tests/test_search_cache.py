@@ -0,0 +1,36 @@
+from utils.search_cache import SearchCache, normalize_query
+
+CACHE_CONFIG = {"max_bytes": 10_000_000, "ttl_seconds": 3600}
+
+
+def make_cache(tmp_path) -> SearchCache:
+    return SearchCache(str(tmp_path / "search.sqlite"), CACHE_CONFIG, CACHE_CONFIG)
+
+
+def test_normalize_query_keeps_non_ascii_words():
+    assert normalize_query("Société Générale number of employees?") == "société générale employees"
+    assert normalize_query("株式会社 従業員数") == "株式会社 従業員数"
+    assert normalize_query("Zürich HQ") != normalize_query("Zrich HQ")
+
+
+def test_normalize_query_folds_case():
+    assert normalize_query("STRASSE") == normalize_query("straße")
+
+
+def test_non_ascii_queries_do_not_share_an_entry(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set_results("Яндекс сотрудники", "yandex results")
+    cache.set_results("百度 员工", "baidu results")
+
+    assert cache.get_results("яндекс  сотрудники") == "yandex results"
+    assert cache.get_results("百度 员工") == "baidu results"
+
+
+def test_queries_without_words_skip_the_cache(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set_results("???", "punctuation results")
+    cache.set_results("the number of", "filler results")
+
+    assert cache.get_results("???") is None
+    assert cache.get_results("!!!") is None
+    assert cache.get_results("the number of") is None
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from agent.stopping import SessionMonitor, StoppingPolicy
+from data_point_manager import DataPointManager
+
+
+def make_manager() -> DataPointManager:
+    return DataPointManager([{"name": name, "value": None, "reference": None}
+                             for name in ("num_employees", "founding_year")], "Acme")
+
+
+def response(total_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(usage=SimpleNamespace(total_tokens=total_tokens))
+
+
+def test_session_stops_once_every_data_point_has_a_value():
+    manager = make_manager()
+    monitor = SessionMonitor(StoppingPolicy(), manager)
+
+    manager.update_data_point("num_employees", "1,200", "https://acme.com")
+    assert monitor.stop_reason() is None
+
+    manager.update_data_point("founding_year", "1999", "https://acme.com")
+    assert monitor.stop_reason() == "all data points found"
+
+
+def test_values_below_their_threshold_are_unsatisfied():
+    manager = make_manager()
+    policy = StoppingPolicy(default_confidence_threshold=0.5, confidence_thresholds={"founding_year": 0.9})
+    monitor = SessionMonitor(policy, manager)
+
+    manager.update_data_point("num_employees", "1,200", "https://acme.com", confidence=0.6)
+    manager.update_data_point("founding_year", "1999", "https://acme.com", confidence=0.8)
+    assert monitor.unsatisfied_data_points() == ["founding_year"]
+
+    manager.update_data_point("founding_year", "1999", "https://acme.com", confidence=0.95)
+    assert monitor.stop_reason() == "all data points found"
+
+
+def test_values_without_confidence_do_not_meet_a_threshold_unless_accepted():
+    manager = make_manager()
+    manager.update_data_point("num_employees", "1,200", "https://acme.com")
+    manager.update_data_point("founding_year", "1999", "https://acme.com", confidence=0.95)
+
+    assert SessionMonitor(StoppingPolicy(default_confidence_threshold=0.9), manager).unsatisfied_data_points() == [
+        "num_employees"
+    ]
+    lenient = StoppingPolicy(default_confidence_threshold=0.9, accept_missing_confidence=True)
+    assert SessionMonitor(lenient, manager).stop_reason() == "all data points found"
+
+
+def test_budgets_stop_the_session():
+    monitor = SessionMonitor(StoppingPolicy(max_turns=2, max_tokens=1000), make_manager())
+
+    monitor.record_response(response(400))
+    assert monitor.stop_reason() is None
+    monitor.record_response(response(700))
+    assert monitor.stop_reason() == "reached the limit of 2 turns"
+
+    monitor = SessionMonitor(StoppingPolicy(max_tokens=1000))
+    monitor.record_response(response(1000))
+    assert monitor.stop_reason() == "reached the limit of 1000 tokens"
+
+    assert SessionMonitor(StoppingPolicy(max_wall_time=0)).stop_reason() == "reached the time limit of 0 seconds"
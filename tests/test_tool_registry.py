@@ -0,0 +1,107 @@
+import re
+from typing import List, NotRequired, Optional, TypedDict
+
+import pytest
+
+from tools.registry import ToolRegistry
+
+
+class Office(TypedDict):
+    """
+    An office of the entity
+
+    Attributes:
+        city (str): City the office is in
+        employees (int): People working there
+    """
+    city: str
+    employees: NotRequired[int]
+
+
+def find_offices(query: str, offices: List[Office], limit: Optional[int] = None, *, data_point_manager=None):
+    """
+    Record the offices found for a query.
+
+    Only offices on the page should be passed.
+
+    Args:
+        query (str): What was searched for
+        offices (List[Office]): The offices found
+        limit (int, optional): Most offices to keep
+        data_point_manager (DataPointManager, optional): Bound per session
+    """
+    return offices[:limit]
+
+
+@pytest.fixture
+def registered():
+    registry = ToolRegistry()
+    return registry, registry.register(find_offices)
+
+
+def test_schema_is_generated_from_signature_and_docstring(registered):
+    registry, tool = registered
+
+    assert tool.schema == {
+        "type": "function",
+        "function": {
+            "name": "find_offices",
+            "description": "Record the offices found for a query.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "What was searched for"},
+                    "offices": {
+                        "type": "array",
+                        "description": "The offices found",
+                        "items": {
+                            "type": "object",
+                            "description": "An office of the entity",
+                            "properties": {
+                                "city": {"type": "string", "description": "City the office is in"},
+                                "employees": {"type": "integer", "description": "People working there"}
+                            },
+                            "required": ["city"]
+                        }
+                    },
+                    "limit": {"type": "integer", "description": "Most offices to keep"}
+                },
+                "required": ["query", "offices"]
+            }
+        }
+    }
+    # Schema lists are built once per list of tools
+    assert registry.schemas(["find_offices"]) is registry.schemas(["find_offices"])
+
+
+def test_valid_arguments_are_parsed(registered):
+    _, tool = registered
+
+    arguments = tool.parse_arguments('{"query": "acme offices", "offices": [{"city": "Paris"}], "limit": null}')
+
+    assert arguments == {"query": "acme offices", "offices": [{"city": "Paris"}], "limit": None}
+
+
+@pytest.mark.parametrize("arguments, error", [
+    ('{"query": ', "not valid JSON"),
+    ('["acme"]', "must be a JSON object"),
+    ('{"query": "acme"}', "missing required arguments: ['offices']"),
+    ('{"query": "acme", "offices": [], "page": 2}', "unexpected arguments: ['page']"),
+    ('{"query": "acme", "offices": [], "limit": true}', "'find_offices.limit' should be of type integer"),
+    ('{"query": "acme", "offices": [{"employees": 3}]}', "'find_offices.offices[0]' is missing fields: ['city']"),
+    ('{"query": "acme", "offices": [{"city": 7}]}', "'find_offices.offices[0].city' should be of type string"),
+])
+def test_invalid_arguments_raise(registered, arguments, error):
+    _, tool = registered
+
+    with pytest.raises(ValueError, match=re.escape(error)):
+        tool.parse_arguments(arguments)
+
+
+def test_tools_map_binds_session_arguments(registered):
+    registry, _ = registered
+
+    bound = registry.tools_map(["find_offices"], data_point_manager="session")["find_offices"]
+
+    assert bound.keywords == {"data_point_manager": "session"}
+    assert bound("acme", [{"city": "Paris"}, {"city": "Oslo"}], 1) == [{"city": "Paris"}]
@@ -0,0 +1,94 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from tenacity import stop_after_attempt
+
+import utils.chat_utils
+import utils.pretty_print
+import utils.tracing
+from utils.chat_utils import chat_completion_request
+from utils.tracing import STATUS_ERROR, JsonlSpanExporter, Tracer, span, traced
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    """Trace into a JSONL file; the fixture returns a function reading the exported spans in order."""
+    exporter = JsonlSpanExporter(str(tmp_path / "spans.jsonl"), flush_every=2)
+    monkeypatch.setattr(utils.tracing, "tracer", Tracer(exporter))
+
+    def read():
+        exporter.close()
+        requests = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+        return [exported_span for request in requests
+                for exported_span in request["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+    return read
+
+
+@traced("tool.scrape", "client")
+def scrape(url):
+    utils.tracing.current_span().set_attribute("scrape.url", url)
+    return url
+
+
+def test_nested_spans_share_a_trace_and_export_as_otlp_lines(exported):
+    with span("agent.session", **{"session.entity": "Acme"}):
+        with span("agent.turn") as turn_span:
+            turn_span.set_attributes({"agent.tool_calls": 1, "cache.hit": False})
+            scrape("https://acme.com")
+        with pytest.raises(ValueError):
+            with span("memory_optimise"):
+                raise ValueError("no budget")
+
+    # Spans are exported as they end, innermost first
+    tool, turn, memory, session = exported()
+
+    assert "parentSpanId" not in session
+    assert turn["parentSpanId"] == memory["parentSpanId"] == session["spanId"]
+    assert tool["parentSpanId"] == turn["spanId"]
+    assert [exported_span["name"] for exported_span in (session, turn, tool, memory)] == [
+        "agent.session", "agent.turn", "tool.scrape", "memory_optimise"
+    ]
+    assert tool["traceId"] == turn["traceId"] == memory["traceId"] == session["traceId"]
+    assert tool["kind"] == 3
+    assert {"key": "agent.tool_calls", "value": {"intValue": "1"}} in turn["attributes"]
+    assert {"key": "cache.hit", "value": {"boolValue": False}} in turn["attributes"]
+    assert {"key": "scrape.url", "value": {"stringValue": "https://acme.com"}} in tool["attributes"]
+    assert memory["status"] == {"code": STATUS_ERROR, "message": "ValueError: no budget"}
+    assert int(session["endTimeUnixNano"]) >= int(turn["endTimeUnixNano"]) > int(turn["startTimeUnixNano"])
+
+
+def test_spans_outside_a_session_start_new_traces(exported):
+    for _ in range(3):
+        with span("agent.session"):
+            pass
+
+    sessions = exported()
+
+    assert len(sessions) == 3
+    assert len({session["traceId"] for session in sessions}) == 3
+
+
+def test_failed_chat_completion_is_recorded_on_its_span_without_dumping_the_request(exported, monkeypatch, capsys):
+    def create(**request):
+        raise RuntimeError("rate limited")
+
+    failing_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(utils.chat_utils, "client", failing_client)
+    monkeypatch.setattr(utils.chat_utils, "GPT_MODEL", "gpt-4o")
+    request = chat_completion_request.retry_with(stop=stop_after_attempt(1), reraise=True)
+    messages = [{"role": "user", "content": "Research Acme"}]
+
+    monkeypatch.setattr(utils.pretty_print, "print_conversation", False)
+    with pytest.raises(RuntimeError):
+        request(messages, tool_choice=None, tools=[])
+    assert capsys.readouterr().out == ""
+
+    monkeypatch.setattr(utils.pretty_print, "print_conversation", True)
+    with pytest.raises(RuntimeError):
+        request(messages, tool_choice=None, tools=[])
+    assert capsys.readouterr().out == "Unable to generate ChatCompletion response: rate limited\n"
+
+    assert [exported_span["status"] for exported_span in exported()] == [
+        {"code": STATUS_ERROR, "message": "RuntimeError: rate limited"}
+    ] * 2
@@ -0,0 +1,77 @@
+import utils.scrape_cache
+from tools.search import _prefetch_candidates
+from utils.scrape_cache import ScrapeCache
+from utils.url_frontier import BloomFilter, DomainPoliteness, FetchedRegistry, UrlFrontier
+
+
+def test_registry_forgets_oldest_urls_past_max_entries():
+    registry = FetchedRegistry(max_entries=2)
+    for url in ("https://a.com/", "https://b.com/", "https://c.com/"):
+        registry.add(url)
+
+    assert len(registry) == 2
+    assert "https://a.com/" not in registry
+    assert "https://c.com/" in registry
+
+
+def test_registry_with_bloom_filter_keeps_no_urls():
+    registry = FetchedRegistry(BloomFilter(1000, 0.01), max_entries=2)
+    for index in range(10):
+        registry.add(f"https://example.com/{index}")
+
+    assert len(registry) == 0
+    assert all(f"https://example.com/{index}" in registry for index in range(10))
+
+
+def test_politeness_forgets_least_recently_used_idle_domains():
+    politeness = DomainPoliteness(max_concurrency=1, min_interval=0, max_domains=2)
+
+    with politeness.slot("https://a.com/"):
+        for domain in ("b.com", "c.com", "d.com"):
+            with politeness.slot(f"https://{domain}/"):
+                pass
+
+        # a.com holds a slot, so the idle b.com and c.com went instead
+        assert len(politeness) == 2
+        assert list(politeness._domains) == ["a.com", "d.com"]
+
+    with politeness.slot("https://e.com/"):
+        pass
+    assert list(politeness._domains) == ["d.com", "e.com"]
+
+
+def test_politeness_keeps_domains_inside_their_interval():
+    politeness = DomainPoliteness(max_concurrency=1, min_interval=60, max_domains=1)
+
+    with politeness.slot("https://a.com/"):
+        pass
+    with politeness.slot("https://b.com/"):
+        pass
+
+    # Forgetting a.com would let its next fetch start before the interval is over
+    assert len(politeness) == 2
+
+
+def test_prefetch_candidates_skip_pages_fetched_by_other_sessions(monkeypatch, tmp_path):
+    registry = FetchedRegistry()
+    other, session = UrlFrontier(registry), UrlFrontier(registry)
+    other.mark_fetched("https://example.com/team")
+    session.add_candidates(["https://example.com/team/", "https://example.com/about", "https://example.com/jobs"])
+
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite"), 10_000_000, 3600)
+    monkeypatch.setattr(utils.scrape_cache, "scrape_cache", cache)
+
+    assert _prefetch_candidates(session, 1) == ["https://example.com/about"]
+    assert _prefetch_candidates(session, 5) == ["https://example.com/jobs"]
+
+
+def test_prefetch_candidates_keep_shared_pages_without_scrape_cache(monkeypatch):
+    registry = FetchedRegistry()
+    other, session = UrlFrontier(registry), UrlFrontier(registry)
+    other.mark_fetched("https://example.com/team")
+    session.add_candidates(["https://example.com/team", "https://example.com/about"])
+
+    monkeypatch.setattr(utils.scrape_cache, "scrape_cache", False)
+
+    assert _prefetch_candidates(session, 5) == ["https://example.com/team", "https://example.com/about"]
+    assert session.candidate_count() == 0
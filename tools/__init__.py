@@ -7,7 +7,9 @@ for web scraping, internet searching, and data management.
 
 from .call_tool import call_tool
 from .scrape import scrape
+from .scrape_many import scrape_many
 from .search import search
+from .read_more import read_more
 from .update_data import update_data
 
-__all__ = ['scrape', 'search', 'update_data', 'call_tool'] 
\ No newline at end of file
+__all__ = ['scrape', 'scrape_many', 'search', 'read_more', 'update_data', 'call_tool'] 
\ No newline at end of file
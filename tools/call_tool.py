@@ -5,24 +5,46 @@ Tool execution functionality for handling OpenAI tool calls.
 import json
 from typing import Dict, Any, Callable
 from openai.types.chat import ChatCompletionMessageToolCall
+from tools.registry import get_tool_registry
+from utils.tracing import span
 
 def call_tool(tools_map: Dict[str, Callable[..., Any]], tool_call: ChatCompletionMessageToolCall) -> Dict[str, str]:
     """
     Execute a tool call using the provided tools map.
     
+    Arguments of registered tools are validated against the tool's cached schema
+    before the call, so malformed arguments come back as a clear error.
+    
     Args:
         tools_map (Dict[str, Callable[..., Any]]): Dictionary mapping tool names to their implementations
         tool_call (ChatCompletionMessageToolCall): The tool call object from OpenAI
         
     Returns:
         Dict[str, str]: A message containing the tool call results in OpenAI's expected format
+    
+    Raises:
+        ValueError: If the tool is not in the tools map or its arguments are invalid
     """
-    args = json.loads(tool_call.function.arguments) if isinstance(tool_call.function.arguments, str) else tool_call.function.arguments
-    result = tools_map[tool_call.function.name](**args)
-    tool_message = {
-        "role": "tool",
-        "tool_call_id": tool_call.id,
-        "name": tool_call.function.name,
-        "content": str(result)
-    }
-    return tool_message 
\ No newline at end of file
+    name = tool_call.function.name
+    fn = tools_map.get(name)
+    if fn is None:
+        raise ValueError(f"Unknown tool '{name}'. Available tools: {list(tools_map)}")
+
+    with span(f"tool.{name}") as tool_span:
+        registered = get_tool_registry().find(name)
+        if registered is not None:
+            args = registered.parse_arguments(tool_call.function.arguments)
+        else:
+            args = json.loads(tool_call.function.arguments) if isinstance(tool_call.function.arguments, str) else tool_call.function.arguments
+
+        result = fn(**args)
+        tool_message = {
+            "role": "tool",
+            "tool_call_id": tool_call.id,
+            "name": name,
+            "content": str(result)
+        }
+        if tool_span.recording:
+            tool_span.set_attributes({"tool.name": name, "tool.arguments_chars": len(str(tool_call.function.arguments)),
+                                      "tool.result_chars": len(tool_message["content"])})
+    return tool_message 
@@ -0,0 +1,45 @@
+from typing import Optional
+from data_point_manager import DataPointManager
+from utils.page_store import get_page_store
+from tools.registry import tool
+
+
+@tool(description="Read more of a large page returned by scrape as a handle, either from a byte offset "
+                  "or by searching within the page")
+def read_more(handle: str, offset: int = 0, query: Optional[str] = None, *, data_point_manager: DataPointManager = None):
+    """
+    Read a further chunk of a stored page, or search within it.
+    
+    Args:
+        handle (str): The page handle returned by the scrape tool
+        offset (int, optional): The byte offset to read from, e.g. a heading offset from the outline
+            or the next offset of the last read
+        query (str, optional): Words to search for within the page instead of reading from an offset
+        data_point_manager (DataPointManager, optional): Unused, accepted like the other tools
+    
+    Returns:
+        str: The requested page content, or error message
+    """
+    page_store = get_page_store()
+    if not page_store:
+        return "Error: the page store is disabled"
+
+    try:
+        if query:
+            matches = page_store.search(handle, query)
+            if not matches:
+                return f"No part of page {handle} matches '{query}'"
+            return "\n\n".join(
+                f"[page {handle}, offset {match['offset']} of {match['size']} bytes]\n{match['content']}"
+                for match in matches
+            )
+
+        chunk = page_store.read(handle, int(offset or 0))
+        if chunk["next_offset"] is None:
+            footer = "[end of page]"
+        else:
+            footer = f"[next offset: {chunk['next_offset']}]"
+        return f"[page {handle}, offset {chunk['offset']} of {chunk['size']} bytes]\n{chunk['content']}\n{footer}"
+
+    except KeyError as e:
+        return f"Error: {e.args[0]}"
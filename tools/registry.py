@@ -0,0 +1,413 @@
+"""
+In-memory registry of the agent's tools.
+
+Tool functions are registered with the @tool decorator, which builds the
+OpenAI function schema once from the function's signature and docstring:
+positional parameters become the schema's properties (required unless they
+have a default), their descriptions come from the docstring's Args section
+and keyword-only parameters such as data_point_manager are left out because
+they are bound per session rather than chosen by the model. TypedDict
+annotations become nested object schemas, described by the TypedDict's
+Attributes section.
+
+Tool sets are read from config/tool_sets.json once, and the schema lists are
+cached per set.
+"""
+
+import inspect
+import json
+import re
+import threading
+import typing
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+TOOL_SETS_PATH = Path(__file__).parent.parent / 'config' / 'tool_sets.json'
+
+JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+# Python types accepted for each JSON schema type when validating arguments
+PYTHON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+tool_registry = None
+_tool_registry_lock = threading.Lock()
+
+
+def get_tool_registry():
+    """
+    Get the process-wide tool registry, creating it on first use.
+
+    Returns:
+        ToolRegistry: The shared registry
+    """
+    global tool_registry
+    if tool_registry is None:
+        with _tool_registry_lock:
+            if tool_registry is None:
+                tool_registry = ToolRegistry(TOOL_SETS_PATH)
+    return tool_registry
+
+
+def tool(fn: Callable = None, *, name: Optional[str] = None, description: Optional[str] = None):
+    """
+    Register a function as an agent tool in the shared registry.
+
+    Can be used bare (@tool) or with arguments (@tool(description=...)).
+
+    Args:
+        fn (Callable): The tool function
+        name (str, optional): Tool name, defaults to the function name
+        description (str, optional): Description shown to the model, defaults to the
+            first paragraph of the docstring
+
+    Returns:
+        Callable: The function, unchanged
+    """
+    def register(fn):
+        get_tool_registry().register(fn, name=name, description=description)
+        return fn
+
+    return register(fn) if fn is not None else register
+
+
+def parse_docstring_section(docstring: Optional[str], section: str) -> Dict[str, str]:
+    """
+    Get the entry descriptions of a Google style docstring section.
+
+    Args:
+        docstring (str): The docstring
+        section (str): Section name, e.g. "Args" or "Attributes"
+
+    Returns:
+        Dict[str, str]: Description keyed by entry name
+    """
+    lines = inspect.cleandoc(docstring or "").splitlines()
+    entries = {}
+    current = None
+    in_section = False
+    entry_indent = None
+
+    for line in lines:
+        stripped = line.strip()
+        if not in_section:
+            in_section = stripped == f"{section}:"
+            continue
+        if not stripped:
+            continue
+        indent = len(line) - len(line.lstrip())
+        if indent == 0:
+            break
+        if entry_indent is None:
+            entry_indent = indent
+
+        match = re.match(r"(\w+)\s*(\([^)]*\))?\s*:\s*(.*)", stripped)
+        if indent == entry_indent and match:
+            current = match.group(1)
+            entries[current] = match.group(3)
+        elif current is not None:
+            entries[current] = f"{entries[current]} {stripped}".strip()
+
+    return entries
+
+
+def summary_from_docstring(docstring: Optional[str]) -> str:
+    """
+    Get the first paragraph of a docstring as one line.
+    """
+    paragraph = inspect.cleandoc(docstring or "").split("\n\n", 1)[0]
+    return " ".join(paragraph.split())
+
+
+def json_schema_for(annotation: Any, description: Optional[str] = None) -> Dict:
+    """
+    Build the JSON schema of a parameter from its type annotation.
+
+    Args:
+        annotation: The annotation, e.g. str, List[str], Optional[int] or a TypedDict
+        description (str, optional): Description of the parameter
+
+    Returns:
+        Dict: JSON schema of the parameter
+    """
+    schema = {}
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is Union:
+        # Optional[X] is described as X; the parameter is simply left out of "required"
+        non_null = [arg for arg in args if arg is not type(None)]
+        return json_schema_for(non_null[0] if len(non_null) == 1 else Any, description)
+
+    if typing.is_typeddict(annotation):
+        hints = typing.get_type_hints(annotation)
+        attributes = parse_docstring_section(annotation.__doc__, "Attributes")
+        schema["type"] = "object"
+        if description or annotation.__doc__:
+            schema["description"] = description or summary_from_docstring(annotation.__doc__)
+        schema["properties"] = {
+            field: json_schema_for(field_type, attributes.get(field)) for field, field_type in hints.items()
+        }
+        schema["required"] = [field for field in hints if field in annotation.__required_keys__]
+        return schema
+
+    if origin in (list, List) or annotation is list:
+        schema["type"] = "array"
+        if description:
+            schema["description"] = description
+        if args:
+            schema["items"] = json_schema_for(args[0])
+        return schema
+
+    json_type = JSON_TYPES.get(origin or annotation)
+    if json_type:
+        schema["type"] = json_type
+    if description:
+        schema["description"] = description
+    return schema
+
+
+class RegisteredTool:
+    def __init__(self, name: str, fn: Callable, schema: Dict):
+        """
+        A tool function with its generated schema.
+
+        Args:
+            name (str): Tool name used by the model
+            fn (Callable): The tool function
+            schema (Dict): OpenAI function tool schema
+        """
+        self.name = name
+        self.fn = fn
+        self.schema = schema
+
+        parameters = schema["function"]["parameters"]
+        self.properties = parameters["properties"]
+        self.required = tuple(parameters["required"])
+
+    def parse_arguments(self, arguments: Union[str, Dict]) -> Dict:
+        """
+        Parse and validate the arguments of a tool call against the tool's schema.
+
+        Args:
+            arguments (Union[str, Dict]): JSON arguments from the model, or an already parsed dict
+
+        Returns:
+            Dict: The keyword arguments for the tool function
+
+        Raises:
+            ValueError: If the arguments are not a JSON object or do not match the schema
+        """
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Arguments for tool '{self.name}' are not valid JSON: {e}")
+        if not isinstance(arguments, dict):
+            raise ValueError(f"Arguments for tool '{self.name}' must be a JSON object")
+
+        missing = [field for field in self.required if field not in arguments]
+        if missing:
+            raise ValueError(f"Tool '{self.name}' is missing required arguments: {missing}")
+        unknown = [field for field in arguments if field not in self.properties]
+        if unknown:
+            raise ValueError(f"Tool '{self.name}' got unexpected arguments: {unknown}")
+
+        for field, value in arguments.items():
+            # Optional arguments may be passed explicitly as null
+            if value is None and field not in self.required:
+                continue
+            _validate_value(value, self.properties[field], f"{self.name}.{field}")
+        return arguments
+
+
+def _validate_value(value: Any, schema: Dict, path: str) -> None:
+    json_type = schema.get("type")
+    if json_type is None:
+        return
+
+    python_types = PYTHON_TYPES[json_type]
+    if not isinstance(value, python_types) or (json_type in ("integer", "number") and isinstance(value, bool)):
+        raise ValueError(f"Argument '{path}' should be of type {json_type}")
+
+    if json_type == "array" and "items" in schema:
+        for index, item in enumerate(value):
+            _validate_value(item, schema["items"], f"{path}[{index}]")
+    elif json_type == "object" and "properties" in schema:
+        missing = [field for field in schema.get("required", []) if field not in value]
+        if missing:
+            raise ValueError(f"Argument '{path}' is missing fields: {missing}")
+        for field, item in value.items():
+            if field in schema["properties"]:
+                _validate_value(item, schema["properties"][field], f"{path}.{field}")
+
+
+class ToolRegistry:
+    def __init__(self, tool_sets_path: Optional[Path] = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            tool_sets_path (Path, optional): JSON file of named tool sets, read on first use
+        """
+        self.tool_sets_path = tool_sets_path
+        self._tools = {}
+        self._tool_sets = None
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def register(self, fn: Callable, name: Optional[str] = None, description: Optional[str] = None) -> RegisteredTool:
+        """
+        Register a tool function, generating its schema from its signature and docstring.
+
+        Args:
+            fn (Callable): The tool function
+            name (str, optional): Tool name, defaults to the function name
+            description (str, optional): Description shown to the model, defaults to the
+                first paragraph of the docstring
+
+        Returns:
+            RegisteredTool: The registered tool
+        """
+        name = name or fn.__name__
+        hints = typing.get_type_hints(fn)
+        arg_descriptions = parse_docstring_section(fn.__doc__, "Args")
+
+        properties = {}
+        required = []
+        for parameter in inspect.signature(fn).parameters.values():
+            if parameter.kind not in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+                continue
+            properties[parameter.name] = json_schema_for(
+                hints.get(parameter.name, Any), arg_descriptions.get(parameter.name)
+            )
+            if parameter.default is parameter.empty:
+                required.append(parameter.name)
+
+        schema = {
+            "type": "function",
+            "function": {
+                "name": name,
+                "description": description or summary_from_docstring(fn.__doc__),
+                "parameters": {"type": "object", "properties": properties, "required": required}
+            }
+        }
+
+        registered = RegisteredTool(name, fn, schema)
+        with self._lock:
+            self._tools[name] = registered
+            self._schemas.clear()
+        return registered
+
+    def get(self, name: str) -> RegisteredTool:
+        """
+        Get a registered tool.
+
+        Args:
+            name (str): Tool name
+
+        Returns:
+            RegisteredTool: The tool
+
+        Raises:
+            KeyError: If no tool has that name
+        """
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise KeyError(f"Tool '{name}' not found. Available tools: {self.names()}")
+
+    def find(self, name: str) -> Optional[RegisteredTool]:
+        """
+        Get a registered tool, or None if no tool has that name.
+        """
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def tool_sets(self) -> Dict[str, List[str]]:
+        """
+        Get the named tool sets, reading the configuration on first use.
+
+        Returns:
+            Dict[str, List[str]]: Tool names keyed by set name
+        """
+        if self._tool_sets is None:
+            tool_sets = {}
+            if self.tool_sets_path is not None:
+                try:
+                    with open(self.tool_sets_path, 'r') as f:
+                        tool_sets = json.load(f)
+                except FileNotFoundError:
+                    raise FileNotFoundError(f"Tool sets configuration not found at {self.tool_sets_path}")
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON in tool sets configuration: {e}")
+            self._tool_sets = tool_sets
+        return self._tool_sets
+
+    def tool_set(self, set_name: str) -> List[str]:
+        """
+        Get the tool names of a named tool set.
+
+        Args:
+            set_name (str): Name of the tool set
+
+        Returns:
+            List[str]: Tool names in the set
+        """
+        tool_sets = self.tool_sets()
+        if set_name not in tool_sets:
+            raise ValueError(f"Tool set '{set_name}' not found. Available sets: {list(tool_sets.keys())}")
+        return list(tool_sets[set_name])
+
+    def _resolve(self, tools: Union[List[str], str]) -> Tuple[str, ...]:
+        return tuple(self.tool_set(tools) if isinstance(tools, str) else tools)
+
+    def schemas(self, tools: Union[List[str], str]) -> List[Dict]:
+        """
+        Get the schemas of several tools, cached per list of tools.
+
+        Args:
+            tools (Union[List[str], str]): Either a list of tool names or a tool set name
+
+        Returns:
+            List[Dict]: Tool schemas; callers must not modify them
+        """
+        names = self._resolve(tools)
+        cached = self._schemas.get(names)
+        if cached is None:
+            cached = [self.get(name).schema for name in names]
+            with self._lock:
+                self._schemas[names] = cached
+        return cached
+
+    def tools_map(self, tools: Union[List[str], str], **bound) -> Dict[str, Callable[..., Any]]:
+        """
+        Map tool names to their functions, with session arguments bound.
+
+        Args:
+            tools (Union[List[str], str]): Either a list of tool names or a tool set name
+            **bound: Keyword arguments to bind to every tool, e.g. data_point_manager
+
+        Returns:
+            Dict[str, Callable[..., Any]]: Tool functions keyed by name
+        """
+        return {
+            name: partial(self.get(name).fn, **bound) if bound else self.get(name).fn
+            for name in self._resolve(tools)
+        }
@@ -1,42 +1,270 @@
-from firecrawl import FirecrawlApp
-from data_point_manager import get_data_point_manager
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from data_point_manager import DataPointManager, get_data_point_manager
+from utils.scrape_cache import get_scrape_cache
+from utils.relevance import get_relevance_filter
+from utils.page_store import get_page_store
+from utils.firecrawl_client import get_firecrawl_client
+from utils.direct_fetch import get_direct_fetcher
+from utils.pre_extraction import format_filled, get_pre_extractor
+from utils.near_duplicates import get_near_duplicate_detector
+from utils.url_frontier import get_domain_politeness
+from utils.prefetcher import get_prefetcher
+from tools.registry import tool
+from utils.tracing import traced, current_span
 
+# Upper bound on parallel single scrapes when a batch scrape is not possible
+MAX_PARALLEL_SCRAPES = 8
 
-def scrape(url):
+
+@tool(description="Scrape a URL for information")
+def scrape(url: str, *, data_point_manager: DataPointManager = None):
     """
     Scrape a single URL and return the markdown content.
     
+    Long pages are cut down to the sections most relevant to the data points
+    still missing, with a note on what was left out. A page scraped earlier in
+    the session, under any spelling of its URL, is returned again. Pages over the page
+    store's inline threshold are stored whole and returned as a handle with an
+    outline, so the agent can page through them with read_more.
+    
     Args:
-        url (str): The URL to scrape
+        url (str): The url of the website to scrape
+        data_point_manager (DataPointManager, optional): Session state to record the
+            scraped link in, defaults to the global data point manager
     
     Returns:
         str: The markdown content of the scraped page, or error message
     """
-    app = FirecrawlApp()
-    
-    # Scrape a single URL
+    data_point_manager = data_point_manager or get_data_point_manager()
+
+    # A page scraped earlier in the session is returned again, usually from the scrape cache,
+    # as the conversation may no longer hold it once older messages are trimmed
+    page_url = data_point_manager.frontier.first_fetched_as(url) or url
+
     try:
-        scraped_data = app.scrape_url(url)
-        
-        # Handle different response formats from FirecrawlApp
-        if hasattr(scraped_data, 'markdown'):
-            # If it's an object with markdown attribute
-            markdown_content = scraped_data.markdown
-        elif isinstance(scraped_data, dict) and 'markdown' in scraped_data:
-            # If it's a dictionary with markdown key
-            markdown_content = scraped_data['markdown']
-        elif hasattr(scraped_data, 'content'):
-            # If it has content attribute
-            markdown_content = scraped_data.content
-        else:
-            # Fallback - convert to string
-            markdown_content = str(scraped_data)
-            
-        # Add scraped link to manager
-        get_data_point_manager().add_scraped_link(url)
-        return markdown_content
-        
+        markdown_content = fetch_markdown(page_url)
     except Exception as e:
         error_msg = f"Unable to scrape the url {url}: {str(e)}"
         print(error_msg)
         return error_msg
+
+    # Add scraped link to manager
+    data_point_manager.add_scraped_link(url)
+    return prepare_page_for_agent(page_url, markdown_content, data_point_manager)
+
+
+@traced("scrape.fetch", "client")
+def fetch_markdown(url):
+    """
+    Get the full markdown of a page, from a prefetch, the shared cache, a direct fetch or Firecrawl.
+    
+    Args:
+        url (str): The URL to scrape
+    
+    Returns:
+        str: The markdown content of the page
+    
+    Raises:
+        Exception: If Firecrawl fails to scrape the page
+    """
+    fetch_span = current_span()
+    fetch_span.set_attribute("scrape.url", url)
+
+    prefetcher = get_prefetcher()
+    if prefetcher:
+        prefetched = prefetcher.claim(url)
+        fetch_span.set_attribute("prefetch.hit", prefetched is not None)
+        if prefetched is not None:
+            return prefetched
+
+    return fetch_and_cache_markdown(url)
+
+
+def fetch_and_cache_markdown(url):
+    """
+    Get the full markdown of a page from the shared cache, or fetch it into the cache.
+    
+    Static pages are fetched directly when the direct fetcher is enabled; the
+    rest are scraped with Firecrawl.
+    
+    Args:
+        url (str): The URL to scrape
+    
+    Returns:
+        str: The markdown content of the page
+    
+    Raises:
+        Exception: If Firecrawl fails to scrape the page
+    """
+    fetch_span = current_span()
+
+    # Serve recently scraped pages from the shared cache
+    cache = get_scrape_cache()
+    if cache:
+        cached_content = cache.get(url)
+        if cached_content is not None:
+            fetch_span.set_attributes({"cache.hit": True, "scrape.chars": len(cached_content)})
+            return cached_content
+
+    # Fetch static pages directly and the rest with Firecrawl, within the domain's limits
+    direct_fetcher = get_direct_fetcher()
+    with get_domain_politeness().slot(url):
+        if direct_fetcher:
+            markdown_content = direct_fetcher.fetch(url, scrape_with_firecrawl)
+        else:
+            markdown_content = scrape_with_firecrawl(url)
+    fetch_span.set_attributes({"cache.hit": False, "scrape.chars": len(markdown_content)})
+        
+    if cache:
+        cache.set(url, markdown_content)
+    return markdown_content
+
+
+def scrape_with_firecrawl(url):
+    """
+    Scrape a single URL with Firecrawl over the shared connection pool.
+    
+    Args:
+        url (str): The URL to scrape
+    
+    Returns:
+        str: The markdown content of the page
+    """
+    return get_firecrawl_client().scrape_url(url).get("markdown") or ""
+
+
+@traced("scrape.fetch_many", "client")
+def fetch_many_markdown(urls):
+    """
+    Get the full markdown of several pages with as few Firecrawl round trips as possible.
+    
+    Prefetched and cached pages are served directly, the rest are scraped in one batch
+    job. Pages the batch job could not return (or all of them, if the batch
+    endpoint fails) are scraped individually in parallel, as are pages of
+    domains the direct fetcher still fetches directly.
+    
+    Args:
+        urls (List[str]): The URLs to scrape
+    
+    Returns:
+        Dict[str, Union[str, Exception]]: Markdown, or the error raised, keyed by URL
+    """
+    results = {}
+    cache = get_scrape_cache()
+    prefetcher = get_prefetcher()
+
+    to_fetch = []
+    for url in dict.fromkeys(urls):
+        cached_content = prefetcher.claim(url) if prefetcher else None
+        if cached_content is None and cache:
+            cached_content = cache.get(url)
+        if cached_content is not None:
+            results[url] = cached_content
+        else:
+            to_fetch.append(url)
+
+    fetch_span = current_span()
+    fetch_span.set_attributes({"scrape.urls": len(results) + len(to_fetch), "cache.hits": len(results)})
+
+    # Pages likely to be static skip the batch job and are fetched directly below
+    direct_fetcher = get_direct_fetcher()
+    direct = [url for url in to_fetch if direct_fetcher.prefers_direct(url)] if direct_fetcher else []
+    to_batch = [url for url in to_fetch if url not in direct]
+
+    if len(to_batch) > 1:
+        try:
+            batch_results = get_firecrawl_client().batch_scrape_urls(to_batch)
+        except Exception as e:
+            print(f"Batch scrape failed, falling back to single scrapes: {str(e)}")
+            batch_results = {}
+        for url, markdown_content in batch_results.items():
+            if cache:
+                cache.set(url, markdown_content)
+            results[url] = markdown_content
+        fetch_span.set_attribute("scrape.batched", len(batch_results))
+        to_fetch = [url for url in to_fetch if url not in results]
+
+    if to_fetch:
+        def fetch_or_error(url):
+            try:
+                return fetch_markdown(url)
+            except Exception as e:
+                return e
+
+        # Each worker runs in its own copy of this context so its spans nest under ours
+        contexts = [contextvars.copy_context() for _ in to_fetch]
+        with ThreadPoolExecutor(max_workers=min(len(to_fetch), MAX_PARALLEL_SCRAPES)) as executor:
+            fetched = executor.map(lambda context, url: context.run(fetch_or_error, url), contexts, to_fetch)
+            for url, result in zip(to_fetch, fetched):
+                results[url] = result
+
+    return results
+
+
+def prepare_page_for_agent(url, markdown_content, data_point_manager):
+    """
+    Reduce a page to what the agent needs before it enters the conversation.
+    
+    A page that nearly duplicates one scraped earlier in the conversation is
+    cut down to its new lines. Data points the pre-extractor finds on the page
+    with high confidence are filled first, and listed at the top of the content.
+    
+    Args:
+        url (str): The URL the page was scraped from
+        markdown_content (str): The full page markdown
+        data_point_manager (DataPointManager): Session state with the data points still missing
+    
+    Returns:
+        str: The content to return from the tool
+    """
+    if not markdown_content:
+        return markdown_content
+
+    notes = []
+    detector = get_near_duplicate_detector()
+    if detector:
+        markdown_content, duplicate_note = detector.deduplicate(url, markdown_content,
+                                                                data_point_manager.page_fingerprints)
+        if duplicate_note:
+            notes.append(duplicate_note)
+        if not markdown_content:
+            return duplicate_note
+
+    pre_extractor = get_pre_extractor()
+    filled = pre_extractor.apply(markdown_content, data_point_manager, reference=url,
+                                 entity_name=data_point_manager.entity_name) if pre_extractor else []
+    if filled:
+        notes.append(format_filled(filled))
+    content = _reduce_page(url, markdown_content, data_point_manager)
+    return "\n\n".join(notes + [content])
+
+
+def _reduce_page(url, markdown_content, data_point_manager):
+    relevance_filter = get_relevance_filter()
+    page_store = get_page_store()
+
+    if page_store and len(markdown_content.encode("utf-8")) > page_store.inline_threshold:
+        handle = page_store.put(url, markdown_content)
+        if relevance_filter:
+            body = relevance_filter.filter(
+                markdown_content,
+                data_point_manager.entity_name,
+                data_point_manager.get_missing_data_points()
+            )
+        else:
+            chunk = page_store.read(handle)
+            body = f"{chunk['content']}\n[next offset: {chunk['next_offset']}]"
+        return (
+            f"[Large page stored as handle {handle}. Use read_more with this handle and an offset "
+            f"to read further, or with a query to search within the page.]\n"
+            f"Outline:\n{page_store.outline_text(handle)}\n\n{body}"
+        )
+
+    if relevance_filter:
+        return relevance_filter.filter(
+            markdown_content,
+            data_point_manager.entity_name,
+            data_point_manager.get_missing_data_points()
+        )
+    return markdown_content
@@ -0,0 +1,40 @@
+from typing import List
+from data_point_manager import DataPointManager, get_data_point_manager
+from tools.scrape import fetch_many_markdown, prepare_page_for_agent
+from tools.registry import tool
+
+
+@tool(description="Scrape several URLs for information in one call; prefer this over repeated "
+                  "scrape calls when you have a list of URLs")
+def scrape_many(urls: List[str], *, data_point_manager: DataPointManager = None):
+    """
+    Scrape several URLs at once and return the markdown content of each.
+    
+    Args:
+        urls (List[str]): The urls of the websites to scrape
+        data_point_manager (DataPointManager, optional): Session state to record the
+            scraped links in, defaults to the global data point manager
+    
+    Returns:
+        str: The content of every page under a heading with its URL
+    """
+    data_point_manager = data_point_manager or get_data_point_manager()
+
+    # Pages scraped earlier in the session are returned again, under the URL they were first
+    # scraped as, as the conversation may no longer hold them once older messages are trimmed
+    page_urls = {url: data_point_manager.frontier.first_fetched_as(url) or url for url in urls}
+    results = fetch_many_markdown(list(page_urls.values()))
+
+    pages = []
+    for url, page_url in page_urls.items():
+        result = results[page_url]
+        if isinstance(result, Exception):
+            error_msg = f"Unable to scrape the url {url}: {str(result)}"
+            print(error_msg)
+            pages.append(f"## {url}\n{error_msg}")
+            continue
+
+        data_point_manager.add_scraped_link(url)
+        pages.append(f"## {url}\n{prepare_page_for_agent(page_url, result, data_point_manager)}")
+
+    return "\n\n".join(pages)
@@ -1,50 +1,80 @@
 import json
-from firecrawl import FirecrawlApp
+import re
 from utils.prompt_loader import load_prompt
 import utils.chat_utils as chat_utils
-from data_point_manager import get_data_point_manager
+from data_point_manager import DataPointManager, get_data_point_manager
+from utils.search_cache import get_search_cache
+from utils.scrape_cache import get_scrape_cache
+from utils.firecrawl_client import get_firecrawl_client
+from tools.registry import tool
+from utils.tracing import span, traced, current_span, record_usage
+from utils.prefetcher import get_prefetcher
+from utils.model_router import get_model_router
+from utils.pre_extraction import get_pre_extractor
+from tools.scrape import fetch_and_cache_markdown
 
-def search(query, entity_name: str):
+RESULT_URL = re.compile(r"""['"]url['"]: ['"]([^'"]+)['"]""")
+
+@tool(description="Search for relevant URLs based on a query")
+def search(query: str, entity_name: str, *, data_point_manager: DataPointManager = None):
     """
-    Search for information about an entity using FirecrawlApp and process results with GPT.
+    Search for information about an entity using Firecrawl and process results with GPT.
+    
+    Data points the pre-extractor finds in the results with high confidence are
+    filled before the parse, which then only asks for the rest; if nothing is
+    left to find, the parse is skipped.
     
     Args:
         query (str): The search query to execute
         entity_name (str): Name of the entity to search information about
+        data_point_manager (DataPointManager, optional): Session state holding the data
+            points still to find, defaults to the global data point manager
     
     Returns:
         dict: JSON response containing found information and related URLs to scrape
     """
+    data_point_manager = data_point_manager or get_data_point_manager()
+    cache = get_search_cache()
+    search_span = current_span()
     try:
-        app = FirecrawlApp()
-        
-        # Configure search parameters
-        
-        # Execute search
-        search_result = app.search(query)
-        search_result_str = str(search_result)
+        search_result_str = get_search_results(query)
+
+        pre_extractor = get_pre_extractor()
+        filled = []
+        if pre_extractor:
+            filled = pre_extractor.apply(search_result_str, data_point_manager, entity_name=entity_name,
+                                         reference_for=lambda offset: _result_url_at(search_result_str, offset))
         
         # Get list of data points we still need to find
-        data_keys_to_search = get_data_point_manager().get_missing_data_points()
+        data_keys_to_search = data_point_manager.get_missing_data_points()
+        if filled and not data_keys_to_search:
+            return _with_filled({"related_urls": [], "info_found": []}, filled)
+
+        # Parsed results are cached per set of models the parse may have used
+        router = get_model_router()
+        route_key = router.route_key("search_parse", chat_utils.GPT_MODEL)
+        if cache:
+            cached_result = cache.get_parsed(search_result_str, entity_name, data_keys_to_search, route_key)
+            search_span.set_attribute("search.parsed_cache_hit", cached_result is not None)
+            if cached_result is not None:
+                return _with_filled(_queue_related_urls(cached_result, data_point_manager), filled)
         
-        # Load and format the prompt template
-        replacements = {
-            "entity_name": entity_name,
-            "search_results": search_result_str,
-            "data_points": ', '.join(data_keys_to_search)
-        }
-        prompt = load_prompt('parse_search_result', replacements)
+        prompt = build_parse_prompt(search_result_str, entity_name, data_keys_to_search)
         
-        # Get structured response from GPT
-        response = chat_utils.client.chat.completions.create(
-            model=chat_utils.GPT_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
+        # Get structured response from GPT, escalating to the next model of the route on invalid or empty JSON
+        with span("llm.search_parse", "client", **{"llm.request_chars": len(prompt)}) as parse_span:
+            response = router.complete("search_parse", lambda model: chat_utils.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"}
+            ), chat_utils.GPT_MODEL, accept=_has_parsed_content)
+            record_usage(parse_span, response)
         
         try:
             result = json.loads(response.choices[0].message.content)
-            return result
+            if cache:
+                cache.set_parsed(search_result_str, entity_name, data_keys_to_search, route_key, result)
+            return _with_filled(_queue_related_urls(result, data_point_manager), filled)
         except json.JSONDecodeError:
             print("Error: Failed to parse GPT response as JSON")
             return {"related urls to scrape further": [], "info found": []}
@@ -52,3 +82,154 @@ def search(query, entity_name: str):
     except Exception as e:
         print(f"Search failed: {str(e)}")
         return {"related urls to scrape further": [], "info found": []}
+
+
+def get_search_results(query):
+    """
+    Run a web search, reusing the results of an equivalent earlier query.
+    
+    Args:
+        query (str): The search query to execute
+    
+    Returns:
+        str: The search results as passed to the parse prompt
+    """
+    cache = get_search_cache()
+    search_result_str = cache.get_results(query) if cache else None
+    current_span().set_attribute("search.results_cache_hit", search_result_str is not None)
+    if search_result_str is None:
+        search_result = get_firecrawl_client().search(query)
+        search_result_str = str(search_result)
+        if cache:
+            cache.set_results(query, search_result_str)
+    return search_result_str
+
+
+def build_parse_prompt(search_result_str, entity_name, data_points):
+    """
+    Build the prompt that extracts data points and related URLs from search results.
+    
+    Args:
+        search_result_str (str): The search results
+        entity_name (str): Name of the entity searched for
+        data_points (List[str]): Names of the data points to extract
+    
+    Returns:
+        str: The parse_search_result prompt
+    """
+    replacements = {
+        "entity_name": entity_name,
+        "search_results": search_result_str,
+        "data_points": ', '.join(data_points)
+    }
+    return load_prompt('parse_search_result', replacements)
+
+
+def parse_extraction(content):
+    """
+    Parse the JSON of a search parse or extraction response.
+    
+    Args:
+        content (str): The response message content
+    
+    Returns:
+        Optional[dict]: The parsed object, or None if the JSON is invalid or every
+            field is empty
+    """
+    try:
+        result = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    return result if isinstance(result, dict) and any(result.values()) else None
+
+
+def _has_parsed_content(response):
+    return parse_extraction(response.choices[0].message.content) is not None
+
+
+def _queue_related_urls(result, data_point_manager):
+    """
+    Queue the related URLs of a search result in the session's frontier.
+    
+    URLs already scraped in this session, in any spelling, are dropped from the
+    result so the agent does not scrape them again. If prefetching is enabled,
+    the top queued candidates start downloading in the background.
+    
+    Args:
+        result (dict): Parsed search result with a "related_urls" list
+        data_point_manager (DataPointManager): Session state holding the frontier
+    
+    Returns:
+        dict: The result with only unscraped related URLs
+    """
+    related_urls = result.get("related_urls")
+    if not isinstance(related_urls, list):
+        return result
+
+    unscraped = [url for url in related_urls if isinstance(url, str) and not data_point_manager.has_scraped_link(url)]
+    frontier = data_point_manager.frontier
+    frontier.add_candidates(unscraped)
+
+    prefetcher = get_prefetcher()
+    if prefetcher:
+        prefetcher.prefetch(_prefetch_candidates(frontier, prefetcher.top_n), _prefetch_page)
+    current_span().set_attribute("frontier.candidates", frontier.candidate_count())
+    return {**result, "related_urls": unscraped}
+
+
+def _prefetch_candidates(frontier, limit):
+    """
+    Take the best queued candidates of the session worth prefetching.
+    
+    Candidates queued by earlier searches compete with the new ones. Pages another
+    session fetched are skipped when the scrape cache is on, as they are already in it.
+    
+    Args:
+        frontier (UrlFrontier): The session's frontier
+        limit (int): Maximum number of URLs to take
+    
+    Returns:
+        List[str]: URLs to prefetch, best first
+    """
+    skip_shared = get_scrape_cache() is not None
+    urls = []
+    while len(urls) < limit:
+        url = frontier.next_candidate()
+        if url is None:
+            break
+        if skip_shared and frontier.fetched_anywhere(url):
+            continue
+        urls.append(url)
+    return urls
+
+
+def _with_filled(result, filled):
+    """
+    Tell the agent which data points were filled from the search results without the parse.
+    
+    Args:
+        result (dict): The search result
+        filled (List[Extraction]): Pre-extracted values that filled data points
+    
+    Returns:
+        dict: The result, with the filled values under "filled_automatically" if there are any
+    """
+    if not filled or not isinstance(result, dict):
+        return result
+    return {**result, "filled_automatically": [
+        {"data_point": extraction.name, "value": extraction.value, "confidence": extraction.confidence}
+        for extraction in filled
+    ]}
+
+
+def _result_url_at(search_result_str, offset):
+    # The results are the repr of a list of dicts; a match belongs to the last result URL before it
+    url = None
+    for match in RESULT_URL.finditer(search_result_str, 0, offset):
+        url = match.group(1)
+    return url
+
+
+@traced("scrape.prefetch", "client")
+def _prefetch_page(url):
+    return fetch_and_cache_markdown(url)
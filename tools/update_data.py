@@ -1,17 +1,42 @@
-from data_point_manager import get_data_point_manager
+from typing import List, NotRequired, TypedDict
 
-def update_data(datas_update):
+from data_point_manager import DataPointManager, get_data_point_manager
+from tools.registry import tool
+
+
+class DataUpdate(TypedDict):
+    """
+    The data point to update, should follow specific json format
+
+    Attributes:
+        data_point (str): The name of the data point
+        value (str): The value of the data point
+        reference (str): The reference URL of the data point
+        confidence (float): How certain the value is, from 0 to 1
+    """
+    data_point: str
+    value: str
+    reference: str
+    confidence: NotRequired[float]
+
+
+@tool(description="Save data points found for later retrieval; only pass on data points that we found")
+def update_data(datas_update: List[DataUpdate], *, data_point_manager: DataPointManager = None):
     """
     Update the state with new data points found
     
     Args:
-        datas_update (List[dict]): The new data points found, containing data_point, value, and reference
+        datas_update (List[DataUpdate]): The data points to update
+        data_point_manager (DataPointManager, optional): Session state to update, defaults
+            to the global data point manager
     
     Returns:
         str: Message confirming data update
     """
+    data_point_manager = data_point_manager or get_data_point_manager()
 
     for data in datas_update:
-        get_data_point_manager().update_data_point(data["data_point"], data["value"], data["reference"])
+        data_point_manager.update_data_point(data["data_point"], data["value"], data["reference"],
+                                             data.get("confidence"))
     
-    return f"data updated: {get_data_point_manager().get_current_state()}" 
\ No newline at end of file
+    return f"data updated: {data_point_manager.get_current_state()}"
@@ -0,0 +1,273 @@
+"""
+OpenAI Batch API client for bulk chat completions.
+
+Requests are written to JSONL input files (one chat completion body per line,
+tagged with a custom_id), uploaded with purpose "batch" and submitted as
+batches with a 24 hour completion window. Batches are polled concurrently
+with asyncio, backing off between status checks, and their output files are
+downloaded and matched back to the requests by custom_id.
+
+Batch requests cost half as much as synchronous ones and do not count
+against the synchronous rate limits, at the price of latency. Input files and
+a manifest of submitted batch ids are kept in the work directory; submitting
+under a name already in the manifest picks up the batches submitted then, so
+an interrupted run can be rerun under its name without paying twice.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# Limit of the Batch API per input file
+MAX_REQUESTS_PER_BATCH = 50000
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    body: Dict
+
+    def to_line(self) -> str:
+        return json.dumps({"custom_id": self.custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": self.body})
+
+
+class BatchError(Exception):
+    """Raised when a batch cannot be submitted or ends without results."""
+
+
+def write_batch_file(requests: List[BatchRequest], path: Path) -> Path:
+    """
+    Write requests to a Batch API input file.
+
+    Args:
+        requests (List[BatchRequest]): The requests, with unique custom ids
+        path (Path): File to write
+
+    Returns:
+        Path: The written file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for request in requests:
+            f.write(request.to_line() + "\n")
+    return path
+
+
+def parse_batch_output(text: str) -> Dict[str, Optional[Dict]]:
+    """
+    Parse a batch output or error file.
+
+    Args:
+        text (str): The JSONL file content
+
+    Returns:
+        Dict[str, Optional[Dict]]: The chat completion body of each custom id, or None
+            for requests that failed
+    """
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code", 200) != 200:
+            results[entry["custom_id"]] = None
+        else:
+            results[entry["custom_id"]] = response.get("body")
+    return results
+
+
+class BatchRunner:
+    def __init__(self, async_client, work_dir: str = ".cache/batches", poll_interval: float = 30.0,
+                 initial_poll_interval: float = 1.0, max_requests_per_batch: int = MAX_REQUESTS_PER_BATCH,
+                 completion_window: str = "24h", timeout: Optional[float] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            async_client (AsyncOpenAI): Client used for the files and batches endpoints
+            work_dir (str): Directory for input files and the batch manifest
+            poll_interval (float): Longest wait between status checks of a batch;
+                polling starts at initial_poll_interval and backs off up to this
+            initial_poll_interval (float): First wait between status checks
+            max_requests_per_batch (int): Requests per input file; larger sets are split
+            completion_window (str): Completion window requested for each batch
+            timeout (float, optional): Seconds run() waits for a batch before giving up;
+                no limit if None
+        """
+        self.client = async_client
+        self.work_dir = Path(work_dir)
+        self.poll_interval = poll_interval
+        self.initial_poll_interval = initial_poll_interval
+        self.max_requests_per_batch = max_requests_per_batch
+        self.completion_window = completion_window
+        self.timeout = timeout
+
+    async def submit(self, requests: List[BatchRequest], name: str) -> List[str]:
+        """
+        Write, upload and submit requests, split into as many batches as needed.
+
+        Input files the manifest shows were submitted earlier under the same name,
+        with the same number of requests, are not submitted again; their batch ids
+        are returned instead.
+
+        Args:
+            requests (List[BatchRequest]): The requests to submit
+            name (str): Prefix of the input file names and batch metadata
+
+        Returns:
+            List[str]: Ids of the batches
+        """
+        submitted = {entry["input_file"]: entry for entry in self.submitted(name)}
+        batch_ids = []
+        for index in range(0, len(requests), self.max_requests_per_batch):
+            chunk = requests[index:index + self.max_requests_per_batch]
+            path = self.work_dir / f"{name}-{index // self.max_requests_per_batch}.jsonl"
+            entry = submitted.get(str(path))
+            if entry is not None and entry["requests"] == len(chunk):
+                print(f"Resuming batch {entry['batch_id']} submitted for {path.name}")
+                batch_ids.append(entry["batch_id"])
+                continue
+
+            write_batch_file(chunk, path)
+            uploaded = await self.client.files.create(file=path, purpose="batch")
+            batch = await self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=self.completion_window,
+                metadata={"name": name}
+            )
+            batch_ids.append(batch.id)
+            self._record_submission(name, batch.id, path, len(chunk))
+        return batch_ids
+
+    def submitted(self, name: str) -> List[Dict]:
+        """
+        Read the manifest entries of the batches submitted under a name.
+
+        Args:
+            name (str): Name the batches were submitted under
+
+        Returns:
+            List[Dict]: Entries with batch_id, input_file, requests and submitted_at,
+                oldest first
+        """
+        try:
+            with open(self.work_dir / "manifest.jsonl", "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a partial last line
+                continue
+            if entry.get("name") == name:
+                entries.append(entry)
+        return entries
+
+    async def wait(self, batch_id: str, timeout: Optional[float] = None):
+        """
+        Poll a batch until it reaches a terminal status.
+
+        Args:
+            batch_id (str): The batch to wait for
+            timeout (float, optional): Seconds to wait before giving up; no limit if None
+
+        Returns:
+            Batch: The final batch object
+
+        Raises:
+            BatchError: If the batch is still running after timeout seconds
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        delay = self.initial_poll_interval
+        while True:
+            batch = await self.client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise BatchError(f"Batch {batch_id} is still {batch.status} after {timeout} seconds")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.poll_interval)
+
+    async def results(self, batch) -> Dict[str, Optional[Dict]]:
+        """
+        Download the results of a finished batch.
+
+        Args:
+            batch (Batch): A batch in a terminal status
+
+        Returns:
+            Dict[str, Optional[Dict]]: The chat completion body of each custom id, or
+                None for requests that failed
+
+        Raises:
+            BatchError: If the batch failed as a whole
+        """
+        if batch.status == "failed":
+            raise BatchError(f"Batch {batch.id} failed: {batch.errors}")
+
+        results = {}
+        for file_id in (batch.error_file_id, batch.output_file_id):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                results.update(parse_batch_output(content.text))
+        return results
+
+    async def run(self, requests: List[BatchRequest], name: str) -> Dict[str, Optional[Dict]]:
+        """
+        Submit requests and wait for all their batches concurrently.
+
+        Requests missing from the results (e.g. of an expired batch) map to None.
+        Running again under the same name picks up the batches already submitted.
+
+        Args:
+            requests (List[BatchRequest]): The requests to run
+            name (str): Prefix of the input file names and batch metadata
+
+        Returns:
+            Dict[str, Optional[Dict]]: The chat completion body of each custom id, or None
+
+        Raises:
+            BatchError: If a batch is still running after the runner's timeout
+        """
+        if not requests:
+            return {}
+
+        batch_ids = await self.submit(requests, name)
+
+        async def finish(batch_id):
+            batch = await self.wait(batch_id, self.timeout)
+            try:
+                return await self.results(batch)
+            except BatchError as e:
+                print(str(e))
+                return {}
+
+        results = {request.custom_id: None for request in requests}
+        for batch_results in await asyncio.gather(*(finish(batch_id) for batch_id in batch_ids)):
+            results.update((custom_id, body) for custom_id, body in batch_results.items() if custom_id in results)
+        return results
+
+    def _record_submission(self, name: str, batch_id: str, path: Path, count: int) -> None:
+        # Read back by submitted() when a run under the same name is resumed
+        line = json.dumps({"name": name, "batch_id": batch_id, "input_file": str(path), "requests": count,
+                           "submitted_at": int(time.time())}) + "\n"
+        with open(self.work_dir / "manifest.jsonl", "ab+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Do not extend the partial last line of a run killed mid-write
+                    line = "\n" + line
+            f.write(line.encode("utf-8"))
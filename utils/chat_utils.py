@@ -1,21 +1,30 @@
-import tiktoken
+import json
 from tenacity import retry, wait_random_exponential, stop_after_attempt
 from openai import OpenAI
+from utils.token_counter import Conversation
+from utils.memory import RollingSummary, build_summary_prompt, get_memory_policy
+from utils.model_router import get_model_router
+from utils.tracing import span, traced, current_span, record_usage, payload_size
+from utils.pretty_print import conversation_printing
 
 # Initialize client (will be set from main app)
 client = None
+async_client = None
 GPT_MODEL = None
 
-def set_client_and_model(openai_client, model_name):
+def set_client_and_model(openai_client, model_name, async_openai_client=None):
     """
     Set the OpenAI client and model for the chat utilities.
     
     Args:
         openai_client: The OpenAI client instance
         model_name (str): The GPT model name to use
+        async_openai_client (optional): The AsyncOpenAI client instance used by the
+            async agent loop
     """
-    global client, GPT_MODEL
+    global client, async_client, GPT_MODEL
     client = openai_client
+    async_client = async_openai_client
     GPT_MODEL = model_name
 
 @retry(wait=wait_random_exponential(multiplier=1, max=40), stop=stop_after_attempt(3))
@@ -27,7 +36,8 @@ def chat_completion_request(messages, tool_choice, tools, model=None):
         messages (list): List of conversation messages
         tool_choice: Tool choice parameter for OpenAI API
         tools: Available tools for the agent
-        model (str, optional): Model to use, defaults to global GPT_MODEL
+        model (str, optional): Model to use, defaults to the models of the
+            "agent_turn" route
     
     Returns:
         OpenAI response object
@@ -38,67 +48,150 @@ def chat_completion_request(messages, tool_choice, tools, model=None):
     if not client:
         raise ValueError("Client not initialized. Call set_client_and_model() first.")
     
-    model_to_use = model or GPT_MODEL
     try:
-        response = client.chat.completions.create(
-            model=model_to_use,
-            messages=messages,
-            tools=tools,
-            tool_choice=tool_choice,
-        )
+        with span("llm.chat_completion", "client") as llm_span:
+            if llm_span.recording:
+                # The router adds the model that answered
+                llm_span.set_attributes({"llm.messages": len(messages), "llm.request_chars": payload_size(messages),
+                                         "llm.tools": len(tools or [])})
+            response = get_model_router().complete("agent_turn", lambda route_model: client.chat.completions.create(
+                model=route_model,
+                messages=messages,
+                tools=tools,
+                tool_choice=tool_choice,
+            ), GPT_MODEL, accept=valid_agent_turn, model=model)
+            record_usage(llm_span, response)
         return response
     except Exception as e:
-        print("Unable to generate ChatCompletion response")
-        print(f"Exception: {e}")
-        print(f"\n\n\n the messages were: {messages}")
-        print(f"\n\n\n the tools were: {tools}")
-        print(f"\n\n\n the tool choice was: {tool_choice}")
-        raise e
+        # The llm.chat_completion span has recorded the exception
+        if conversation_printing():
+            print(f"Unable to generate ChatCompletion response: {e}")
+        raise
 
+@retry(wait=wait_random_exponential(multiplier=1, max=40), stop=stop_after_attempt(3))
+async def async_chat_completion_request(messages, tool_choice, tools, model=None):
+    """
+    Make an async chat completion request to OpenAI with retry logic.
+    
+    Args:
+        messages (list): List of conversation messages
+        tool_choice: Tool choice parameter for OpenAI API
+        tools: Available tools for the agent
+        model (str, optional): Model to use, defaults to the models of the
+            "agent_turn" route
+    
+    Returns:
+        OpenAI response object
+    
+    Raises:
+        Exception: If the API call fails after retries
+    """
+    if not async_client:
+        raise ValueError("Async client not initialized. Call set_client_and_model() with async_openai_client first.")
+    
+    try:
+        with span("llm.chat_completion", "client") as llm_span:
+            if llm_span.recording:
+                # The router adds the model that answered
+                llm_span.set_attributes({"llm.messages": len(messages), "llm.request_chars": payload_size(messages),
+                                         "llm.tools": len(tools or [])})
+            response = await get_model_router().complete_async("agent_turn", lambda route_model: async_client.chat.completions.create(
+                model=route_model,
+                messages=messages,
+                tools=tools,
+                tool_choice=tool_choice,
+            ), GPT_MODEL, accept=valid_agent_turn, model=model)
+            record_usage(llm_span, response)
+        return response
+    except Exception as e:
+        # The llm.chat_completion span has recorded the exception
+        if conversation_printing():
+            print(f"Unable to generate ChatCompletion response: {e}")
+        raise
+
+@traced("memory_optimise")
 def memory_optimise(messages: list):
     """
-    Optimize memory usage by summarizing old messages when conversation gets too long.
+    Optimize memory usage by folding old messages into a rolling summary when the conversation gets too long.
+    
+    Token counts are kept per message by Conversation, so deciding whether to
+    trim does not re-encode the conversation on every turn. The leading task
+    messages are kept as they are; only messages evicted since the last trim
+    are sent to the summary model. With background summaries enabled in
+    config/memory.json, the summary is computed while the next turn runs and
+    applied on the following call.
     
     Args:
         messages (list): List of conversation messages
     
     Returns:
-        list: Optimized message list with summarized history if needed
+        Conversation: Optimized message list with summarized history if needed
     """
     if not client:
         raise ValueError("Client not initialized. Call set_client_and_model() first.")
     
-    system_prompt = messages[0]["content"]
-    
-    # Token count using tiktoken
-    encoding = tiktoken.encoding_for_model(GPT_MODEL)
-    
-    if len(messages) > 24 or len(encoding.encode(str(messages))) > 10000:
-        latest_messages = messages[-12:]
-        
-        token_count_latest_messages = len(encoding.encode(str(latest_messages)))
-        print(f"Token count of latest messages: {token_count_latest_messages}")
-        
-        index = messages.index(latest_messages[0])
-        early_messages = messages[:index]
-        
-        prompt = f"""{early_messages}
-        -----
-        Above is the past history of conversation between user & AI,
-        including actions AI already taken
-        Please summarise the past actions taken so far,
-        what key information learnt & tasks that already completed
-        
-        SUMMARY:
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}]
-        )
-        
-        system_prompt = f"""{system_prompt}; Here is a summary of past actions taken so far: {response.choices[0].message.content}"""
-        messages = [{"role": "system", "content": system_prompt}] + latest_messages
-        
-        return messages
-    
-    return messages 
\ No newline at end of file
+    if not isinstance(messages, Conversation):
+        messages = Conversation(messages, model=GPT_MODEL)
+    
+    policy = get_memory_policy()
+    optimise_span = current_span()
+    optimise_span.set_attributes({"conversation.messages": len(messages), "conversation.tokens": messages.token_total})
+    
+    summary = messages.rolling_summary
+    if summary is None:
+        summary = messages.rolling_summary = RollingSummary.from_messages(messages)
+    
+    dropped = 0
+    pending = summary.take_pending()
+    if pending is not None:
+        end, future = pending
+        try:
+            dropped += summary.apply(messages, end, future.result())
+        except Exception as e:
+            print(f"Background summary failed: {str(e)}")
+    
+    if policy.needs_trim(messages):
+        end = summary.trim_point(messages, policy)
+        if end > summary.first_evictable:
+            previous, evicted = summary.text, summary.evicted_messages(messages, end)
+            print(f"Token count of latest messages: {messages.token_count(end)}")
+            if policy.background:
+                summary.start_background(end, lambda: _summarize(previous, evicted))
+            else:
+                dropped += summary.apply(messages, end, _summarize(previous, evicted))
+    
+    optimise_span.set_attributes({"memory_optimise.summarized": dropped > 0, "memory_optimise.messages_dropped": dropped,
+                                  "memory_optimise.background_pending": summary.pending is not None})
+    return messages
+
+
+def valid_agent_turn(response) -> bool:
+    """
+    Check that an agent turn can be acted on: it stopped or called tools, with JSON arguments.
+    
+    Args:
+        response: A chat completion response
+    
+    Returns:
+        bool: False if the response should escalate to the route's next model
+    """
+    choice = response.choices[0]
+    if choice.finish_reason not in ("stop", "tool_calls"):
+        return False
+    for tool_call in choice.message.tool_calls or []:
+        try:
+            json.loads(tool_call.function.arguments)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+def _summarize(previous_summary, evicted_messages):
+    prompt = build_summary_prompt(previous_summary, evicted_messages)
+    summary_attributes = {"llm.request_chars": len(prompt), "memory_optimise.evicted_messages": len(evicted_messages)}
+    with span("llm.summarize", "client", **summary_attributes) as summary_span:
+        response = get_model_router().complete("summarize", lambda route_model: client.chat.completions.create(
+            model=route_model, messages=[{"role": "user", "content": prompt}]
+        ), GPT_MODEL, accept=lambda r: bool(r.choices[0].message.content))
+        record_usage(summary_span, response)
+    return response.choices[0].message.content
@@ -0,0 +1,482 @@
+"""
+Direct fetch fast path for static pages.
+
+Most pages the agents scrape are static HTML that does not need Firecrawl's
+headless browser. The direct fetcher GETs a page over a pooled httpx client
+and converts the HTML to markdown locally, leaving out navigation, footers,
+scripts and styles. A page that comes back as anything but HTML or plain
+text, fails, is too large, has too little text, or looks like it is rendered
+by JavaScript is scraped with Firecrawl instead.
+
+The fetcher learns per domain which path works: once a domain's pages have
+needed Firecrawl a few times in a row, its pages go straight to Firecrawl,
+with an occasional direct probe in case the site changed. Latency per path
+and fallbacks per reason are tracked so the two paths can be compared.
+Settings come from config/direct_fetch.json.
+"""
+
+import json
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from urllib.parse import urljoin
+
+import httpx
+
+from utils.tracing import LatencyHistogram, current_span
+from utils.url_utils import get_domain
+
+# Elements whose content never belongs in the page markdown
+SKIPPED_TAGS = {"head", "script", "style", "noscript", "template", "svg", "iframe", "canvas",
+                "nav", "footer", "aside", "form", "button", "select"}
+SKIPPED_ROLES = {"navigation", "contentinfo", "banner", "search"}
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "header", "blockquote", "dl", "dt", "dd",
+              "figure", "figcaption", "address", "table", "ul", "ol"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Signs that a page only renders its content with JavaScript
+EMPTY_APP_ROOT = re.compile(r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>', re.IGNORECASE)
+JS_REQUIRED = re.compile(r"(?:enable|requires?|turn on)\s+javascript|javascript\s+(?:is\s+)?(?:disabled|required)",
+                         re.IGNORECASE)
+
+direct_fetcher = None
+_direct_fetcher_lock = threading.Lock()
+
+
+def get_direct_fetcher():
+    """
+    Get the shared direct fetcher, creating it from config/direct_fetch.json on first use.
+
+    Returns:
+        Optional[DirectFetcher]: The fetcher, or None if direct fetching is disabled
+    """
+    global direct_fetcher
+    if direct_fetcher is None:
+        with _direct_fetcher_lock:
+            if direct_fetcher is None:
+                direct_fetcher = DirectFetcher.from_config() or False
+    return direct_fetcher or None
+
+
+def set_direct_fetcher(fetcher):
+    """
+    Replace the shared direct fetcher.
+
+    Args:
+        fetcher (Optional[DirectFetcher]): The fetcher to use, or None to always scrape with Firecrawl
+    """
+    global direct_fetcher
+    direct_fetcher = fetcher if fetcher is not None else False
+
+
+class MarkdownConverter(HTMLParser):
+    """Converts an HTML document to markdown, leaving out page chrome and scripts."""
+
+    def __init__(self, base_url: str = ""):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.parts = []
+        self.script_chars = 0
+        self.noscript_text = []
+        self._skip_tag = None
+        self._skip_depth = 0
+        self._lists = []
+        self._links = []
+        self._pre = 0
+        self._cells = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag == "head" and tag == "body":
+            # Pages that never close their head
+            self._skip_tag = None
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        attrs = dict(attrs)
+        if tag in SKIPPED_TAGS or attrs.get("role") in SKIPPED_ROLES or attrs.get("aria-hidden") == "true":
+            if tag not in VOID_TAGS:
+                self._skip_tag, self._skip_depth = tag, 1
+            return
+
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._block()
+            self.parts.append("#" * int(tag[1]) + " ")
+        elif tag in ("ul", "ol"):
+            self._block()
+            self._lists.append(0 if tag == "ol" else None)
+        elif tag == "li":
+            self._line()
+            marker = "- "
+            if self._lists and self._lists[-1] is not None:
+                self._lists[-1] += 1
+                marker = f"{self._lists[-1]}. "
+            self.parts.append("  " * max(len(self._lists) - 1, 0) + marker)
+        elif tag == "a":
+            self._links.append((len(self.parts), attrs.get("href")))
+            self.parts.append("[")
+        elif tag in ("strong", "b"):
+            self.parts.append("**")
+        elif tag == "pre":
+            self._block()
+            self.parts.append("```\n")
+            self._pre += 1
+        elif tag == "code" and not self._pre:
+            self.parts.append("`")
+        elif tag == "tr":
+            self._line()
+            self._cells = 0
+        elif tag in ("td", "th"):
+            if self._cells:
+                self.parts.append(" | ")
+            self._cells += 1
+        elif tag == "br":
+            self.parts.append("\n")
+        elif tag == "hr":
+            self._block()
+            self.parts.append("---")
+            self._block()
+        elif tag in BLOCK_TAGS:
+            self._block()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._block()
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._block()
+        elif tag == "a" and self._links:
+            start, href = self._links.pop()
+            text = "".join(self.parts[start + 1:]).strip()
+            if text and href and not href.startswith(("#", "javascript:", "mailto:")):
+                self.parts.append(f"]({urljoin(self.base_url, href)})")
+            else:
+                self.parts[start] = ""
+        elif tag in ("strong", "b"):
+            self.parts.append("**")
+        elif tag == "pre" and self._pre:
+            self._pre -= 1
+            self._line()
+            self.parts.append("```")
+            self._block()
+        elif tag == "code" and not self._pre:
+            self.parts.append("`")
+        elif tag in BLOCK_TAGS:
+            self._block()
+
+    def handle_data(self, data):
+        if self._skip_tag is not None:
+            if self._skip_tag == "script":
+                self.script_chars += len(data)
+            elif self._skip_tag == "noscript":
+                self.noscript_text.append(data)
+            return
+        if self._pre:
+            self.parts.append(data)
+            return
+        text = re.sub(r"\s+", " ", data)
+        if text.strip() or (self.parts and not self.parts[-1].endswith((" ", "\n"))):
+            self.parts.append(text)
+
+    def _line(self):
+        if self.parts and not self.parts[-1].endswith("\n"):
+            self.parts.append("\n")
+
+    def _block(self):
+        self._line()
+        self.parts.append("\n")
+
+    def markdown(self) -> str:
+        text = "".join(self.parts)
+        text = re.sub(r"[ \t]+\n", "\n", text)
+        text = re.sub(r"\n[ \t]+(?=[^-\d\s])", "\n", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def html_to_markdown(html: str, base_url: str = "") -> str:
+    """
+    Convert an HTML page to markdown, leaving out navigation, footers, scripts and styles.
+
+    Args:
+        html (str): The page HTML
+        base_url (str): URL of the page, to make link targets absolute
+
+    Returns:
+        str: The page markdown
+    """
+    converter = MarkdownConverter(base_url)
+    converter.feed(html)
+    converter.close()
+    return converter.markdown()
+
+
+def looks_js_dependent(html: str, converter: MarkdownConverter, text_chars: int, min_chars: int) -> bool:
+    """
+    Guess whether a page needs a browser to render its content.
+
+    Args:
+        html (str): The page HTML
+        converter (MarkdownConverter): The converter the page was fed to
+        text_chars (int): Characters of text in the converted markdown
+        min_chars (int): Text a page needs to be worth keeping
+
+    Returns:
+        bool: True if the page asks for JavaScript, has an empty app root, or is mostly script
+    """
+    if JS_REQUIRED.search(" ".join(converter.noscript_text)) and text_chars < 4 * min_chars:
+        return True
+    if EMPTY_APP_ROOT.search(html) and text_chars < 4 * min_chars:
+        return True
+    return converter.script_chars > 2 * text_chars and text_chars < 8 * min_chars
+
+
+class DirectFetchRejected(Exception):
+    """Raised when a directly fetched page is not good enough and Firecrawl should scrape it."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class DirectFetcher:
+    def __init__(self, min_chars: int = 300, max_bytes: int = 5_000_000, timeout: float = 15.0,
+                 max_connections: int = 20, learn_after: int = 2, reprobe_every: int = 25,
+                 user_agent: str = "Mozilla/5.0 (compatible; research-agent/1.0)"):
+        """
+        Initialize the fetcher and its connection pool.
+
+        Args:
+            min_chars (int): Characters of text a page needs to be served without Firecrawl
+            max_bytes (int): Largest page fetched directly; larger pages go to Firecrawl
+            timeout (float): Request timeout in seconds
+            max_connections (int): Maximum number of pooled connections
+            learn_after (int): Fallbacks in a row after which a domain goes straight to Firecrawl
+            reprobe_every (int): Fetches of such a domain between direct probes
+            user_agent (str): User-Agent header sent with direct requests
+        """
+        self.min_chars = min_chars
+        self.max_bytes = max_bytes
+        self.learn_after = learn_after
+        self.reprobe_every = reprobe_every
+        self.http = httpx.Client(
+            headers={"User-Agent": user_agent, "Accept": "text/html,application/xhtml+xml,text/plain;q=0.9"},
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0
+            )
+        )
+        self.histogram = LatencyHistogram()
+        self._domains = {}  # domain -> {"fallbacks_in_row", "skipped", "direct", "fallbacks"}
+        self._stats = {"direct": 0, "fallbacks": {}, "skipped": 0, "probes": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a fetcher from config/direct_fetch.json.
+
+        Returns:
+            Optional[DirectFetcher]: The configured fetcher, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'direct_fetch.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in direct fetch configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        return cls(
+            min_chars=config.get("min_chars", 300),
+            max_bytes=config.get("max_bytes", 5_000_000),
+            timeout=config.get("timeout_seconds", 15.0),
+            max_connections=config.get("max_connections", 20),
+            learn_after=config.get("learn_after", 2),
+            reprobe_every=config.get("reprobe_every", 25),
+            user_agent=config.get("user_agent", "Mozilla/5.0 (compatible; research-agent/1.0)")
+        )
+
+    def prefers_direct(self, url: str) -> bool:
+        """
+        Check whether a URL's domain is still fetched directly first.
+
+        Args:
+            url (str): The URL to fetch
+
+        Returns:
+            bool: False if the domain has learned to go straight to Firecrawl
+        """
+        with self._lock:
+            domain = self._domains.get(get_domain(url))
+            return domain is None or domain["fallbacks_in_row"] < self.learn_after
+
+    def fetch(self, url: str, fallback: Callable[[str], str]) -> str:
+        """
+        Get a page's markdown directly, or with the fallback if the direct path does not work.
+
+        Args:
+            url (str): The URL to fetch
+            fallback (Callable[[str], str]): Scrapes a URL with Firecrawl
+
+        Returns:
+            str: The page markdown
+
+        Raises:
+            Exception: If the direct path is not used or fails and the fallback fails
+        """
+        span = current_span()
+        if not self._should_try(url):
+            span.set_attribute("scrape.path", "firecrawl")
+            return self._timed("firecrawl", fallback, url)
+
+        start = time.perf_counter()
+        try:
+            markdown_content = self.fetch_direct(url)
+        except DirectFetchRejected as e:
+            self._record(url, e.reason)
+            span.set_attributes({"scrape.path": "firecrawl", "scrape.fallback_reason": e.reason})
+            return self._timed("firecrawl", fallback, url)
+
+        self.histogram.record("direct", time.perf_counter() - start)
+        self._record(url, None)
+        span.set_attribute("scrape.path", "direct")
+        return markdown_content
+
+    def fetch_direct(self, url: str) -> str:
+        """
+        GET a page and convert it to markdown.
+
+        Args:
+            url (str): The URL to fetch
+
+        Returns:
+            str: The page markdown
+
+        Raises:
+            DirectFetchRejected: With the reason the page should be scraped with Firecrawl
+        """
+        try:
+            with self.http.stream("GET", url) as response:
+                if response.status_code >= 400:
+                    raise DirectFetchRejected(f"status_{response.status_code}")
+                content_type = response.headers.get("content-type", "").lower()
+                if "html" not in content_type and "text/plain" not in content_type:
+                    raise DirectFetchRejected("content_type")
+                if int(response.headers.get("content-length") or 0) > self.max_bytes:
+                    raise DirectFetchRejected("too_large")
+                body = bytearray()
+                for chunk in response.iter_bytes():
+                    body.extend(chunk)
+                    if len(body) > self.max_bytes:
+                        raise DirectFetchRejected("too_large")
+                text = body.decode(response.encoding or "utf-8", errors="replace")
+                final_url = str(response.url)
+        except httpx.HTTPError:
+            raise DirectFetchRejected("error")
+
+        if "html" not in content_type:
+            markdown_content = text.strip()
+            if len(markdown_content) < self.min_chars:
+                raise DirectFetchRejected("thin")
+            return markdown_content
+
+        converter = MarkdownConverter(final_url)
+        converter.feed(text)
+        converter.close()
+        markdown_content = converter.markdown()
+        text_chars = len(re.sub(r"\s+|\]\([^)]*\)", "", markdown_content))
+        if looks_js_dependent(text, converter, text_chars, self.min_chars):
+            raise DirectFetchRejected("javascript")
+        if text_chars < self.min_chars:
+            raise DirectFetchRejected("thin")
+        return markdown_content
+
+    def _should_try(self, url: str) -> bool:
+        with self._lock:
+            domain = self._domains.get(get_domain(url))
+            if domain is None or domain["fallbacks_in_row"] < self.learn_after:
+                return True
+            domain["skipped"] += 1
+            if domain["skipped"] % self.reprobe_every == 0:
+                self._stats["probes"] += 1
+                return True
+            self._stats["skipped"] += 1
+            return False
+
+    def _record(self, url: str, fallback_reason: Optional[str]) -> None:
+        with self._lock:
+            domain = self._domains.setdefault(get_domain(url), {
+                "fallbacks_in_row": 0, "skipped": 0, "direct": 0, "fallbacks": 0
+            })
+            if fallback_reason is None:
+                domain["direct"] += 1
+                domain["fallbacks_in_row"] = 0
+                self._stats["direct"] += 1
+            else:
+                domain["fallbacks"] += 1
+                domain["fallbacks_in_row"] += 1
+                fallbacks = self._stats["fallbacks"]
+                fallbacks[fallback_reason] = fallbacks.get(fallback_reason, 0) + 1
+
+    def _timed(self, path: str, fetch: Callable[[str], str], url: str) -> str:
+        start = time.perf_counter()
+        result = fetch(url)
+        self.histogram.record(path, time.perf_counter() - start)
+        return result
+
+    def domains(self) -> Dict[str, Dict]:
+        """
+        Get what was learned per domain.
+
+        Returns:
+            Dict[str, Dict]: Direct fetches, fallbacks and the path each domain uses now
+        """
+        with self._lock:
+            return {
+                name: {"direct": entry["direct"], "fallbacks": entry["fallbacks"],
+                       "path": "direct" if entry["fallbacks_in_row"] < self.learn_after else "firecrawl"}
+                for name, entry in sorted(self._domains.items())
+            }
+
+    def stats(self) -> Dict:
+        """
+        Get fetch counts and latency per path.
+
+        Returns:
+            Dict: Pages served directly, fallbacks by reason, fetches that skipped the
+                direct path, direct probes of learned domains, and mean, p50 and p95
+                latency of the direct and Firecrawl paths
+        """
+        with self._lock:
+            stats = {**self._stats, "fallbacks": dict(self._stats["fallbacks"])}
+        stats["latency"] = {
+            path: {key: entry[key] for key in ("count", "mean_ms", "p50_ms", "p95_ms")}
+            for path, entry in self.histogram.summary().items()
+        }
+        return stats
+
+    def close(self) -> None:
+        self.http.close()
@@ -0,0 +1,198 @@
+"""
+SQLite backed key/value cache with compressed values.
+
+The cache lives in a SQLite file so it can be shared between threads, agent
+sessions and separate processes; several caches can share one file by using
+different tables. Values are zlib-compressed text and each entry carries its
+own expiry time. Once the total compressed size goes over max_bytes (or the
+entry count over max_entries) entries are evicted by the configured policy:
+least recently used ("lru"), least frequently used ("lfu") or oldest first
+("fifo").
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+# ORDER BY clause that lists eviction candidates first, per eviction policy
+EVICTION_ORDER = {
+    "lru": "last_access ASC",
+    "lfu": "hit_count ASC, last_access ASC",
+    "fifo": "created_at ASC"
+}
+
+
+class DiskCache:
+    def __init__(self, path: str, max_bytes: int, default_ttl: Optional[float] = None,
+                 table: str = "entries", eviction: str = "lru", max_entries: Optional[int] = None):
+        """
+        Open (or create) a disk cache.
+
+        Args:
+            path (str): Path of the SQLite file
+            max_bytes (int): Upper bound on the total compressed size of stored values
+            default_ttl (float, optional): Seconds an entry stays fresh, None for no expiry
+            table (str): Name of the table holding this cache's entries
+            eviction (str): Eviction policy, one of "lru", "lfu" or "fifo"
+            max_entries (int, optional): Upper bound on the number of stored entries
+        """
+        if eviction not in EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy '{eviction}'. Available policies: {list(EVICTION_ORDER)}")
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name '{table}'")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.table = table
+        self.eviction = eviction
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL,
+                created_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a value from the cache, recording the access for the eviction policy.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            Optional[str]: The cached value, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return zlib.decompress(value).decode("utf-8")
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store a value in the cache, evicting entries if the cache goes over its bounds.
+
+        Args:
+            key (str): The cache key
+            value (str): The text to store
+            ttl (float, optional): Seconds the entry stays fresh, defaults to default_ttl
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        compressed = zlib.compress(value.encode("utf-8"))
+
+        if len(compressed) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, expires_at, last_access, created_at, hit_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, compressed, len(compressed), expires_at, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry from the cache.
+
+        Args:
+            key (str): The cache key
+        """
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Caller holds the lock; drop expired entries first, then evict by policy
+        now = time.time()
+        cursor = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        self.expirations += cursor.rowcount
+
+        count, total = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+        max_entries = self.max_entries if self.max_entries is not None else count
+        if total <= self.max_bytes and count <= max_entries:
+            return
+
+        for key, size in self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY {EVICTION_ORDER[self.eviction]}"
+        ).fetchall():
+            if total <= self.max_bytes and count <= max_entries:
+                break
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            total -= size
+            count -= 1
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters for this process together with the current cache size.
+
+        Returns:
+            Dict[str, int]: hits, misses, expirations, evictions, entries and bytes
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
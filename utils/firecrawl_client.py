@@ -0,0 +1,175 @@
+"""
+Shared, pooled client for the Firecrawl REST API.
+
+FirecrawlApp opens a new connection (and TLS session) for every request. This
+client keeps one thread-safe httpx connection pool with keep-alive for the
+whole process, and adds batch scraping so a burst of URLs costs one round
+trip. The API location and key come from FIRECRAWL_API_URL and
+FIRECRAWL_API_KEY, as for FirecrawlApp.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from utils.url_utils import normalize_url
+
+DEFAULT_API_URL = "https://api.firecrawl.dev"
+
+firecrawl_client = None
+_firecrawl_client_lock = threading.Lock()
+
+
+def get_firecrawl_client():
+    """
+    Get the process-wide Firecrawl client, creating it on first use.
+
+    Returns:
+        FirecrawlClient: The shared client
+    """
+    global firecrawl_client
+    if firecrawl_client is None:
+        with _firecrawl_client_lock:
+            if firecrawl_client is None:
+                firecrawl_client = FirecrawlClient()
+    return firecrawl_client
+
+
+def set_firecrawl_client(client):
+    """
+    Replace the process-wide Firecrawl client, e.g. to point at a local stand-in.
+
+    Args:
+        client (FirecrawlClient): The client to use
+    """
+    global firecrawl_client
+    firecrawl_client = client
+
+
+class FirecrawlError(Exception):
+    """Raised when the Firecrawl API returns an error or an unsuccessful response."""
+
+
+class FirecrawlClient:
+    def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None,
+                 max_connections: int = 20, timeout: float = 60.0):
+        """
+        Initialize the client and its connection pool.
+
+        Args:
+            api_key (str, optional): Firecrawl API key, defaults to FIRECRAWL_API_KEY
+            api_url (str, optional): Firecrawl API base URL, defaults to FIRECRAWL_API_URL
+                or the hosted API
+            max_connections (int): Maximum number of pooled connections
+            timeout (float): Request timeout in seconds
+        """
+        api_key = api_key or os.getenv("FIRECRAWL_API_KEY")
+        self.api_url = (api_url or os.getenv("FIRECRAWL_API_URL") or DEFAULT_API_URL).rstrip("/")
+
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        self.http = httpx.Client(
+            base_url=self.api_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0
+            )
+        )
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict:
+        try:
+            response = self.http.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            raise FirecrawlError(f"Request to Firecrawl {path} failed: {e}") from e
+
+        if response.status_code >= 400:
+            raise FirecrawlError(f"Firecrawl {path} returned {response.status_code}: {response.text[:500]}")
+
+        payload = response.json()
+        if payload.get("success") is False:
+            raise FirecrawlError(f"Firecrawl {path} failed: {payload.get('error', payload)}")
+        return payload
+
+    def scrape_url(self, url: str) -> Dict:
+        """
+        Scrape a single URL.
+
+        Args:
+            url (str): The URL to scrape
+
+        Returns:
+            Dict: The scraped document, with "markdown" and "metadata" keys
+        """
+        return self._request("POST", "/v1/scrape", json={"url": url, "formats": ["markdown"]})["data"]
+
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Run a web search.
+
+        Args:
+            query (str): The search query
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Dict]: Search results with url, title and description
+        """
+        return self._request("POST", "/v1/search", json={"query": query, "limit": limit})["data"]
+
+    def batch_scrape_urls(self, urls: List[str], poll_interval: float = 1.0, timeout: float = 300.0) -> Dict[str, str]:
+        """
+        Scrape many URLs with one batch job.
+
+        Args:
+            urls (List[str]): The URLs to scrape
+            poll_interval (float): Longest wait between status checks; polling starts
+                faster and backs off up to this
+            timeout (float): Seconds to wait for the job before giving up
+
+        Returns:
+            Dict[str, str]: Markdown keyed by the requested URL; URLs the job did not
+                return are left out
+
+        Raises:
+            FirecrawlError: If the job cannot be started, fails or times out
+        """
+        job = self._request("POST", "/v1/batch/scrape", json={"urls": urls, "formats": ["markdown"]})
+        status_path = f"/v1/batch/scrape/{job['id']}"
+        deadline = time.monotonic() + timeout
+        wait = min(0.1, poll_interval)
+
+        while True:
+            status = self._request("GET", status_path)
+            if status.get("status") == "completed":
+                break
+            if status.get("status") == "failed":
+                raise FirecrawlError(f"Firecrawl batch scrape {job['id']} failed")
+            if time.monotonic() > deadline:
+                raise FirecrawlError(f"Firecrawl batch scrape {job['id']} timed out")
+            time.sleep(wait)
+            wait = min(wait * 2, poll_interval)
+
+        documents = list(status.get("data", []))
+        # Large results are paginated through absolute "next" URLs
+        while status.get("next"):
+            status = self._request("GET", status["next"])
+            documents.extend(status.get("data", []))
+
+        requested = {normalize_url(url): url for url in urls}
+        results = {}
+        for document in documents:
+            metadata = document.get("metadata") or {}
+            source_url = metadata.get("sourceURL") or metadata.get("url")
+            if source_url and normalize_url(source_url) in requested:
+                results[requested[normalize_url(source_url)]] = document.get("markdown") or ""
+        return results
+
+    def close(self) -> None:
+        self.http.close()
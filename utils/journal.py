@@ -0,0 +1,314 @@
+"""
+Write-ahead journal of agent sessions for crash-safe resume.
+
+Each session appends JSON lines to its own journal file as it runs: a start
+record, every message added to the conversation (the assistant turn as soon
+as the model answers, each tool result as soon as the tool returns), a full
+snapshot whenever memory_optimise rewrites the history, every data point
+update, newly scraped links, and a finished record. Records are flushed to
+the OS as they are written, so a killed process loses nothing, and fsynced in
+batches (every FSYNC_EVERY records or FSYNC_INTERVAL seconds, and on close),
+so at most one batch is lost on power failure.
+
+restore() replays a journal into a DataPointManager and rebuilds the
+conversation. A session resumed from it continues after the last completed
+step: tool calls of the last assistant turn that have no result yet are run,
+and nothing that finished (LLM calls, scrapes) is paid for again. Tool
+results journaled in the order they finished are put back in tool call
+order.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from openai.types.chat import ChatCompletionMessageToolCall
+
+from data_point_manager import DataPointChange
+from utils.llm_transport import to_jsonable
+
+# Records written between fsyncs, and the longest time a record waits for one
+FSYNC_EVERY = 16
+FSYNC_INTERVAL = 1.0
+
+
+def _tool_calls(message) -> List:
+    tool_calls = message.get("tool_calls") if isinstance(message, dict) else getattr(message, "tool_calls", None)
+    return list(tool_calls or [])
+
+
+def pending_tool_calls(messages: List) -> List:
+    """
+    Find the tool calls of the last assistant turn that have no tool result yet.
+
+    Args:
+        messages (List): The conversation
+
+    Returns:
+        List: The tool calls still to run, empty if the last turn is complete
+    """
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if message.get("role") != "assistant":
+            continue
+        answered = {result.get("tool_call_id") for result in messages[index + 1:] if result.get("role") == "tool"}
+        return [tool_call for tool_call in _tool_calls(message) if tool_call.id not in answered]
+    return []
+
+
+def order_tool_results(messages: List) -> None:
+    """
+    Put the tool results following each assistant turn in the order of its tool calls.
+
+    Concurrent tool calls are journaled as they finish, and on resume the calls left
+    without a result are answered after those that had one, so results can be out of
+    order. Reorders the conversation in place; results already in order are left as
+    they are.
+
+    Args:
+        messages (List): The conversation
+    """
+    index = 0
+    while index < len(messages):
+        tool_calls = _tool_calls(messages[index]) if messages[index].get("role") == "assistant" else []
+        end = index + 1
+        while end < len(messages) and messages[end].get("role") == "tool":
+            end += 1
+        if tool_calls and end - index > 2:
+            position = {tool_call.id: order for order, tool_call in enumerate(tool_calls)}
+            results = messages[index + 1:end]
+            ordered = sorted(results, key=lambda result: position.get(result.get("tool_call_id"), len(position)))
+            if any(result is not ordered_result for result, ordered_result in zip(results, ordered)):
+                messages[index + 1:end] = ordered
+        index = end
+
+
+def is_finished(messages: List) -> bool:
+    """
+    Check whether a conversation ended with a final assistant answer.
+
+    Args:
+        messages (List): The conversation
+
+    Returns:
+        bool: True if the last message is an assistant message without tool calls
+    """
+    return bool(messages) and messages[-1].get("role") == "assistant" and not _tool_calls(messages[-1])
+
+
+def _restore_message(message: Dict) -> Dict:
+    # Tool calls are journaled as plain data; the agent loop works with the OpenAI objects
+    if message.get("tool_calls"):
+        message = {**message, "tool_calls": [ChatCompletionMessageToolCall.model_validate(tool_call)
+                                             for tool_call in message["tool_calls"]]}
+    return message
+
+
+class SessionJournal:
+    def __init__(self, path: str, fsync_every: int = FSYNC_EVERY, fsync_interval: float = FSYNC_INTERVAL):
+        """
+        Open a session journal, reading the records of an earlier run of the session.
+
+        Args:
+            path (str): The journal file; created on the first write
+            fsync_every (int): Records written between fsyncs
+            fsync_interval (float): Longest time in seconds a record waits for an fsync
+        """
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.records = self._read()
+        self.started = any(record["type"] == "start" for record in self.records)
+        self.finished = any(record["type"] == "finished" for record in self.records)
+
+        self._file = None
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._manager = None
+        # What of the live conversation is already journaled
+        self._recorded = []
+        self._recorded_tool_results = set()
+        self._summary_updates = 0
+        self._links_recorded = 0
+
+    def _read(self) -> List[Dict]:
+        records = []
+        try:
+            with open(self.path, "rb+") as f:
+                intact = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A torn final line from a crash mid-write; everything before it is intact.
+                        # Cut it off so records appended on resume start on a line of their own.
+                        f.truncate(intact)
+                        break
+                    intact += len(line)
+        except FileNotFoundError:
+            pass
+        return records
+
+    def restore(self, data_point_manager) -> Optional[List[Dict]]:
+        """
+        Replay the journal into a data point manager and rebuild the conversation.
+
+        Call before attach() so the replayed updates are not journaled again.
+
+        Args:
+            data_point_manager (DataPointManager): Session state to restore into
+
+        Returns:
+            Optional[List[Dict]]: The conversation as last journaled, or None if the
+                journal has no messages
+        """
+        messages = None
+        for record in self.records:
+            kind = record["type"]
+            if kind == "message":
+                messages = messages if messages is not None else []
+                messages.append(_restore_message(record["message"]))
+            elif kind == "conversation":
+                messages = [_restore_message(message) for message in record["messages"]]
+            elif kind == "data_point":
+                data_point_manager.update_data_point(record["name"], record["value"], record["reference"],
+                                                     record.get("confidence"))
+            elif kind == "scraped":
+                for url in record["urls"]:
+                    data_point_manager.add_scraped_link(url)
+
+        self._links_recorded = len(data_point_manager.get_scraped_links())
+        if messages is not None:
+            order_tool_results(messages)
+            self._recorded = list(messages)
+        return messages
+
+    def attach(self, data_point_manager) -> None:
+        """
+        Journal every data point update and scraped link of a session from now on.
+
+        Args:
+            data_point_manager (DataPointManager): The session state
+        """
+        self._manager = data_point_manager
+        self._links_recorded = len(data_point_manager.get_scraped_links())
+        data_point_manager.add_listener(self._on_change)
+
+    def start(self, **attributes) -> None:
+        """
+        Write the start record of a new session; does nothing when resuming.
+
+        Args:
+            **attributes: Session details, e.g. entity_name and flow
+        """
+        if not self.started:
+            self._write({"type": "start", "at": time.time(), **attributes})
+            self.started = True
+
+    def sync(self, messages: List) -> None:
+        """
+        Journal the messages added to the conversation since the last call.
+
+        A conversation that was rewritten (trimmed and summarised) is journaled
+        as a full snapshot instead. Links scraped since the last call are
+        journaled first, so a tool result is never replayed without its scrape.
+
+        Args:
+            messages (List): The live conversation
+        """
+        self._sync_links()
+        summary = getattr(messages, "rolling_summary", None)
+        summary_updates = summary.updates if summary is not None else 0
+        recorded = self._recorded
+        appended = (summary_updates == self._summary_updates and len(messages) >= len(recorded)
+                    and all(messages[index] is message for index, message in enumerate(recorded)))
+        if appended:
+            for message in messages[len(recorded):]:
+                if message.get("role") == "tool" and message.get("tool_call_id") in self._recorded_tool_results:
+                    continue
+                self._write({"type": "message", "message": to_jsonable(message)})
+        else:
+            self._write({"type": "conversation", "messages": to_jsonable(list(messages))})
+        self._recorded = list(messages)
+        self._recorded_tool_results.clear()
+        self._summary_updates = summary_updates
+
+    def record_tool_result(self, message: Dict) -> None:
+        """
+        Journal a tool result before it is added to the conversation.
+
+        For tool calls that run concurrently and are added to the conversation
+        together; the next sync() does not journal the result again.
+
+        Args:
+            message (Dict): The tool message
+        """
+        self._sync_links()
+        self._write({"type": "message", "message": to_jsonable(message)})
+        self._recorded_tool_results.add(message.get("tool_call_id"))
+
+    def finish(self, reason: Optional[str] = None) -> None:
+        """
+        Mark the session as finished and fsync the journal.
+
+        Args:
+            reason (str, optional): Why the session ended early, if it did
+        """
+        self._sync_links()
+        self._write({"type": "finished", "at": time.time(), "reason": reason}, fsync=True)
+        self.finished = True
+        # The session state may be shared with a later flow, which has its own journal
+        self._detach()
+
+    def close(self) -> None:
+        """
+        Fsync and close the journal and stop listening to the session state.
+        """
+        self._detach()
+        with self._lock:
+            if self._file is not None:
+                self._fsync()
+                self._file.close()
+                self._file = None
+
+    def _detach(self) -> None:
+        if self._manager is not None:
+            self._manager.remove_listener(self._on_change)
+            self._manager = None
+
+    def _on_change(self, change: DataPointChange) -> None:
+        self._write({"type": "data_point", "name": change.name, "value": to_jsonable(change.value),
+                     "reference": change.reference, "confidence": change.confidence})
+
+    def _sync_links(self) -> None:
+        if self._manager is None:
+            return
+        links = self._manager.get_scraped_links()
+        if len(links) > self._links_recorded:
+            self._write({"type": "scraped", "urls": links[self._links_recorded:]})
+            self._links_recorded = len(links)
+
+    def _write(self, record: Dict, fsync: bool = False) -> None:
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a")
+            self._file.write(line)
+            # Flushed to the OS right away, so only a machine crash can lose unsynced records
+            self._file.flush()
+            self._unsynced += 1
+            if fsync or self._unsynced >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+
+    def _fsync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_fsync = time.monotonic()
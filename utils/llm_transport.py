@@ -0,0 +1,355 @@
+"""
+Pluggable transport for chat completion requests.
+
+The transport wraps an OpenAI client and exposes the same
+client.chat.completions.create interface, so it can be handed to
+set_client_and_model() and is used by every call site (agent turns, search
+parsing and summarisation). Modes:
+
+- "live": pass every request straight to the wrapped client
+- "record": pass requests to the wrapped client and store each request/response pair
+- "replay": serve stored responses only, never touching the network
+- "cache": serve stored responses when present, otherwise call the wrapped client and record
+- "fake_server": start a local OpenAI-compatible HTTP endpoint backed by the store and
+  point a regular OpenAI client at it
+
+Pairs are kept in a content-addressed store: each response is written to a JSON
+file named by the hash of the request's model, messages, tools, tool choice and
+response format.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+
+from openai import OpenAI, AsyncOpenAI
+from openai.types.chat import ChatCompletion
+
+TRANSPORT_MODES = ("live", "record", "replay", "cache", "fake_server")
+
+# Request fields that determine the response; anything else (timeouts, headers) is ignored
+KEY_FIELDS = ("model", "messages", "tools", "tool_choice", "response_format")
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when no response was recorded for a request."""
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Convert request values (including OpenAI pydantic objects) into plain JSON data.
+
+    None values and unset OpenAI parameters are dropped so that the same request
+    built in-process or received over HTTP produces the same data.
+
+    Args:
+        value (Any): The value to convert
+
+    Returns:
+        Any: JSON-serialisable data
+    """
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, dict):
+        return {
+            key: to_jsonable(item) for key, item in value.items()
+            if item is not None and type(item).__name__ != "NotGiven"
+        }
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    return value
+
+
+def request_key(request: Dict) -> str:
+    """
+    Compute the content address of a chat completion request.
+
+    Args:
+        request (Dict): Keyword arguments of a chat.completions.create call
+
+    Returns:
+        str: Hex SHA-256 of the canonical request
+    """
+    canonical = to_jsonable({field: request.get(field) for field in KEY_FIELDS})
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionStore:
+    def __init__(self, path: str):
+        """
+        Open a content-addressed store of request/response pairs.
+
+        Args:
+            path (str): Directory holding the recorded pairs
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file_for(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Get the recorded response for a request key.
+
+        Args:
+            key (str): The request key from request_key()
+
+        Returns:
+            Optional[Dict]: The response as plain JSON data, or None if not recorded
+        """
+        try:
+            with open(self._file_for(key), "r") as f:
+                return json.load(f)["response"]
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, request: Dict, response: Dict) -> None:
+        """
+        Record a request/response pair.
+
+        Args:
+            key (str): The request key from request_key()
+            request (Dict): The request keyword arguments
+            response (Dict): The response as plain JSON data
+        """
+        file_path = self._file_for(key)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "request": to_jsonable({field: request.get(field) for field in KEY_FIELDS}),
+            "response": response
+        }
+        # Write to a temporary file first so concurrent readers never see a partial record
+        fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, file_path)
+
+
+class TransportClient:
+    def __init__(self, mode: str, store: CompletionStore, client: Optional[OpenAI] = None):
+        """
+        Wrap an OpenAI client with record/replay behaviour.
+
+        Args:
+            mode (str): One of "live", "record", "replay" or "cache"
+            store (CompletionStore): Store of recorded pairs
+            client (OpenAI, optional): Client used for requests that are not replayed
+        """
+        if mode not in ("live", "record", "replay", "cache"):
+            raise ValueError(f"Unsupported transport client mode '{mode}'")
+        if mode != "replay" and client is None:
+            raise ValueError(f"Transport mode '{mode}' needs a client to send requests to")
+        self.mode = mode
+        self.store = store
+        self.client = client
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs) -> ChatCompletion:
+        key = request_key(kwargs)
+
+        if self.mode in ("replay", "cache"):
+            recorded = self.store.get(key)
+            if recorded is not None:
+                return ChatCompletion.model_validate(recorded)
+            if self.mode == "replay":
+                raise ReplayMissError(f"No recorded response for request {key}")
+
+        response = self.client.chat.completions.create(**kwargs)
+
+        if self.mode in ("record", "cache"):
+            self.store.put(key, kwargs, response.model_dump(mode="json"))
+        return response
+
+
+class AsyncTransportClient:
+    def __init__(self, mode: str, store: CompletionStore, client: Optional[AsyncOpenAI] = None):
+        """
+        Wrap an AsyncOpenAI client with record/replay behaviour.
+
+        Args:
+            mode (str): One of "live", "record", "replay" or "cache"
+            store (CompletionStore): Store of recorded pairs
+            client (AsyncOpenAI, optional): Client used for requests that are not replayed
+        """
+        if mode not in ("live", "record", "replay", "cache"):
+            raise ValueError(f"Unsupported transport client mode '{mode}'")
+        if mode != "replay" and client is None:
+            raise ValueError(f"Transport mode '{mode}' needs a client to send requests to")
+        self.mode = mode
+        self.store = store
+        self.client = client
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs) -> ChatCompletion:
+        key = request_key(kwargs)
+
+        if self.mode in ("replay", "cache"):
+            recorded = self.store.get(key)
+            if recorded is not None:
+                return ChatCompletion.model_validate(recorded)
+            if self.mode == "replay":
+                raise ReplayMissError(f"No recorded response for request {key}")
+
+        response = await self.client.chat.completions.create(**kwargs)
+
+        if self.mode in ("record", "cache"):
+            self.store.put(key, kwargs, response.model_dump(mode="json"))
+        return response
+
+
+class FakeOpenAIServer:
+    def __init__(self, store: CompletionStore, host: str = "127.0.0.1", port: int = 0):
+        """
+        Local OpenAI-compatible HTTP endpoint serving recorded chat completions.
+
+        Args:
+            store (CompletionStore): Store of recorded pairs to serve
+            host (str): Interface to bind to
+            port (int): Port to bind to, 0 picks a free port
+        """
+        self.store = store
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def respond(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        """
+        Build the response for a request; override to serve other endpoints.
+
+        Args:
+            path (str): The request path, e.g. "/v1/chat/completions"
+            body (Dict): The decoded JSON request body
+
+        Returns:
+            Tuple[int, Dict]: HTTP status code and JSON response body
+        """
+        if path.rstrip("/") != "/v1/chat/completions":
+            return 404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}
+
+        key = request_key(body)
+        recorded = self.store.get(key)
+        if recorded is None:
+            return 404, {"error": {"message": f"No recorded response for request {key}", "type": "not_found"}}
+        return 200, recorded
+
+    def respond_get(self, path: str) -> Tuple[int, Any]:
+        """
+        Build the response for a GET request; override to serve other endpoints.
+
+        Args:
+            path (str): The request path, e.g. "/v1/batches/batch_1"
+
+        Returns:
+            Tuple[int, Any]: HTTP status code and JSON response body, or raw bytes
+        """
+        return 404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}
+
+    def respond_upload(self, path: str, content_type: str, data: bytes) -> Tuple[int, Dict]:
+        """
+        Build the response for a multipart POST (file upload); override to serve other endpoints.
+
+        Args:
+            path (str): The request path, e.g. "/v1/files"
+            content_type (str): The multipart Content-Type header, with its boundary
+            data (bytes): The raw request body
+
+        Returns:
+            Tuple[int, Dict]: HTTP status code and JSON response body
+        """
+        return 404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                data = self.rfile.read(length)
+                content_type = self.headers.get("Content-Type", "")
+                if content_type.startswith("multipart/form-data"):
+                    status, payload = server.respond_upload(self.path, content_type, data)
+                else:
+                    status, payload = server.respond(self.path, json.loads(data or b"{}"))
+                self._send(status, payload)
+
+            def do_GET(self):
+                self._send(*server.respond_get(self.path))
+
+            def _send(self, status, payload):
+                if isinstance(payload, bytes):
+                    data, content_type = payload, "application/octet-stream"
+                else:
+                    data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def create_transport_clients(mode: str = "live", store_path: Optional[str] = None):
+    """
+    Create the sync and async clients to pass to set_client_and_model().
+
+    Args:
+        mode (str): One of TRANSPORT_MODES
+        store_path (str, optional): Directory of recorded pairs, required unless mode is "live"
+
+    Returns:
+        Tuple: (client, async_client); in "fake_server" mode the started
+            FakeOpenAIServer is kept on client.fake_server
+    """
+    if mode not in TRANSPORT_MODES:
+        raise ValueError(f"Unknown transport mode '{mode}'. Available modes: {list(TRANSPORT_MODES)}")
+
+    if mode == "live":
+        return OpenAI(), AsyncOpenAI()
+
+    if not store_path:
+        raise ValueError(f"Transport mode '{mode}' needs a store path")
+    store = CompletionStore(store_path)
+
+    if mode == "fake_server":
+        fake_server = FakeOpenAIServer(store).start()
+        client = OpenAI(base_url=fake_server.base_url, api_key="fake", max_retries=0)
+        client.fake_server = fake_server
+        async_client = AsyncOpenAI(base_url=fake_server.base_url, api_key="fake", max_retries=0)
+        return client, async_client
+
+    if mode == "replay":
+        return TransportClient(mode, store), AsyncTransportClient(mode, store)
+
+    return TransportClient(mode, store, OpenAI()), AsyncTransportClient(mode, store, AsyncOpenAI())
@@ -0,0 +1,270 @@
+"""
+Rolling conversation summaries for memory_optimise.
+
+A trimmed conversation keeps its leading messages (the task prompt and any
+plan) as they are, followed by one summary message and the most recent
+messages. Each later trim only sends the previous summary and the messages
+newly evicted since then to the summary model, instead of re-summarising the
+whole history. Trim points never fall between an assistant message with
+tool calls and its tool messages, so the API always gets a valid history.
+
+In background mode the summary of the evicted messages is computed on a
+worker thread while the next model turn and its tool calls run, and swapped
+into the conversation by the following memory_optimise call. Thresholds
+come from config/memory.json; the summary model is the "summarize" model
+route.
+"""
+
+import contextvars
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+SUMMARY_PREFIX = "Summary of earlier actions taken so far: "
+
+memory_policy = None
+_memory_policy_lock = threading.Lock()
+_summary_executor = None
+_summary_executor_lock = threading.Lock()
+
+
+def get_memory_policy():
+    """
+    Get the shared memory policy, creating it from config/memory.json on first use.
+
+    Returns:
+        MemoryPolicy: The policy
+    """
+    global memory_policy
+    if memory_policy is None:
+        with _memory_policy_lock:
+            if memory_policy is None:
+                memory_policy = MemoryPolicy.from_config()
+    return memory_policy
+
+
+def set_memory_policy(policy):
+    """
+    Replace the shared memory policy.
+
+    Args:
+        policy (MemoryPolicy): The policy to use
+    """
+    global memory_policy
+    memory_policy = policy
+
+
+def _get_summary_executor() -> ThreadPoolExecutor:
+    global _summary_executor
+    if _summary_executor is None:
+        with _summary_executor_lock:
+            if _summary_executor is None:
+                _summary_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="summary")
+    return _summary_executor
+
+
+@dataclass
+class MemoryPolicy:
+    # Trim once the conversation exceeds either limit
+    max_tokens: int = 10000
+    max_messages: int = 24
+    # Token budget of the recent messages kept verbatim after a trim
+    keep_recent_tokens: int = 4000
+    keep_recent_messages: int = 12
+    background: bool = False
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a policy from config/memory.json.
+
+        Returns:
+            MemoryPolicy: The configured policy, or the defaults if unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'memory.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in memory configuration: {e}")
+
+        defaults = cls()
+        return cls(
+            max_tokens=config.get("max_tokens", defaults.max_tokens),
+            max_messages=config.get("max_messages", defaults.max_messages),
+            keep_recent_tokens=config.get("keep_recent_tokens", defaults.keep_recent_tokens),
+            keep_recent_messages=config.get("keep_recent_messages", defaults.keep_recent_messages),
+            background=config.get("background", defaults.background)
+        )
+
+    def needs_trim(self, conversation) -> bool:
+        return len(conversation) > self.max_messages or conversation.token_total > self.max_tokens
+
+
+def _role(message) -> Optional[str]:
+    return message.get("role") if isinstance(message, dict) else getattr(message, "role", None)
+
+
+def _has_tool_calls(message) -> bool:
+    tool_calls = message.get("tool_calls") if isinstance(message, dict) else getattr(message, "tool_calls", None)
+    return bool(tool_calls)
+
+
+def head_size(messages: List) -> int:
+    """
+    Count the leading messages that are never summarised: the task prompt and any plan.
+
+    Args:
+        messages (List): The conversation
+
+    Returns:
+        int: Number of messages before the first tool call or tool result
+    """
+    size = 0
+    for message in messages:
+        if _role(message) == "tool" or _has_tool_calls(message):
+            break
+        size += 1
+    return max(size, 1) if messages else 0
+
+
+class RollingSummary:
+    """
+    Summary state of one conversation.
+
+    The summary message, once created, sits right after the head messages;
+    apply() replaces the messages after it up to a trim point with an updated
+    summary.
+    """
+
+    def __init__(self, head: int):
+        """
+        Args:
+            head (int): Number of leading messages kept as they are
+        """
+        self.head = head
+        self.text = None
+        self.evicted = 0
+        self.updates = 0
+        # (end index, Future of the new summary) of a summary computed in the background
+        self.pending = None
+
+    @classmethod
+    def from_messages(cls, messages: List) -> "RollingSummary":
+        """
+        Create the summary state of a conversation, picking up a summary message it already has.
+
+        Args:
+            messages (List): The conversation, possibly restored from a journal
+
+        Returns:
+            RollingSummary: The state
+        """
+        head = head_size(messages)
+        last = messages[head - 1] if head else None
+        if head > 1 and _role(last) == "system" and str(last.get("content", "")).startswith(SUMMARY_PREFIX):
+            summary = cls(head - 1)
+            summary.text = last["content"][len(SUMMARY_PREFIX):]
+            return summary
+        return cls(head)
+
+    @property
+    def first_evictable(self) -> int:
+        return self.head + (1 if self.text is not None else 0)
+
+    def summary_message(self) -> dict:
+        return {"role": "system", "content": f"{SUMMARY_PREFIX}{self.text}"}
+
+    def trim_point(self, conversation, policy: MemoryPolicy) -> int:
+        """
+        Find where the recent messages kept verbatim start.
+
+        Walks back from the end while the kept messages fit the token and
+        message budgets, then moves back over tool messages so each is kept
+        with the assistant message that called it.
+
+        Args:
+            conversation (Conversation): The conversation to trim
+            policy (MemoryPolicy): The budgets of the kept messages
+
+        Returns:
+            int: Index of the first kept message; messages between the summary and
+                this index are evicted, none if it is not past first_evictable
+        """
+        first = self.first_evictable
+        end = len(conversation)
+        start = end - 1
+        kept_tokens = conversation.token_count(start)
+        while start > first and end - start < policy.keep_recent_messages:
+            tokens = conversation.token_count(start - 1, start)
+            if kept_tokens + tokens > policy.keep_recent_tokens:
+                break
+            kept_tokens += tokens
+            start -= 1
+
+        while start > first and _role(conversation[start]) == "tool":
+            start -= 1
+        return start
+
+    def evicted_messages(self, conversation, end: int) -> List:
+        return list(conversation[self.first_evictable:end])
+
+    def apply(self, conversation, end: int, text: str) -> int:
+        """
+        Replace the messages before end with the updated summary.
+
+        Args:
+            conversation (Conversation): The conversation, modified in place
+            end (int): Index of the first message kept verbatim
+            text (str): The updated summary
+
+        Returns:
+            int: Number of messages evicted
+        """
+        first = self.first_evictable
+        dropped = end - first
+        del conversation[self.head:end]
+        self.text = text
+        conversation.insert(self.head, self.summary_message())
+        self.evicted += dropped
+        self.updates += 1
+        return dropped
+
+    def start_background(self, end: int, summarise: Callable[[], str]) -> None:
+        # Run in a copy of the caller's context so the summary call is traced under the session
+        context = contextvars.copy_context()
+        self.pending = (end, _get_summary_executor().submit(context.run, summarise))
+
+    def take_pending(self) -> Optional[tuple]:
+        pending, self.pending = self.pending, None
+        return pending
+
+
+def build_summary_prompt(previous_summary: Optional[str], evicted_messages: List) -> str:
+    """
+    Build the prompt that folds newly evicted messages into the running summary.
+
+    Args:
+        previous_summary (Optional[str]): The summary so far, None on the first trim
+        evicted_messages (List): Messages leaving the conversation
+
+    Returns:
+        str: The summarisation prompt
+    """
+    previous = previous_summary or "(nothing yet)"
+    return f"""Summary of the conversation so far:
+{previous}
+-----
+Newer messages between user & AI, including actions AI already taken:
+{evicted_messages}
+-----
+Update the summary with the newer messages: the past actions taken so far,
+what key information learnt & tasks that already completed.
+
+SUMMARY:
+"""
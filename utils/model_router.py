@@ -0,0 +1,242 @@
+"""
+Per call site model routing with cascades.
+
+Each LLM call site is a route: "agent_turn" for the agent loop,
+"search_parse" for the JSON extraction of search results, "summarize" for
+memory_optimise and "extract" for single-shot extraction from a page in
+offline batches. A route lists models to try in order; a response the
+call site does not accept (e.g. invalid or empty JSON) escalates to the next
+model, and the last model's response is used whatever it is. A null entry
+stands for the model given to set_client_and_model.
+
+Latency, token use and outcomes are tracked per route and model so the
+routes can be tuned for throughput. Routes come from
+config/model_routes.json.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.tracing import LatencyHistogram, current_span
+
+DEFAULT_ROUTES = {
+    "agent_turn": [None],
+    "search_parse": [None],
+    "summarize": ["gpt-3.5-turbo"],
+    "extract": [None],
+}
+
+model_router = None
+_model_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """
+    Get the shared model router, creating it from config/model_routes.json on first use.
+
+    Returns:
+        ModelRouter: The router
+    """
+    global model_router
+    if model_router is None:
+        with _model_router_lock:
+            if model_router is None:
+                model_router = ModelRouter.from_config()
+    return model_router
+
+
+def set_model_router(router):
+    """
+    Replace the shared model router.
+
+    Args:
+        router (ModelRouter): The router to use
+    """
+    global model_router
+    model_router = router
+
+
+class ModelRouter:
+    def __init__(self, routes: Optional[Dict[str, List[Optional[str]]]] = None):
+        """
+        Initialize the router.
+
+        Args:
+            routes (Dict[str, List[Optional[str]]], optional): Models to try per route, in
+                order; None entries mean the default model. Routes not listed use
+                DEFAULT_ROUTES.
+        """
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.histogram = LatencyHistogram()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a router from config/model_routes.json.
+
+        Returns:
+            ModelRouter: The configured router, or the default routes if unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'model_routes.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in model routes configuration: {e}")
+
+        return cls(config)
+
+    def models(self, route: str, default_model: Optional[str]) -> List[str]:
+        """
+        Get the models a route tries, in order.
+
+        Args:
+            route (str): The call site
+            default_model (Optional[str]): Model used for None entries
+
+        Returns:
+            List[str]: Distinct models, first to last
+        """
+        models = [model or default_model for model in self.routes.get(route, [None])]
+        return list(dict.fromkeys(model for model in models if model))
+
+    def route_key(self, route: str, default_model: Optional[str]) -> str:
+        """
+        Identify a route's models, for cache keys of its results.
+
+        Args:
+            route (str): The call site
+            default_model (Optional[str]): Model used for None entries
+
+        Returns:
+            str: The models of the route joined by "+"
+        """
+        return "+".join(self.models(route, default_model))
+
+    def complete(self, route: str, request: Callable[[str], Any], default_model: Optional[str],
+                 accept: Optional[Callable[[Any], bool]] = None, model: Optional[str] = None) -> Any:
+        """
+        Run a request through a route's cascade.
+
+        Args:
+            route (str): The call site
+            request (Callable[[str], Any]): Makes the completion with the given model
+            default_model (Optional[str]): Model used for None entries of the route
+            accept (Callable[[Any], bool], optional): Whether a response is good enough;
+                rejected responses escalate to the next model. Defaults to accepting all.
+            model (str, optional): Use only this model, bypassing the route
+
+        Returns:
+            Any: The first accepted response, or the last model's response
+
+        Raises:
+            ValueError: If the route has no models and no default model is given
+            Exception: The last model's error if every model failed
+        """
+        models = self._cascade(route, default_model, model)
+        for index, candidate in enumerate(models):
+            last = index == len(models) - 1
+            start = time.perf_counter()
+            try:
+                response = request(candidate)
+            except Exception:
+                self._record(route, candidate, time.perf_counter() - start, None, "failed")
+                if last:
+                    raise
+                continue
+            if self._settle(route, candidate, time.perf_counter() - start, response, accept, index, last):
+                return response
+
+    async def complete_async(self, route: str, request: Callable[[str], Awaitable[Any]],
+                             default_model: Optional[str], accept: Optional[Callable[[Any], bool]] = None,
+                             model: Optional[str] = None) -> Any:
+        """
+        Async counterpart of complete(); request returns an awaitable.
+        """
+        models = self._cascade(route, default_model, model)
+        for index, candidate in enumerate(models):
+            last = index == len(models) - 1
+            start = time.perf_counter()
+            try:
+                response = await request(candidate)
+            except Exception:
+                self._record(route, candidate, time.perf_counter() - start, None, "failed")
+                if last:
+                    raise
+                continue
+            if self._settle(route, candidate, time.perf_counter() - start, response, accept, index, last):
+                return response
+
+    def _cascade(self, route: str, default_model: Optional[str], model: Optional[str]) -> List[str]:
+        models = [model] if model else self.models(route, default_model)
+        if not models:
+            raise ValueError(f"No models configured for route '{route}': list one in config/model_routes.json "
+                             f"or pass a default model")
+        return models
+
+    def _settle(self, route, model, seconds, response, accept, index, last) -> bool:
+        accepted = accept is None or accept(response)
+        outcome = "accepted" if accepted else ("rejected" if last else "escalated")
+        self._record(route, model, seconds, response, outcome)
+        if accepted or last:
+            current_span().set_attributes({"llm.route": route, "llm.model": model, "llm.escalations": index})
+            return True
+        return False
+
+    def _record(self, route: str, model: str, seconds: float, response, outcome: str) -> None:
+        self.histogram.record(f"{route}/{model}", seconds)
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            counters = self._counters.setdefault((route, model), {
+                "calls": 0, "accepted": 0, "escalated": 0, "rejected": 0, "failed": 0,
+                "prompt_tokens": 0, "completion_tokens": 0
+            })
+            counters["calls"] += 1
+            counters[outcome] += 1
+            if usage is not None:
+                counters["prompt_tokens"] += usage.prompt_tokens or 0
+                counters["completion_tokens"] += usage.completion_tokens or 0
+
+    def stats(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Get per route and model counters and latencies.
+
+        Returns:
+            Dict[str, Dict[str, Dict]]: For each route and model, calls by outcome
+                (accepted, escalated to the next model, rejected by the last model,
+                failed), prompt and completion tokens, and mean, p50 and p95 latency
+        """
+        latencies = self.histogram.summary()
+        with self._lock:
+            counters = {key: dict(value) for key, value in self._counters.items()}
+
+        stats = {}
+        for (route, model), entry in sorted(counters.items()):
+            latency = latencies.get(f"{route}/{model}", {})
+            entry.update({
+                "mean_ms": latency.get("mean_ms", 0.0),
+                "p50_ms": latency.get("p50_ms", 0.0),
+                "p95_ms": latency.get("p95_ms", 0.0)
+            })
+            stats.setdefault(route, {})[model] = entry
+        return stats
+
+    def format_stats(self) -> str:
+        """
+        Format the stats as a table, one row per route and model.
+        """
+        lines = [f"{'route':<14}{'model':<28}{'calls':>7}{'escal.':>8}{'failed':>8}"
+                 f"{'mean':>10}{'p95':>10}{'prompt':>10}{'compl.':>9}"]
+        for route, models in self.stats().items():
+            for model, entry in models.items():
+                lines.append(f"{route:<14}{model:<28}{entry['calls']:>7}{entry['escalated']:>8}{entry['failed']:>8}"
+                             f"{entry['mean_ms']:>8.1f}ms{entry['p95_ms']:>8.1f}ms"
+                             f"{entry['prompt_tokens']:>10}{entry['completion_tokens']:>9}")
+        return "\n".join(lines)
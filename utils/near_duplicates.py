@@ -0,0 +1,300 @@
+"""
+Near-duplicate detection of scraped pages.
+
+Mirrors, localized variants and syndicated press releases are often almost
+the same page under another URL. Every scraped page gets a 64-bit SimHash
+of its word 3-shingles and the set of hashes of its lines. A new page whose
+SimHash is within max_distance bits of a page scraped earlier in the same
+agent conversation, and whose text is mostly (min_containment) made of that
+page's lines, is a near duplicate: the agent gets only the lines that are
+new, or a note that nothing is, instead of the whole page again.
+
+With "global" enabled, fingerprints are also kept process-wide, and a page
+that duplicates one scraped by another session is passed on in full with a
+note naming the other URL. Settings come from config/near_duplicates.json.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import FrozenSet, Optional, Tuple
+
+WORD = re.compile(r"\w+")
+SHINGLE_SIZE = 3
+
+near_duplicate_detector = None
+_near_duplicate_detector_lock = threading.Lock()
+
+
+def get_near_duplicate_detector():
+    """
+    Get the shared near-duplicate detector, creating it from config/near_duplicates.json on first use.
+
+    Returns:
+        Optional[NearDuplicateDetector]: The detector, or None if detection is disabled
+    """
+    global near_duplicate_detector
+    if near_duplicate_detector is None:
+        with _near_duplicate_detector_lock:
+            if near_duplicate_detector is None:
+                near_duplicate_detector = NearDuplicateDetector.from_config() or False
+    return near_duplicate_detector or None
+
+
+def set_near_duplicate_detector(detector):
+    """
+    Replace the shared near-duplicate detector.
+
+    Args:
+        detector (Optional[NearDuplicateDetector]): The detector to use, or None to disable detection
+    """
+    global near_duplicate_detector
+    near_duplicate_detector = detector if detector is not None else False
+
+
+def simhash(text: str) -> int:
+    """
+    Compute the 64-bit SimHash of the set of a text's word shingles.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        int: The fingerprint; similar texts differ in few bits
+    """
+    words = WORD.findall(text.lower())
+    # Distinct shingles only, so repeated boilerplate costs nothing and does not outvote the content
+    shingles = {" ".join(words[index:index + SHINGLE_SIZE])
+                for index in range(max(len(words) - SHINGLE_SIZE + 1, 1))}
+    # One 64-character bit string per shingle; counting the ones per column is the SimHash vote
+    bits = [format(int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+            for shingle in shingles]
+    half = len(bits) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in zip(*bits)), 2)
+
+
+def _normalize_line(line: str) -> str:
+    return " ".join(line.split()).lower()
+
+
+def line_hashes(text: str) -> FrozenSet[int]:
+    """
+    Hash the non-empty lines of a text, ignoring case and spacing.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        FrozenSet[int]: Hashes of the normalized lines
+    """
+    return frozenset(hash(line) for line in map(_normalize_line, text.splitlines()) if line)
+
+
+@dataclass
+class PageFingerprint:
+    url: str
+    simhash: int
+    lines: Optional[FrozenSet[int]]
+    # Session the page was scraped in, for the process-wide index
+    session: Optional[int] = None
+
+
+@dataclass
+class NearDuplicate:
+    url: str
+    distance: int
+    # Share of the new page's text found on the earlier page; 0 for pages of other sessions
+    containment: float
+    lines: Optional[FrozenSet[int]] = None
+
+
+class FingerprintIndex:
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Index of page fingerprints, searched by Hamming distance.
+
+        Args:
+            max_entries (int, optional): Fingerprints kept before the oldest are dropped;
+                unbounded if None
+        """
+        self.max_entries = max_entries
+        self._pages = OrderedDict()  # url -> PageFingerprint
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def add(self, page: PageFingerprint) -> None:
+        with self._lock:
+            self._pages[page.url] = page
+            self._pages.move_to_end(page.url)
+            while self.max_entries is not None and len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def closest(self, fingerprint: int, max_distance: int, exclude: Optional[str] = None,
+                exclude_session: Optional[int] = None) -> Optional[Tuple[int, PageFingerprint]]:
+        """
+        Find the indexed page with the nearest SimHash.
+
+        Args:
+            fingerprint (int): SimHash to look up
+            max_distance (int): Largest Hamming distance to accept
+            exclude (str, optional): URL to ignore
+            exclude_session (int, optional): Ignore pages of this session
+
+        Returns:
+            Optional[Tuple[int, PageFingerprint]]: The distance and the page, or None
+        """
+        with self._lock:
+            pages = list(self._pages.values())
+        best = None
+        for page in pages:
+            distance = (page.simhash ^ fingerprint).bit_count()
+            if distance > max_distance or page.url == exclude:
+                continue
+            if exclude_session is not None and page.session == exclude_session:
+                continue
+            if best is None or distance < best[0]:
+                best = (distance, page)
+        return best
+
+
+class NearDuplicateDetector:
+    def __init__(self, max_distance: int = 10, min_containment: float = 0.8, min_chars: int = 500,
+                 use_global: bool = False, global_max_entries: int = 100000):
+        """
+        Initialize the detector.
+
+        Args:
+            max_distance (int): Largest SimHash Hamming distance, out of 64 bits, of a candidate
+            min_containment (float): Share of a page's text that must appear on the earlier
+                page for it to count as a near duplicate
+            min_chars (int): Pages shorter than this are never fingerprinted
+            use_global (bool): Also detect duplicates of pages scraped by other sessions
+            global_max_entries (int): Fingerprints kept process-wide
+        """
+        self.max_distance = max_distance
+        self.min_containment = min_containment
+        self.min_chars = min_chars
+        self.global_index = FingerprintIndex(global_max_entries) if use_global else None
+        self._stats = {"checked": 0, "session_duplicates": 0, "global_duplicates": 0, "chars_saved": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a detector from config/near_duplicates.json.
+
+        Returns:
+            Optional[NearDuplicateDetector]: The configured detector, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'near_duplicates.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in near-duplicate configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        return cls(config.get("max_distance", 10), config.get("min_containment", 0.8),
+                   config.get("min_chars", 500), config.get("global", False),
+                   config.get("global_max_entries", 100000))
+
+    def find(self, url: str, markdown_content: str, session_index: FingerprintIndex) -> Optional[NearDuplicate]:
+        """
+        Check a page against the pages scraped earlier in the session, and index it if it is new.
+
+        Args:
+            url (str): The page URL
+            markdown_content (str): The page markdown
+            session_index (FingerprintIndex): The session's fingerprints
+
+        Returns:
+            Optional[NearDuplicate]: The earlier page this one nearly duplicates, or None
+        """
+        if len(markdown_content) < self.min_chars:
+            return None
+
+        fingerprint = simhash(markdown_content)
+        lines = line_hashes(markdown_content)
+        with self._lock:
+            self._stats["checked"] += 1
+
+        candidate = session_index.closest(fingerprint, self.max_distance, exclude=url)
+        if candidate is not None:
+            distance, page = candidate
+            containment = self._containment(markdown_content, page.lines)
+            if containment >= self.min_containment:
+                return NearDuplicate(page.url, distance, containment, page.lines)
+
+        session_index.add(PageFingerprint(url, fingerprint, lines))
+        if self.global_index is not None:
+            session = id(session_index)
+            other = self.global_index.closest(fingerprint, self.max_distance, exclude=url, exclude_session=session)
+            self.global_index.add(PageFingerprint(url, fingerprint, None, session))
+            if other is not None:
+                with self._lock:
+                    self._stats["global_duplicates"] += 1
+                return NearDuplicate(other[1].url, other[0], 0.0)
+        return None
+
+    def deduplicate(self, url: str, markdown_content: str,
+                    session_index: FingerprintIndex) -> Tuple[str, Optional[str]]:
+        """
+        Reduce a page that nearly duplicates an earlier one to what is new on it.
+
+        Args:
+            url (str): The page URL
+            markdown_content (str): The page markdown
+            session_index (FingerprintIndex): The session's fingerprints
+
+        Returns:
+            Tuple[str, Optional[str]]: The content to pass on, possibly empty, and a note
+                for the agent if the page is a near duplicate
+        """
+        duplicate = self.find(url, markdown_content, session_index)
+        if duplicate is None:
+            return markdown_content, None
+        if not duplicate.containment:
+            return markdown_content, f"[This page is a near duplicate of {duplicate.url}, scraped in another session.]"
+
+        new_lines = [line for line in markdown_content.splitlines()
+                     if _normalize_line(line) and hash(_normalize_line(line)) not in duplicate.lines]
+        new_content = "\n".join(new_lines)
+        with self._lock:
+            self._stats["session_duplicates"] += 1
+            self._stats["chars_saved"] += len(markdown_content) - len(new_content)
+
+        if not new_lines:
+            return "", f"[This page is a near duplicate of {duplicate.url}, scraped earlier in this session, " \
+                       f"and has nothing that page does not.]"
+        return new_content, f"[This page is a near duplicate of {duplicate.url}, scraped earlier in this " \
+                            f"session; only its lines that are not on that page follow.]"
+
+    def _containment(self, markdown_content: str, seen: FrozenSet[int]) -> float:
+        total = found = 0
+        for line in map(_normalize_line, markdown_content.splitlines()):
+            if line:
+                total += len(line)
+                if hash(line) in seen:
+                    found += len(line)
+        return found / total if total else 0.0
+
+    def stats(self):
+        """
+        Get detection counts.
+
+        Returns:
+            Dict[str, int]: Pages checked, near duplicates within sessions and across
+                sessions, and characters kept out of the conversation
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,292 @@
+"""
+On-disk store of full scraped pages.
+
+Large pages are written once to a content-addressed file and referred to by a
+short handle, so the conversation only carries an outline and a chunk of the
+page. Later chunks are read through a memory map, and the store is shared by
+every session in the process (and by other processes using the same
+directory). Once the stored pages exceed max_bytes, the least recently
+stored or read pages are removed. Settings come from config/page_store.json.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.relevance import tokenize, bm25_scores
+
+HANDLE_LENGTH = 16
+
+page_store = None
+_page_store_lock = threading.Lock()
+
+
+def get_page_store():
+    """
+    Get the shared page store, creating it from config/page_store.json on first use.
+
+    Returns:
+        Optional[PageStore]: The page store, or None if it is disabled
+    """
+    global page_store
+    if page_store is None:
+        with _page_store_lock:
+            if page_store is None:
+                page_store = PageStore.from_config() or False
+    return page_store or None
+
+
+def set_page_store(store):
+    """
+    Replace the shared page store.
+
+    Args:
+        store (Optional[PageStore]): The store to use, or None to disable it
+    """
+    global page_store
+    page_store = store if store is not None else False
+
+
+class PageStore:
+    def __init__(self, path: str, chunk_size: int, inline_threshold: int, max_outline_headings: int = 30,
+                 max_bytes: Optional[int] = None):
+        """
+        Open (or create) a page store.
+
+        Args:
+            path (str): Directory holding the stored pages
+            chunk_size (int): Bytes returned per read
+            inline_threshold (int): Pages up to this many bytes are returned whole instead of stored
+            max_outline_headings (int): Maximum number of headings in a page outline
+            max_bytes (int, optional): Upper bound on the total size of stored pages;
+                unbounded if None
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.inline_threshold = inline_threshold
+        self.max_outline_headings = max_outline_headings
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._stored_pages()) if max_bytes is not None else 0
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a page store from config/page_store.json.
+
+        Returns:
+            Optional[PageStore]: The configured store, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'page_store.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in page store configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        path = Path(config["path"])
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent / path
+
+        return cls(str(path), config["chunk_size"], config["inline_threshold"],
+                   config.get("max_outline_headings", 30), config.get("max_bytes"))
+
+    def _page_path(self, handle: str) -> Path:
+        return self.path / handle[:2] / f"{handle}.md"
+
+    def _meta_path(self, handle: str) -> Path:
+        return self.path / handle[:2] / f"{handle}.json"
+
+    def _write_atomic(self, target: Path, data: bytes) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+
+    def put(self, url: str, markdown: str) -> str:
+        """
+        Store a page, unless an identical page is already stored.
+
+        Args:
+            url (str): URL the page was scraped from
+            markdown (str): The page markdown
+
+        Returns:
+            str: Handle of the stored page
+        """
+        data = markdown.encode("utf-8")
+        handle = hashlib.sha256(data).hexdigest()[:HANDLE_LENGTH]
+        page_path = self._page_path(handle)
+
+        # A page stored without its metadata cannot be read, so it is written again
+        if page_path.exists() and self._meta_path(handle).exists():
+            self._touch(page_path)
+            return handle
+
+        meta = {"url": url, "size": len(data), "outline": self._build_outline(data)}
+        # The page file publishes the handle, so its metadata must already be in place
+        self._write_atomic(self._meta_path(handle), json.dumps(meta).encode("utf-8"))
+        self._write_atomic(page_path, data)
+
+        if self.max_bytes is not None:
+            with self._lock:
+                self._bytes += len(data)
+                over_limit = self._bytes > self.max_bytes
+            if over_limit:
+                self._evict(keep=handle)
+        return handle
+
+    def _stored_pages(self) -> List[Tuple[float, int, str]]:
+        # (modification time, size, handle) of every stored page
+        pages = []
+        for page_path in self.path.glob("*/*.md"):
+            try:
+                stat = page_path.stat()
+            except FileNotFoundError:
+                continue
+            pages.append((stat.st_mtime, stat.st_size, page_path.stem))
+        return pages
+
+    def _evict(self, keep: str) -> None:
+        """
+        Remove the least recently used pages until the store is back under max_bytes.
+
+        Args:
+            keep (str): Handle of the page just stored, which is never removed
+        """
+        with self._lock:
+            # Rescanned each time, as other processes may share the directory
+            pages = sorted(self._stored_pages())
+            total = sum(size for _, size, _ in pages)
+            for _, size, handle in pages:
+                if total <= self.max_bytes:
+                    break
+                if handle == keep:
+                    continue
+                # Unpublish the page before removing the metadata it needs
+                self._page_path(handle).unlink(missing_ok=True)
+                self._meta_path(handle).unlink(missing_ok=True)
+                total -= size
+            self._bytes = total
+
+    def _touch(self, page_path: Path) -> None:
+        try:
+            os.utime(page_path)
+        except FileNotFoundError:
+            pass
+
+    def _build_outline(self, data: bytes) -> List[Dict]:
+        outline = []
+        for match in re.finditer(rb"^(#{1,6}) +(.+)$", data, re.MULTILINE):
+            outline.append({
+                "heading": match.group(2).decode("utf-8", errors="ignore").strip(),
+                "level": len(match.group(1)),
+                "offset": match.start()
+            })
+        return outline
+
+    def metadata(self, handle: str) -> Dict:
+        """
+        Get the URL, size and outline of a stored page.
+
+        Args:
+            handle (str): Handle returned by put()
+
+        Returns:
+            Dict: url, size (bytes) and outline (headings with byte offsets)
+
+        Raises:
+            KeyError: If no page is stored under the handle
+        """
+        try:
+            with open(self._meta_path(handle), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"No stored page with handle '{handle}'; it may have been evicted, scrape the page again")
+
+    def outline_text(self, handle: str) -> str:
+        """
+        Format the outline of a stored page for the agent.
+
+        Args:
+            handle (str): Handle returned by put()
+
+        Returns:
+            str: One line per heading with its byte offset
+        """
+        outline = self.metadata(handle)["outline"]
+        lines = [
+            f"{'  ' * (entry['level'] - 1)}- {entry['heading']} (offset {entry['offset']})"
+            for entry in outline[:self.max_outline_headings]
+        ]
+        if len(outline) > self.max_outline_headings:
+            lines.append(f"- ... {len(outline) - self.max_outline_headings} more headings")
+        return "\n".join(lines)
+
+    def read(self, handle: str, offset: int = 0, length: Optional[int] = None) -> Dict:
+        """
+        Read a chunk of a stored page.
+
+        Args:
+            handle (str): Handle returned by put()
+            offset (int): Byte offset to start reading at
+            length (int, optional): Number of bytes to read, defaults to chunk_size
+
+        Returns:
+            Dict: content, offset, next_offset (None at the end of the page) and size
+
+        Raises:
+            KeyError: If no page is stored under the handle
+        """
+        length = length or self.chunk_size
+        try:
+            with open(self._page_path(handle), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return {"content": "", "offset": 0, "next_offset": None, "size": 0}
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    offset = max(0, min(offset, size))
+                    end = min(offset + length, size)
+                    content = mapped[offset:end].decode("utf-8", errors="ignore")
+        except FileNotFoundError:
+            raise KeyError(f"No stored page with handle '{handle}'; it may have been evicted, scrape the page again")
+        if self.max_bytes is not None:
+            self._touch(self._page_path(handle))
+
+        return {
+            "content": content,
+            "offset": offset,
+            "next_offset": end if end < size else None,
+            "size": size
+        }
+
+    def search(self, handle: str, query: str, max_results: int = 3) -> List[Dict]:
+        """
+        Find the chunks of a stored page that best match a query.
+
+        Args:
+            handle (str): Handle returned by put()
+            query (str): Free text query
+            max_results (int): Maximum number of chunks to return
+
+        Returns:
+            List[Dict]: Matching chunks as returned by read(), best first
+        """
+        size = self.metadata(handle)["size"]
+        chunks = [self.read(handle, offset) for offset in range(0, size, self.chunk_size)]
+        scores = bm25_scores([tokenize(chunk["content"]) for chunk in chunks], tokenize(query))
+        ranked = sorted(range(len(chunks)), key=lambda index: -scores[index])
+        return [chunks[index] for index in ranked[:max_results] if scores[index] > 0]
@@ -0,0 +1,274 @@
+"""
+Deterministic pre-extraction of common data points.
+
+Some data points appear in very regular phrasing, e.g. "10,001+ employees",
+"Founded in 2011" or "Headquarters: San Francisco, CA". Before a scraped
+page or a search result goes back to the model, the pre-extractor runs a
+library of compiled patterns keyed by data point name over it, and fills the
+data points still missing with matches it is confident about, citing the
+page. Each value filled this way saves the model an update_data call and
+usually a turn.
+
+A match's confidence starts at its pattern's confidence. It goes up a little
+when the text repeats the same value. It is halved when the text gives
+conflicting values, and lowered when an entity name is given but does not
+appear near the match (as in search results about several companies). Only
+matches at or above min_confidence are used. Patterns can be added per data
+point in config/pre_extraction.json, or with register().
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from utils.tracing import current_span
+
+# Characters around a match searched for the entity name
+ENTITY_WINDOW = 300
+
+# Data point names that share a pattern set
+ALIASES = {
+    "employees": "num_employees",
+    "employee_count": "num_employees",
+    "number_of_employees": "num_employees",
+    "headcount": "num_employees",
+    "company_size": "num_employees",
+    "founded": "founding_year",
+    "founded_year": "founding_year",
+    "year_founded": "founding_year",
+    "founding_date": "founding_year",
+    "hq": "headquarters",
+    "hq_location": "headquarters",
+    "headquarters_location": "headquarters",
+    "offices": "office_locations",
+    "locations": "office_locations",
+}
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+|\d+"
+# Capitalised words, matched case-sensitively inside the case-insensitive patterns
+_PLACE = r"(?-i:[A-Z])[\w'-]*(?:(?:,\s*|\s+)(?-i:[A-Z])[\w'-]*){0,3}"
+
+DEFAULT_PATTERNS = {
+    "num_employees": [
+        (rf"(?:number of employees|employees|headcount|company size|team size)\s*[:|]\s*((?:{_NUMBER})(?:\s*[-–]\s*(?:{_NUMBER}))?\+?)", 0.95),
+        (rf"\b((?:{_NUMBER})(?:\s*[-–]\s*(?:{_NUMBER}))?\+?)\s+(?:full[- ]time\s+)?(?:employees|staff members)\b", 0.9),
+    ],
+    "founding_year": [
+        (r"(?:founded|year founded|established)\s*[:|]\s*((?:1[89]|20)\d{2})\b", 0.95),
+        (r"\b(?:founded|established|incorporated)\s+in\s+((?:1[89]|20)\d{2})\b", 0.9),
+    ],
+    "headquarters": [
+        (rf"(?:headquarters|head office|hq)\s*[:|]\s*({_PLACE})", 0.9),
+        (rf"\bheadquartered\s+in\s+({_PLACE})", 0.9),
+    ],
+    "office_locations": [
+        (rf"(?:offices|office locations|locations)\s*[:|]\s*({_PLACE}(?:\s*(?:;|,|and)\s*{_PLACE})*)", 0.85),
+    ],
+}
+
+pre_extractor = None
+_pre_extractor_lock = threading.Lock()
+
+
+def get_pre_extractor():
+    """
+    Get the shared pre-extractor, creating it from config/pre_extraction.json on first use.
+
+    Returns:
+        Optional[PreExtractor]: The pre-extractor, or None if pre-extraction is disabled
+    """
+    global pre_extractor
+    if pre_extractor is None:
+        with _pre_extractor_lock:
+            if pre_extractor is None:
+                pre_extractor = PreExtractor.from_config() or False
+    return pre_extractor or None
+
+
+def set_pre_extractor(extractor):
+    """
+    Replace the shared pre-extractor.
+
+    Args:
+        extractor (Optional[PreExtractor]): The pre-extractor to use, or None to disable pre-extraction
+    """
+    global pre_extractor
+    pre_extractor = extractor if extractor is not None else False
+
+
+@dataclass
+class Extraction:
+    name: str
+    value: str
+    confidence: float
+    snippet: str
+    # Offset of the match in the text
+    start: int
+
+
+class PreExtractor:
+    def __init__(self, patterns: Optional[Dict[str, list]] = None, min_confidence: float = 0.85):
+        """
+        Initialize the pre-extractor with the default pattern library.
+
+        Args:
+            patterns (Dict[str, list], optional): Extra [regex, confidence] pairs per data
+                point name, tried after the defaults. The regex's first group is the value.
+            min_confidence (float): Confidence a match needs to fill a data point
+        """
+        self.min_confidence = min_confidence
+        self._patterns = {}
+        self._fills = {}
+        self._lock = threading.Lock()
+        for library in (DEFAULT_PATTERNS, patterns or {}):
+            for name, entries in library.items():
+                for regex, confidence in entries:
+                    self.register(name, regex, confidence)
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a pre-extractor from config/pre_extraction.json.
+
+        Returns:
+            Optional[PreExtractor]: The configured pre-extractor, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'pre_extraction.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in pre-extraction configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        return cls(config.get("patterns", {}), config.get("min_confidence", 0.85))
+
+    def register(self, name: str, regex: str, confidence: float,
+                 normalize: Optional[Callable[[str], str]] = None) -> None:
+        """
+        Add a pattern for a data point.
+
+        Args:
+            name (str): Data point name (or an alias of one)
+            regex (str): Case-insensitive pattern whose first group is the value
+            confidence (float): Confidence of an unambiguous match, from 0 to 1
+            normalize (Callable[[str], str], optional): Cleans up the matched value
+        """
+        key = ALIASES.get(name, name)
+        self._patterns.setdefault(key, []).append((re.compile(regex, re.IGNORECASE), confidence, normalize))
+
+    def handles(self, name: str) -> bool:
+        return ALIASES.get(name, name) in self._patterns
+
+    def extract(self, text: str, names: List[str], entity_name: Optional[str] = None) -> List[Extraction]:
+        """
+        Find values of data points in a text.
+
+        Args:
+            text (str): Page markdown or search results
+            names (List[str]): Data points to look for
+            entity_name (str, optional): Lower the confidence of matches with no mention of
+                this name nearby, for texts about several entities
+
+        Returns:
+            List[Extraction]: The most confident match of each data point found
+        """
+        entity = entity_name.lower() if entity_name else None
+        extractions = []
+        for name in names:
+            candidates = []
+            for pattern, confidence, normalize in self._patterns.get(ALIASES.get(name, name), []):
+                for match in pattern.finditer(text):
+                    value = _clean(match.group(1))
+                    if normalize:
+                        value = normalize(value)
+                    if value:
+                        candidates.append((value, confidence, match))
+            if not candidates:
+                continue
+
+            values = {value.lower() for value, _, _ in candidates}
+            value, confidence, match = max(candidates, key=lambda candidate: candidate[1])
+            if len(values) > 1:
+                # Several different values: the text is about more than one thing
+                confidence *= 0.5
+            elif len(candidates) > 1:
+                confidence = min(confidence + 0.05, 0.99)
+            if entity is not None:
+                # Also applies when the name is nowhere in the text, e.g. results about other companies
+                window = text[max(match.start() - ENTITY_WINDOW, 0):match.end() + ENTITY_WINDOW].lower()
+                if entity not in window:
+                    confidence *= 0.8
+            snippet = text[max(match.start() - 40, 0):match.end() + 40]
+            extractions.append(Extraction(name, value, round(confidence, 2), " ".join(snippet.split()), match.start()))
+        return extractions
+
+    def apply(self, text: str, data_point_manager, reference: Optional[str] = None,
+              entity_name: Optional[str] = None,
+              reference_for: Optional[Callable[[int], Optional[str]]] = None) -> List[Extraction]:
+        """
+        Fill the missing data points a text gives confident values for.
+
+        Args:
+            text (str): Page markdown or search results
+            data_point_manager (DataPointManager): Session state to fill
+            reference (str, optional): Source URL of the text
+            entity_name (str, optional): See extract()
+            reference_for (Callable[[int], Optional[str]], optional): Source URL of the text
+                at an offset, for texts combining several sources
+
+        Returns:
+            List[Extraction]: The extractions used to fill data points
+        """
+        names = [name for name in data_point_manager.get_missing_data_points() if self.handles(name)]
+        if not names or not text:
+            return []
+
+        filled = []
+        for extraction in self.extract(text, names, entity_name):
+            if extraction.confidence < self.min_confidence:
+                continue
+            source = reference_for(extraction.start) if reference_for else reference
+            data_point_manager.update_data_point(extraction.name, extraction.value, source or reference,
+                                                 extraction.confidence)
+            filled.append(extraction)
+
+        current_span().set_attribute("pre_extraction.filled", len(filled))
+        if filled:
+            with self._lock:
+                for extraction in filled:
+                    self._fills[extraction.name] = self._fills.get(extraction.name, 0) + 1
+        return filled
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of data points filled, by name.
+        """
+        with self._lock:
+            return dict(self._fills)
+
+
+def format_filled(filled: List[Extraction]) -> str:
+    """
+    Describe pre-extracted values for the model.
+
+    Args:
+        filled (List[Extraction]): Extractions that filled data points
+
+    Returns:
+        str: A note listing each value and the text it came from
+    """
+    lines = [f'- {extraction.name} = {extraction.value} (from "{extraction.snippet}")' for extraction in filled]
+    return ("[These data points were filled automatically from this content; call update_data only to "
+            "correct them:\n" + "\n".join(lines) + "]")
+
+
+def _clean(value: str) -> str:
+    return " ".join(value.split()).strip(" ,;.|")
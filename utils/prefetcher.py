@@ -0,0 +1,182 @@
+"""
+Speculative prefetch of pages the agent is likely to scrape next.
+
+When a search suggests related URLs, the agent usually scrapes some of them
+one LLM round trip later. The prefetcher fetches the top suggestions on a
+background pool as soon as the search returns; a later scrape of the same
+page (in any spelling) claims the prefetched content, waiting for the fetch
+if it is still in flight, instead of fetching it again. Fetched pages also
+land in the scrape cache through the fetch function.
+
+Prefetches that are never claimed are counted as wasted when they are
+evicted. Settings come from config/prefetch.json; prefetching is off by
+default.
+"""
+
+import contextvars
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+from utils.url_utils import normalize_url
+
+prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    """
+    Get the shared prefetcher, creating it from config/prefetch.json on first use.
+
+    Returns:
+        Optional[Prefetcher]: The prefetcher, or None if prefetching is disabled
+    """
+    global prefetcher
+    if prefetcher is None:
+        with _prefetcher_lock:
+            if prefetcher is None:
+                prefetcher = Prefetcher.from_config() or False
+    return prefetcher or None
+
+
+def set_prefetcher(new_prefetcher):
+    """
+    Replace the shared prefetcher.
+
+    Args:
+        new_prefetcher (Optional[Prefetcher]): The prefetcher to use, or None to disable prefetching
+    """
+    global prefetcher
+    prefetcher = new_prefetcher if new_prefetcher is not None else False
+
+
+class Prefetcher:
+    def __init__(self, top_n: int = 3, max_workers: int = 4, max_entries: int = 256, wait_timeout: float = 60.0):
+        """
+        Initialize the prefetcher and its background pool.
+
+        Args:
+            top_n (int): Number of suggested URLs prefetched per search
+            max_workers (int): Number of background fetches running at once
+            max_entries (int): Unclaimed prefetches kept before the oldest are dropped
+            wait_timeout (float): Seconds a claim waits for an in-flight prefetch
+        """
+        self.top_n = top_n
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._entries = OrderedDict()  # canonical URL -> Future of the page markdown
+        self._lock = threading.Lock()
+        self._stats = {"issued": 0, "hits": 0, "in_flight_hits": 0, "failed": 0, "wasted": 0}
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a prefetcher from config/prefetch.json.
+
+        Returns:
+            Optional[Prefetcher]: The configured prefetcher, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'prefetch.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in prefetch configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        return cls(config.get("top_n", 3), config.get("max_workers", 4), config.get("max_entries", 256),
+                   config.get("wait_timeout_seconds", 60.0))
+
+    def prefetch(self, urls: Iterable[str], fetch: Callable[[str], str]) -> int:
+        """
+        Start background fetches of the first top_n URLs not already prefetched.
+
+        Args:
+            urls (Iterable[str]): Candidate URLs, best first
+            fetch (Callable[[str], str]): Returns the markdown of a URL
+
+        Returns:
+            int: Number of fetches started
+        """
+        started = 0
+        with self._lock:
+            for url in urls:
+                if started >= self.top_n:
+                    break
+                canonical = normalize_url(url)
+                if canonical in self._entries:
+                    continue
+                # Run in a copy of the caller's context so the fetch is traced under the search
+                context = contextvars.copy_context()
+                self._entries[canonical] = self._executor.submit(context.run, fetch, url)
+                self._stats["issued"] += 1
+                started += 1
+
+            while len(self._entries) > self.max_entries:
+                _, future = self._entries.popitem(last=False)
+                future.cancel()
+                self._stats["wasted"] += 1
+        return started
+
+    def claim(self, url: str) -> Optional[str]:
+        """
+        Take the prefetched markdown of a page, waiting for the fetch if it is in flight.
+
+        Args:
+            url (str): The URL about to be scraped, in any spelling
+
+        Returns:
+            Optional[str]: The markdown, or None if the page was not prefetched or the
+                prefetch failed
+        """
+        with self._lock:
+            future = self._entries.pop(normalize_url(url), None)
+            if future is None:
+                return None
+            in_flight = not future.done()
+
+        try:
+            markdown = future.result(timeout=self.wait_timeout)
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            return None
+
+        with self._lock:
+            self._stats["in_flight_hits" if in_flight else "hits"] += 1
+        return markdown
+
+    def stats(self) -> Dict:
+        """
+        Get prefetch counters.
+
+        Returns:
+            Dict: Prefetches issued, claimed when done (hits) or in flight, failed,
+                evicted unclaimed (wasted) and still unclaimed, plus the hit rate
+                of issued prefetches
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["unclaimed"] = len(self._entries)
+        claimed = stats["hits"] + stats["in_flight_hits"]
+        stats["hit_rate"] = claimed / stats["issued"] if stats["issued"] else 0.0
+        return stats
+
+    def close(self) -> None:
+        """
+        Drop unclaimed prefetches and stop the background pool.
+        """
+        with self._lock:
+            self._stats["wasted"] += len(self._entries)
+            for future in self._entries.values():
+                future.cancel()
+            self._entries.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
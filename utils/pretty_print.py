@@ -1,13 +1,41 @@
 from termcolor import colored
 
+# Formatting large messages is measurable overhead, so printing can be turned off
+print_conversation = True
+
+def set_conversation_printing(enabled: bool):
+    """
+    Turn printing of conversation messages on or off.
+    
+    Args:
+        enabled (bool): Whether pretty_print_conversation, and the LLM request
+            error messages, print anything
+    """
+    global print_conversation
+    print_conversation = enabled
+
+def conversation_printing() -> bool:
+    """
+    Check whether conversation messages and request errors are printed.
+    
+    Returns:
+        bool: False once printing was turned off, e.g. with --quiet
+    """
+    return print_conversation
+
 def pretty_print_conversation(message):
     """
     Pretty print a conversation message with color coding based on role.
     
+    Does nothing when printing is turned off with set_conversation_printing().
+    
     Args:
         message (dict): Message dictionary containing 'role' and 'content' keys,
                        optionally 'tool_calls' for assistant messages
     """
+    if not print_conversation:
+        return
+    
     role_to_color = {
         "system": "red",
         "user": "green",
@@ -1,18 +1,189 @@
+import os
+import string
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Optional
 
+PROMPTS_DIR = Path(__file__).parent.parent / 'prompts'
+
+# Placeholders each template must contain, checked when the template is loaded
+REQUIRED_PLACEHOLDERS = {
+    "parse_search_result": {"entity_name", "search_results", "data_points"},
+    "extract_data_points": {"entity_name", "page_content", "data_points", "website"},
+    "internet_search_scrape_user": {"entity_name", "links_scraped", "data_keys_to_search"},
+    "website_scrape_user": {"entity_name", "website", "links_scraped", "data_keys_to_search"},
+}
+
+# Seconds between checks of a template file's modification time
+MTIME_CHECK_INTERVAL = 2.0
+
+prompt_registry = None
+_prompt_registry_lock = threading.Lock()
+
+
+def get_prompt_registry():
+    """
+    Get the shared prompt registry, loading every template on first use.
+
+    Returns:
+        PromptRegistry: The shared registry
+    """
+    global prompt_registry
+    if prompt_registry is None:
+        with _prompt_registry_lock:
+            if prompt_registry is None:
+                registry = PromptRegistry(PROMPTS_DIR)
+                registry.load_all()
+                prompt_registry = registry
+    return prompt_registry
+
+
+class PromptTemplate:
+    def __init__(self, name: str, text: str, mtime: float):
+        """
+        Parse a prompt template once so it can be rendered without re-parsing.
+
+        Args:
+            name (str): Name of the template
+            text (str): The raw template text in str.format syntax
+            mtime (float): Modification time of the template file
+
+        Raises:
+            ValueError: If the template is not valid str.format syntax
+        """
+        self.name = name
+        self.text = text
+        self.mtime = mtime
+        try:
+            self.parts = list(string.Formatter().parse(text))
+        except ValueError as e:
+            raise ValueError(f"Error parsing prompt template '{name}': {e}")
+
+        self.placeholders = {field for _, field, _, _ in self.parts if field is not None}
+        # Plain {name} fields can be joined directly; anything fancier goes through str.format
+        self._plain = all(
+            field is None or (field.isidentifier() and not spec and conversion is None)
+            for _, field, spec, conversion in self.parts
+        )
+
+    def render(self, replacements: Dict[str, str]) -> str:
+        """
+        Fill the template's placeholders.
+
+        Args:
+            replacements (Dict[str, str]): Values keyed by placeholder name
+
+        Returns:
+            str: The formatted prompt
+
+        Raises:
+            KeyError: If a placeholder has no replacement
+        """
+        if not self._plain:
+            return self.text.format(**replacements)
+
+        pieces = []
+        for literal, field, _, _ in self.parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(str(replacements[field]))
+        return "".join(pieces)
+
+
+class PromptRegistry:
+    def __init__(self, prompts_dir: Path, required_placeholders: Optional[Dict[str, set]] = None,
+                 check_interval: float = MTIME_CHECK_INTERVAL):
+        """
+        Initialize a registry of prompt templates.
+
+        Args:
+            prompts_dir (Path): Directory of .txt templates
+            required_placeholders (Dict[str, set], optional): Placeholders each template must
+                contain, defaults to REQUIRED_PLACEHOLDERS
+            check_interval (float): Seconds between modification time checks of a template
+        """
+        self.prompts_dir = Path(prompts_dir)
+        self.required_placeholders = REQUIRED_PLACEHOLDERS if required_placeholders is None else required_placeholders
+        self.check_interval = check_interval
+        self._templates = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def _path_for(self, template_name: str) -> Path:
+        return self.prompts_dir / f"{template_name}.txt"
+
+    def _load(self, template_name: str) -> PromptTemplate:
+        path = self._path_for(template_name)
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, 'r') as f:
+                text = f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt template '{template_name}' not found")
+
+        template = PromptTemplate(template_name, text, mtime)
+        missing = self.required_placeholders.get(template_name, set()) - template.placeholders
+        if missing:
+            raise ValueError(f"Prompt template '{template_name}' is missing required placeholders: {sorted(missing)}")
+
+        self._templates[template_name] = template
+        self._checked_at[template_name] = time.monotonic()
+        return template
+
+    def load_all(self) -> None:
+        """
+        Load and validate every template in the prompts directory.
+        """
+        with self._lock:
+            for path in sorted(self.prompts_dir.glob("*.txt")):
+                self._load(path.stem)
+
+    def get(self, template_name: str) -> PromptTemplate:
+        """
+        Get a template, reloading it if its file changed since it was loaded.
+
+        Args:
+            template_name (str): Name of the template file (without .txt extension)
+
+        Returns:
+            PromptTemplate: The parsed template
+        """
+        template = self._templates.get(template_name)
+        now = time.monotonic()
+        if template is not None and now - self._checked_at[template_name] < self.check_interval:
+            return template
+
+        with self._lock:
+            template = self._templates.get(template_name)
+            if template is None:
+                return self._load(template_name)
+
+            self._checked_at[template_name] = now
+            try:
+                mtime = os.stat(self._path_for(template_name)).st_mtime
+            except FileNotFoundError:
+                return template
+            if mtime != template.mtime:
+                return self._load(template_name)
+            return template
+
+
 def load_prompt(template_name: str, replacements: Optional[Dict[str, str]] = None) -> str:
     """
     Load a prompt template and format it with the provided replacements.
-    
+
+    Templates are parsed once and cached by the shared registry; a template is
+    only read from disk again when its file's modification time changes.
+
     Args:
         template_name (str): Name of the template file (without .txt extension)
         replacements (Dict[str, str], optional): Dictionary of placeholder replacements where
             keys are the placeholder names and values are their replacements
-    
+
     Returns:
         str: Formatted prompt
-    
+
     Example:
         >>> replacements = {
         ...     "entity_name": "Discord",
@@ -21,20 +192,14 @@ def load_prompt(template_name: str, replacements: Optional[Dict[str, str]] = Non
         ... }
         >>> prompt = load_prompt("search", replacements)
     """
-    prompts_dir = Path(__file__).parent.parent / 'prompts'
-    template_path = prompts_dir / f"{template_name}.txt"
-    
+    template = get_prompt_registry().get(template_name)
+
+    if not replacements:
+        return template.text
+
     try:
-        with open(template_path, 'r') as f:
-            template = f.read()
-            
-        if replacements:
-            return template.format(**replacements)
-        return template
-            
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Prompt template '{template_name}' not found")
+        return template.render(replacements)
     except KeyError as e:
         raise KeyError(f"Missing required placeholder in prompt template: {e}")
     except ValueError as e:
-        raise ValueError(f"Error formatting prompt template: {e}") 
\ No newline at end of file
+        raise ValueError(f"Error formatting prompt template: {e}")
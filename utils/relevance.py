@@ -0,0 +1,278 @@
+"""
+Relevance filtering of scraped markdown.
+
+Pages are split into sections (by heading, then by paragraph, line and
+character for long sections), each section is scored with BM25 against the
+entity name and the data points still missing, and only the best sections
+that fit in a token budget are passed on to the model. Settings come from
+config/relevance_filter.json.
+"""
+
+import json
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+# Rough characters per token for English markdown; avoids encoding every section
+CHARS_PER_TOKEN = 4
+
+# Extra terms for the words that commonly appear in data point names
+QUERY_EXPANSIONS = {
+    "employee": ["staff", "headcount", "team", "people", "workforce"],
+    "office": ["headquarter", "hq", "location", "located", "based", "address"],
+    "location": ["office", "headquarter", "hq", "located", "based", "city"],
+    "product": ["platform", "app", "service", "solution", "offer"],
+    "founded": ["founder", "established", "since", "year"],
+    "revenue": ["sale", "arr", "income", "turnover"],
+    "funding": ["raised", "investor", "series", "valuation"],
+}
+
+relevance_filter = None
+_relevance_filter_lock = threading.Lock()
+
+
+def get_relevance_filter():
+    """
+    Get the shared relevance filter, creating it from config/relevance_filter.json on first use.
+
+    Returns:
+        Optional[RelevanceFilter]: The relevance filter, or None if filtering is disabled
+    """
+    global relevance_filter
+    if relevance_filter is None:
+        with _relevance_filter_lock:
+            if relevance_filter is None:
+                relevance_filter = RelevanceFilter.from_config() or False
+    return relevance_filter or None
+
+
+def set_relevance_filter(section_filter):
+    """
+    Replace the shared relevance filter.
+
+    Args:
+        section_filter (Optional[RelevanceFilter]): The filter to use, or None to disable filtering
+    """
+    global relevance_filter
+    relevance_filter = section_filter if section_filter is not None else False
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lower-case word terms with a crude plural stem.
+
+    Args:
+        text (str): The text to tokenize
+
+    Returns:
+        List[str]: Terms in order of appearance
+    """
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def build_query_terms(entity_name: Optional[str], data_points: List[str]) -> List[str]:
+    """
+    Build the BM25 query from the entity name and the missing data point names.
+
+    Args:
+        entity_name (str, optional): Name of the entity being researched
+        data_points (List[str]): Names of data points still missing, e.g. "num_employees"
+
+    Returns:
+        List[str]: Unique query terms
+    """
+    terms = tokenize(entity_name or "")
+    for data_point in data_points:
+        for term in tokenize(data_point.replace("_", " ")):
+            terms.append(term)
+            terms.extend(QUERY_EXPANSIONS.get(term, []))
+    return list(dict.fromkeys(term for term in terms if term not in ("num", "number", "the", "of")))
+
+
+def split_sections(markdown: str, max_section_tokens: int) -> List[str]:
+    """
+    Split markdown into sections at headings, breaking long sections at blank lines.
+
+    Paragraphs still over the limit, such as long tables or lists with no blank
+    lines, are broken at line ends, and single lines over it at the limit.
+
+    Args:
+        markdown (str): The page markdown
+        max_section_tokens (int): Approximate upper bound on the size of a section
+
+    Returns:
+        List[str]: Sections in page order
+    """
+    sections = []
+    for block in re.split(r"\n(?=#{1,6} )", markdown):
+        if not block.strip():
+            continue
+        if estimate_tokens(block) <= max_section_tokens:
+            sections.append(block.strip())
+            continue
+
+        pieces = []
+        for paragraph in re.split(r"\n\s*\n", block):
+            pieces.extend(_split_oversized(paragraph, max_section_tokens))
+
+        current = ""
+        for piece in pieces:
+            if current and estimate_tokens(current) + estimate_tokens(piece) > max_section_tokens:
+                sections.append(current.strip())
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+        if current.strip():
+            sections.append(current.strip())
+    return sections
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(paragraph) <= max_tokens:
+        return [paragraph]
+
+    max_chars = max(max_tokens * CHARS_PER_TOKEN, 1)
+    pieces = []
+    current = ""
+    for line in paragraph.split("\n"):
+        # A single line over the limit is cut into chunks of the limit
+        chunks = [line[start:start + max_chars] for start in range(0, len(line), max_chars)] or [line]
+        for chunk in chunks:
+            if current and len(current) + 1 + len(chunk) > max_chars:
+                pieces.append(current)
+                current = ""
+            current = f"{current}\n{chunk}" if current else chunk
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def bm25_scores(documents: List[List[str]], query_terms: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Score tokenized documents against query terms with Okapi BM25.
+
+    Args:
+        documents (List[List[str]]): Tokenized documents
+        query_terms (List[str]): Query terms
+        k1 (float): Term frequency saturation
+        b (float): Length normalisation
+
+    Returns:
+        List[float]: One score per document
+    """
+    if not documents:
+        return []
+
+    doc_count = len(documents)
+    avg_length = sum(len(doc) for doc in documents) / doc_count or 1
+    frequencies = [Counter(doc) for doc in documents]
+    document_frequency = {term: sum(1 for freq in frequencies if term in freq) for term in query_terms}
+
+    scores = []
+    for doc, freq in zip(documents, frequencies):
+        score = 0.0
+        for term in query_terms:
+            tf = freq.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (doc_count - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_length))
+        scores.append(score)
+    return scores
+
+
+class RelevanceFilter:
+    def __init__(self, top_k: int, token_budget: int, max_section_tokens: int):
+        """
+        Initialize the relevance filter.
+
+        Args:
+            top_k (int): Maximum number of sections to keep
+            token_budget (int): Approximate maximum number of tokens to keep
+            max_section_tokens (int): Approximate maximum size of a single section
+        """
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.max_section_tokens = max_section_tokens
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a relevance filter from config/relevance_filter.json.
+
+        Returns:
+            Optional[RelevanceFilter]: The configured filter, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'relevance_filter.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in relevance filter configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        return cls(config["top_k"], config["token_budget"], config["max_section_tokens"])
+
+    def filter(self, markdown: str, entity_name: Optional[str], data_points: List[str]) -> str:
+        """
+        Keep only the sections of a page most relevant to the missing data points.
+
+        Pages that already fit in the token budget are returned unchanged.
+
+        Args:
+            markdown (str): The page markdown
+            entity_name (str, optional): Name of the entity being researched
+            data_points (List[str]): Names of data points still missing
+
+        Returns:
+            str: The selected sections in page order, followed by a note on what was dropped
+        """
+        if estimate_tokens(markdown) <= self.token_budget:
+            return markdown
+
+        sections = split_sections(markdown, self.max_section_tokens)
+        query_terms = build_query_terms(entity_name, data_points)
+        scores = bm25_scores([tokenize(section) for section in sections], query_terms)
+
+        ranked = sorted(range(len(sections)), key=lambda index: (-scores[index], index))
+        selected = []
+        used_tokens = 0
+        for index in ranked:
+            if len(selected) >= self.top_k:
+                break
+            section_tokens = estimate_tokens(sections[index])
+            if used_tokens + section_tokens > self.token_budget:
+                continue
+            selected.append(index)
+            used_tokens += section_tokens
+
+        if not selected and sections:
+            # Nothing fits whole: keep the start of the best section rather than an empty page
+            best = ranked[0]
+            sections[best] = sections[best][:self.token_budget * CHARS_PER_TOKEN]
+            selected.append(best)
+            used_tokens = estimate_tokens(sections[best])
+
+        selected.sort()
+        dropped = len(sections) - len(selected)
+        dropped_tokens = estimate_tokens(markdown) - used_tokens
+        note = (
+            f"[Note: showing {len(selected)} of {len(sections)} sections of this page, ranked by relevance to "
+            f"{', '.join(data_points) or 'the entity'}; {dropped} sections (about {dropped_tokens} tokens) were omitted]"
+        )
+        return "\n\n".join(sections[index] for index in selected) + f"\n\n{note}"
@@ -0,0 +1,141 @@
+"""
+Persistent cache of scraped page content.
+
+Pages are keyed by their normalized URL so that spelling variants of the same
+page share an entry, and each domain can have its own time to live. The cache
+is configured from config/scrape_cache.json and shared by every session in the
+process (and, through the SQLite file, by other processes).
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.disk_cache import DiskCache
+from utils.url_utils import normalize_url, get_domain
+
+scrape_cache = None
+_scrape_cache_lock = threading.Lock()
+
+
+def get_scrape_cache():
+    """
+    Get the shared scrape cache, creating it from config/scrape_cache.json on first use.
+
+    Returns:
+        Optional[ScrapeCache]: The scrape cache, or None if caching is disabled
+    """
+    global scrape_cache
+    if scrape_cache is None:
+        with _scrape_cache_lock:
+            if scrape_cache is None:
+                scrape_cache = ScrapeCache.from_config() or False
+    return scrape_cache or None
+
+
+def set_scrape_cache(cache):
+    """
+    Replace the shared scrape cache.
+
+    Args:
+        cache (Optional[ScrapeCache]): The cache to use, or None to disable caching
+    """
+    global scrape_cache
+    scrape_cache = cache if cache is not None else False
+
+
+class ScrapeCache:
+    def __init__(self, path: str, max_bytes: int, default_ttl: float, domain_ttls: Optional[Dict[str, float]] = None):
+        """
+        Initialize the scrape cache.
+
+        Args:
+            path (str): Path of the SQLite file backing the cache
+            max_bytes (int): Upper bound on the total compressed size of cached pages
+            default_ttl (float): Seconds a page stays fresh when its domain has no TTL
+            domain_ttls (Dict[str, float], optional): TTL in seconds per domain; a domain
+                also applies to its subdomains, e.g. "wikipedia.org" covers "en.wikipedia.org"
+        """
+        self.cache = DiskCache(path, max_bytes, default_ttl)
+        self.default_ttl = default_ttl
+        self.domain_ttls = domain_ttls or {}
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a scrape cache from config/scrape_cache.json.
+
+        Returns:
+            Optional[ScrapeCache]: The configured cache, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'scrape_cache.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in scrape cache configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        path = Path(config["path"])
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent / path
+
+        return cls(
+            path=str(path),
+            max_bytes=config["max_bytes"],
+            default_ttl=config["default_ttl_seconds"],
+            domain_ttls=config.get("domain_ttl_seconds", {})
+        )
+
+    def ttl_for(self, url: str) -> float:
+        """
+        Get the TTL that applies to a URL, using the most specific configured domain.
+
+        Args:
+            url (str): The page URL
+
+        Returns:
+            float: TTL in seconds
+        """
+        domain = get_domain(url)
+        while domain:
+            if domain in self.domain_ttls:
+                return self.domain_ttls[domain]
+            _, _, domain = domain.partition(".")
+        return self.default_ttl
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Get the cached markdown for a URL.
+
+        Args:
+            url (str): The page URL, in any spelling
+
+        Returns:
+            Optional[str]: The cached markdown, or None if missing or expired
+        """
+        return self.cache.get(normalize_url(url))
+
+    def set(self, url: str, markdown: str) -> None:
+        """
+        Store the markdown for a URL with its domain's TTL.
+
+        Args:
+            url (str): The page URL
+            markdown (str): The scraped markdown content
+        """
+        self.cache.set(normalize_url(url), markdown, ttl=self.ttl_for(url))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters and size of the cache.
+
+        Returns:
+            Dict[str, int]: Cache statistics
+        """
+        return self.cache.stats()
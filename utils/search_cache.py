@@ -0,0 +1,192 @@
+"""
+Two-level cache for the search tool.
+
+The first level stores raw Firecrawl search results keyed by a normalized form
+of the query, so case, whitespace and filler-word variants of the same query
+share an entry. The second level stores the parsed JSON extraction keyed by a
+hash of the search results together with the entity, the data points still
+missing and the model used. Both levels live in one SQLite file configured
+from config/search_cache.json, so they are shared across processes.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.disk_cache import DiskCache
+
+# Words that do not change what a search query is looking for
+QUERY_STOPWORDS = {
+    "a", "an", "the", "of", "for", "in", "on", "at", "to", "and", "about",
+    "what", "whats", "is", "are", "was", "does", "do", "how", "many", "much",
+    "number"
+}
+
+search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """
+    Get the shared search cache, creating it from config/search_cache.json on first use.
+
+    Returns:
+        Optional[SearchCache]: The search cache, or None if caching is disabled
+    """
+    global search_cache
+    if search_cache is None:
+        with _search_cache_lock:
+            if search_cache is None:
+                search_cache = SearchCache.from_config() or False
+    return search_cache or None
+
+
+def set_search_cache(cache):
+    """
+    Replace the shared search cache.
+
+    Args:
+        cache (Optional[SearchCache]): The cache to use, or None to disable caching
+    """
+    global search_cache
+    search_cache = cache if cache is not None else False
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so trivially different spellings compare equal.
+
+    Args:
+        query (str): The raw search query
+
+    Returns:
+        str: Case-folded query without punctuation, filler words or repeated whitespace;
+            empty if nothing but those is left
+
+    Example:
+        >>> normalize_query("  Discord   Number of Employees? ")
+        'discord employees'
+    """
+    words = re.findall(r"\w+", query.casefold().replace("'", ""))
+    return " ".join(word for word in words if word not in QUERY_STOPWORDS)
+
+
+class SearchCache:
+    def __init__(self, path: str, results_config: Dict, parsed_config: Dict):
+        """
+        Initialize both levels of the search cache.
+
+        Args:
+            path (str): Path of the SQLite file backing the cache
+            results_config (Dict): max_bytes, max_entries, ttl_seconds and eviction for raw results
+            parsed_config (Dict): The same settings for parsed extractions
+        """
+        self.results = DiskCache(
+            path, results_config["max_bytes"], results_config.get("ttl_seconds"),
+            table="search_results", eviction=results_config.get("eviction", "lru"),
+            max_entries=results_config.get("max_entries")
+        )
+        self.parsed = DiskCache(
+            path, parsed_config["max_bytes"], parsed_config.get("ttl_seconds"),
+            table="parsed_results", eviction=parsed_config.get("eviction", "lru"),
+            max_entries=parsed_config.get("max_entries")
+        )
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a search cache from config/search_cache.json.
+
+        Returns:
+            Optional[SearchCache]: The configured cache, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'search_cache.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in search cache configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        path = Path(config["path"])
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent / path
+
+        return cls(str(path), config["results"], config["parsed"])
+
+    def get_results(self, query: str) -> Optional[str]:
+        """
+        Get cached raw search results for a query.
+
+        Args:
+            query (str): The search query, in any spelling
+
+        Returns:
+            Optional[str]: The stringified search results, or None on a miss or for a
+                query with no words to key on
+        """
+        key = normalize_query(query)
+        return self.results.get(key) if key else None
+
+    def set_results(self, query: str, search_results: str) -> None:
+        """
+        Store raw search results for a query.
+
+        Args:
+            query (str): The search query
+            search_results (str): The stringified search results
+        """
+        key = normalize_query(query)
+        # Queries made only of punctuation or filler words would all share one entry
+        if key:
+            self.results.set(key, search_results)
+
+    @staticmethod
+    def parsed_key(search_results: str, entity_name: str, data_points: List[str], model: str) -> str:
+        results_hash = hashlib.sha256(search_results.encode("utf-8")).hexdigest()
+        return json.dumps([results_hash, entity_name, sorted(data_points), model])
+
+    def get_parsed(self, search_results: str, entity_name: str, data_points: List[str], model: str) -> Optional[Dict]:
+        """
+        Get a cached extraction of search results.
+
+        Args:
+            search_results (str): The stringified search results that were parsed
+            entity_name (str): The entity the extraction was for
+            data_points (List[str]): The data points that were still missing
+            model (str): The model that did the extraction
+
+        Returns:
+            Optional[Dict]: The parsed JSON result, or None on a miss
+        """
+        cached = self.parsed.get(self.parsed_key(search_results, entity_name, data_points, model))
+        return json.loads(cached) if cached is not None else None
+
+    def set_parsed(self, search_results: str, entity_name: str, data_points: List[str], model: str, result: Dict) -> None:
+        """
+        Store the extraction of search results.
+
+        Args:
+            search_results (str): The stringified search results that were parsed
+            entity_name (str): The entity the extraction was for
+            data_points (List[str]): The data points that were still missing
+            model (str): The model that did the extraction
+            result (Dict): The parsed JSON result
+        """
+        self.parsed.set(self.parsed_key(search_results, entity_name, data_points, model), json.dumps(result))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get statistics for both cache levels.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Statistics keyed by "results" and "parsed"
+        """
+        return {"results": self.results.stats(), "parsed": self.parsed.stats()}
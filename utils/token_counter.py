@@ -0,0 +1,153 @@
+"""
+Incremental token accounting for conversations.
+
+tiktoken encodings are cached per model, and Conversation keeps the token
+count of every message it holds, computed once when the message is added, so
+the size of the whole conversation is always known without re-encoding it.
+"""
+
+from functools import lru_cache
+from typing import Iterable, List
+
+import tiktoken
+
+FALLBACK_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name: str):
+    """
+    Get the (cached) tiktoken encoding for a model.
+
+    Args:
+        model_name (str): The model name, e.g. "gpt-4-turbo-2024-04-09"
+
+    Returns:
+        tiktoken.Encoding: The encoding used by the model, or cl100k_base if tiktoken
+            does not know the model
+    """
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+
+def count_message_tokens(message, model_name: str) -> int:
+    """
+    Count the tokens of a single message as it appears in the conversation.
+
+    Args:
+        message (dict): The conversation message
+        model_name (str): The model whose encoding is used
+
+    Returns:
+        int: Number of tokens
+    """
+    return len(get_encoding(model_name).encode(str(message), disallowed_special=()))
+
+
+class Conversation(list):
+    """
+    A list of conversation messages with a running token total.
+
+    Behaves like the plain message list passed to the OpenAI client, but every
+    mutation keeps a parallel list of per-message token counts up to date, so
+    token_total is O(1) and each message is encoded exactly once.
+    """
+
+    def __init__(self, messages: Iterable = (), model: str = None, token_counts: List[int] = None):
+        """
+        Args:
+            messages (Iterable): Initial messages
+            model (str): Model whose encoding is used for counting
+            token_counts (List[int], optional): Known counts for the initial messages
+        """
+        super().__init__()
+        self.model = model
+        # RollingSummary of the messages memory_optimise evicted, if any
+        self.rolling_summary = None
+        self._token_counts = []
+        self.token_total = 0
+        if token_counts is not None:
+            super().extend(messages)
+            self._token_counts = list(token_counts)
+            self.token_total = sum(self._token_counts)
+        else:
+            self.extend(messages)
+
+    def _count(self, message) -> int:
+        return count_message_tokens(message, self.model)
+
+    def append(self, message) -> None:
+        tokens = self._count(message)
+        super().append(message)
+        self._token_counts.append(tokens)
+        self.token_total += tokens
+
+    def extend(self, messages: Iterable) -> None:
+        for message in messages:
+            self.append(message)
+
+    def insert(self, index: int, message) -> None:
+        tokens = self._count(message)
+        super().insert(index, message)
+        self._token_counts.insert(index, tokens)
+        self.token_total += tokens
+
+    def pop(self, index: int = -1):
+        message = super().pop(index)
+        self.token_total -= self._token_counts.pop(index)
+        return message
+
+    def remove(self, message) -> None:
+        self.pop(self.index(message))
+
+    def clear(self) -> None:
+        super().clear()
+        self._token_counts.clear()
+        self.token_total = 0
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            value = list(value)
+            counts = [self._count(message) for message in value]
+        else:
+            counts = self._count(value)
+        super().__setitem__(index, value)
+        self._token_counts[index] = counts
+        self.token_total = sum(self._token_counts)
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        del self._token_counts[index]
+        self.token_total = sum(self._token_counts)
+
+    def __iadd__(self, messages):
+        self.extend(messages)
+        return self
+
+    def token_count(self, start: int = 0, end: int = None) -> int:
+        """
+        Sum the token counts of a range of messages.
+
+        Args:
+            start (int): Index of the first message
+            end (int, optional): Index after the last message, defaults to the end
+
+        Returns:
+            int: Number of tokens in messages[start:end]
+        """
+        return sum(self._token_counts[start:end])
+
+    def sub_conversation(self, start: int = 0, end: int = None) -> "Conversation":
+        """
+        Copy a range of messages into a new Conversation, reusing their counts.
+
+        Args:
+            start (int): Index of the first message
+            end (int, optional): Index after the last message, defaults to the end
+
+        Returns:
+            Conversation: The messages in messages[start:end]
+        """
+        return Conversation(self[start:end], model=self.model, token_counts=self._token_counts[start:end])
@@ -0,0 +1,426 @@
+"""
+Structured tracing of agent sessions.
+
+Spans are recorded for each agent session, agent turn, dispatched event, LLM
+call, tool call and memory_optimise run, with latency, token usage, payload
+sizes and cache hits as attributes. Spans nest through a context variable,
+so everything recorded while a session runs shares its trace id; with the
+sync agent loop a turn's tool calls appear under the agent_response event
+span that executes them rather than under the turn span.
+
+Finished spans are written as OTLP/JSON lines (one ExportTraceServiceRequest
+per line, the format read by the OpenTelemetry collector's otlpjsonfile
+receiver) and their durations are added to an in-process latency histogram.
+Tracing is configured from config/tracing.json and disabled by default, in
+which case span() returns a shared no-op span.
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Upper bounds in milliseconds of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, 120000]
+
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+tracer = None
+_tracer_lock = threading.Lock()
+_current_span = ContextVar("current_span", default=None)
+
+
+def get_tracer():
+    """
+    Get the shared tracer, creating it from config/tracing.json on first use.
+
+    Returns:
+        Optional[Tracer]: The tracer, or None if tracing is disabled
+    """
+    global tracer
+    if tracer is None:
+        with _tracer_lock:
+            if tracer is None:
+                tracer = Tracer.from_config() or False
+    return tracer or None
+
+
+def set_tracer(new_tracer):
+    """
+    Replace the shared tracer.
+
+    Args:
+        new_tracer (Optional[Tracer]): The tracer to use, or None to disable tracing
+    """
+    global tracer
+    tracer = new_tracer if new_tracer is not None else False
+
+
+def span(name: str, kind: str = "internal", **attributes):
+    """
+    Start a span with the shared tracer, for use as a context manager.
+
+    Args:
+        name (str): Span name, e.g. "llm.chat_completion"
+        kind (str): One of SPAN_KINDS
+        **attributes: Initial span attributes
+
+    Returns:
+        A context manager yielding the Span, or a no-op span if tracing is disabled
+    """
+    active = get_tracer()
+    if active is None:
+        return NOOP_SPAN
+    return active.span(name, kind, attributes)
+
+
+def traced(name: str, kind: str = "internal"):
+    """
+    Decorate a function so each call is recorded as a span.
+
+    Args:
+        name (str): Span name
+        kind (str): One of SPAN_KINDS
+
+    Returns:
+        Callable: The decorator
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            active = get_tracer()
+            if active is None:
+                return fn(*args, **kwargs)
+            with active.span(name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """
+    Get the innermost open span of this context.
+
+    Returns:
+        Span: The span, or a no-op span if there is none
+    """
+    return _current_span.get() or NOOP_SPAN
+
+
+def record_usage(target_span, response) -> None:
+    """
+    Add the token usage of a chat completion response to a span.
+
+    Args:
+        target_span (Span): The span to annotate
+        response: A chat completion response
+    """
+    usage = getattr(response, "usage", None)
+    if target_span.recording and usage is not None:
+        target_span.set_attribute("llm.prompt_tokens", usage.prompt_tokens)
+        target_span.set_attribute("llm.completion_tokens", usage.completion_tokens)
+
+
+def payload_size(messages) -> int:
+    """
+    Get the number of characters of message content in a request.
+    """
+    return sum(len(message.get("content") or "") if isinstance(message, dict) else 0 for message in messages)
+
+
+class NoopSpan:
+    """Stand-in used when tracing is disabled; every operation does nothing."""
+
+    recording = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    recording = True
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_span_id: Optional[str],
+                 attributes: Optional[Dict] = None):
+        """
+        A timed operation within a trace.
+
+        Args:
+            name (str): Span name
+            kind (str): One of SPAN_KINDS
+            trace_id (str): 32 hex digit trace id
+            parent_span_id (str, optional): Span id of the enclosing span
+            attributes (Dict, optional): Initial attributes
+        """
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes or {})
+        self.status_code = STATUS_OK
+        self.status_message = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._start_perf = time.perf_counter()
+        self.duration = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict) -> None:
+        self.attributes.update(attributes)
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._start_perf
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+
+    def to_otlp(self) -> Dict:
+        """
+        Convert the span to its OTLP/JSON representation.
+        """
+        otlp = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status_code}
+        }
+        if self.parent_span_id:
+            otlp["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            otlp["status"]["message"] = self.status_message
+        return otlp
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms: Optional[List[float]] = None):
+        """
+        Per span name latency histogram with fixed buckets.
+
+        Args:
+            buckets_ms (List[float], optional): Bucket upper bounds in milliseconds
+        """
+        self.buckets_ms = buckets_ms or HISTOGRAM_BUCKETS_MS
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = {"counts": [0] * (len(self.buckets_ms) + 1), "count": 0,
+                                               "sum_ms": 0.0, "max_ms": 0.0}
+            series["counts"][bisect.bisect_left(self.buckets_ms, milliseconds)] += 1
+            series["count"] += 1
+            series["sum_ms"] += milliseconds
+            series["max_ms"] = max(series["max_ms"], milliseconds)
+
+    def _percentile(self, series: Dict, fraction: float) -> float:
+        # Upper bound of the bucket holding the percentile, capped at the observed maximum
+        rank = fraction * series["count"]
+        seen = 0
+        for index, count in enumerate(series["counts"]):
+            seen += count
+            if seen >= rank and count:
+                bound = self.buckets_ms[index] if index < len(self.buckets_ms) else series["max_ms"]
+                return min(bound, series["max_ms"])
+        return series["max_ms"]
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Summarize the recorded latencies.
+
+        Returns:
+            Dict[str, Dict]: Per span name count, mean, p50, p95, p99, max and total in milliseconds
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": series["count"],
+                    "mean_ms": series["sum_ms"] / series["count"],
+                    "p50_ms": self._percentile(series, 0.50),
+                    "p95_ms": self._percentile(series, 0.95),
+                    "p99_ms": self._percentile(series, 0.99),
+                    "max_ms": series["max_ms"],
+                    "total_ms": series["sum_ms"]
+                }
+                for name, series in sorted(self._series.items())
+            }
+
+    def format_summary(self) -> str:
+        """
+        Format the summary as a table, slowest total first.
+        """
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]["total_ms"])
+        lines = [f"{'span':<32} {'count':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'total':>10}"]
+        for name, stats in rows:
+            lines.append(
+                f"{name:<32} {stats['count']:>7} {stats['mean_ms']:>7.1f}ms {stats['p50_ms']:>7.1f}ms "
+                f"{stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms {stats['max_ms']:>7.1f}ms "
+                f"{stats['total_ms'] / 1000:>9.2f}s"
+            )
+        return "\n".join(lines)
+
+
+class JsonlSpanExporter:
+    def __init__(self, path: str, service_name: str = "ai-web-scraper", flush_every: int = 64):
+        """
+        Append finished spans to a file as OTLP/JSON lines.
+
+        Args:
+            path (str): Path of the JSONL file
+            service_name (str): service.name resource attribute
+            flush_every (int): Number of spans buffered before a line is written
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.service_name = service_name
+        self.flush_every = flush_every
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a")
+
+    def export(self, finished_span: Span) -> None:
+        with self._lock:
+            self._buffer.append(finished_span.to_otlp())
+            if len(self._buffer) >= self.flush_every:
+                self._write()
+
+    def _write(self) -> None:
+        if not self._buffer or self._file.closed:
+            return
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "utils.tracing"}, "spans": self._buffer}]
+            }]
+        }
+        self._file.write(json.dumps(request) + "\n")
+        self._file.flush()
+        self._buffer = []
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write()
+
+    def close(self) -> None:
+        with self._lock:
+            self._write()
+            self._file.close()
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[JsonlSpanExporter] = None, histogram: Optional[LatencyHistogram] = None):
+        """
+        Initialize a tracer.
+
+        Args:
+            exporter (JsonlSpanExporter, optional): Where finished spans are written
+            histogram (LatencyHistogram, optional): Latency histogram, a new one by default
+        """
+        self.exporter = exporter
+        self.histogram = histogram or LatencyHistogram()
+        if exporter is not None:
+            atexit.register(exporter.close)
+
+    @classmethod
+    def from_config(cls):
+        """
+        Build a tracer from config/tracing.json.
+
+        Returns:
+            Optional[Tracer]: The configured tracer, or None if disabled or unconfigured
+        """
+        config_path = Path(__file__).parent.parent / 'config' / 'tracing.json'
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in tracing configuration: {e}")
+
+        if not config.get("enabled", False):
+            return None
+
+        exporter = None
+        if config.get("jsonl_path"):
+            exporter = JsonlSpanExporter(config["jsonl_path"], config.get("service_name", "ai-web-scraper"),
+                                         config.get("flush_every", 64))
+        return cls(exporter)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: Optional[Dict] = None):
+        """
+        Record a span around a block; exceptions mark the span as failed and propagate.
+
+        Args:
+            name (str): Span name
+            kind (str): One of SPAN_KINDS
+            attributes (Dict, optional): Initial attributes
+
+        Yields:
+            Span: The open span
+        """
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        new_span = Span(name, kind, trace_id, parent.span_id if parent is not None else None, attributes)
+        token = _current_span.set(new_span)
+        try:
+            yield new_span
+        except BaseException as e:
+            new_span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            new_span.end()
+            self.histogram.record(name, new_span.duration)
+            if self.exporter is not None:
+                self.exporter.export(new_span)
+
+    def flush(self) -> None:
+        if self.exporter is not None:
+            self.exporter.flush()
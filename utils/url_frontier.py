@@ -0,0 +1,384 @@
+"""
+URL frontier for scraping sessions.
+
+Every URL is reduced to its canonical form (see utils.url_utils.normalize_url)
+before membership checks, so spelling variants of a page are only fetched
+once. Each session has a UrlFrontier holding the pages it fetched and a
+priority queue of candidate URLs (e.g. the related URLs found by search).
+Knowledge of what has been fetched is also recorded in a process-wide
+registry, which keeps the most recent registry_max_entries URLs or, for very
+large crawls, a Bloom filter. Prefetching takes its pages from the candidate
+queue and skips those the registry says another session fetched. Per-domain
+concurrency and rate limits are shared by all sessions, and the state of the
+least recently used domains is dropped past domain_max_entries. Settings
+come from config/url_frontier.json.
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils.url_utils import normalize_url, get_domain
+
+DEFAULT_CONFIG = {
+    "use_bloom_filter": False,
+    "bloom_capacity": 1000000,
+    "bloom_error_rate": 0.001,
+    "registry_max_entries": 100000,
+    "domain_max_concurrency": 2,
+    "domain_min_interval_seconds": 0.5,
+    "domain_max_entries": 10000
+}
+
+fetched_registry = None
+domain_politeness = None
+_shared_lock = threading.Lock()
+
+
+def load_frontier_config() -> Dict:
+    """
+    Load config/url_frontier.json over the default settings.
+
+    Returns:
+        Dict: Frontier settings
+    """
+    config_path = Path(__file__).parent.parent / 'config' / 'url_frontier.json'
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(config_path, 'r') as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in URL frontier configuration: {e}")
+    return config
+
+
+def get_fetched_registry():
+    """
+    Get the process-wide registry of fetched URLs, creating it on first use.
+
+    Returns:
+        FetchedRegistry: The shared registry
+    """
+    global fetched_registry
+    if fetched_registry is None:
+        with _shared_lock:
+            if fetched_registry is None:
+                config = load_frontier_config()
+                bloom = BloomFilter(config["bloom_capacity"], config["bloom_error_rate"]) \
+                    if config["use_bloom_filter"] else None
+                fetched_registry = FetchedRegistry(bloom, config["registry_max_entries"])
+    return fetched_registry
+
+
+def get_domain_politeness():
+    """
+    Get the process-wide per-domain politeness limiter, creating it on first use.
+
+    Returns:
+        DomainPoliteness: The shared limiter
+    """
+    global domain_politeness
+    if domain_politeness is None:
+        with _shared_lock:
+            if domain_politeness is None:
+                config = load_frontier_config()
+                domain_politeness = DomainPoliteness(
+                    config["domain_max_concurrency"], config["domain_min_interval_seconds"],
+                    config["domain_max_entries"]
+                )
+    return domain_politeness
+
+
+def set_domain_politeness(politeness):
+    """
+    Replace the process-wide per-domain politeness limiter, e.g. to lift limits for local fakes.
+
+    Args:
+        politeness (DomainPoliteness): The limiter to use
+    """
+    global domain_politeness
+    domain_politeness = politeness
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Initialize a Bloom filter sized for a capacity and false positive rate.
+
+        Args:
+            capacity (int): Expected number of items
+            error_rate (float): Acceptable false positive probability
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:16], "big") | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class FetchedRegistry:
+    def __init__(self, bloom_filter: Optional[BloomFilter] = None, max_entries: Optional[int] = None):
+        """
+        Record of canonical URLs fetched by any session in the process.
+
+        Args:
+            bloom_filter (BloomFilter, optional): Use a Bloom filter instead of exact URLs,
+                trading rare false positives for constant memory
+            max_entries (int, optional): Exact URLs kept before the oldest are forgotten;
+                unbounded if None. Not used with a Bloom filter.
+        """
+        self.bloom_filter = bloom_filter
+        self.max_entries = max_entries
+        self._urls = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, canonical_url: str) -> None:
+        with self._lock:
+            if self.bloom_filter is not None:
+                self.bloom_filter.add(canonical_url)
+                return
+            self._urls[canonical_url] = None
+            self._urls.move_to_end(canonical_url)
+            while self.max_entries is not None and len(self._urls) > self.max_entries:
+                self._urls.popitem(last=False)
+
+    def __contains__(self, canonical_url: str) -> bool:
+        if self.bloom_filter is not None:
+            return canonical_url in self.bloom_filter
+        return canonical_url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+@dataclass
+class _DomainState:
+    semaphore: threading.BoundedSemaphore
+    # Earliest time the next fetch may start
+    next_start: float = 0.0
+    # Fetches waiting for or holding a slot
+    users: int = 0
+
+
+class DomainPoliteness:
+    def __init__(self, max_concurrency: int, min_interval: float, max_domains: Optional[int] = None):
+        """
+        Per-domain concurrency and rate limits.
+
+        Args:
+            max_concurrency (int): Maximum simultaneous fetches per domain
+            min_interval (float): Minimum seconds between the starts of fetches to a domain
+            max_domains (int, optional): Domains whose state is kept before the least recently
+                used are forgotten; unbounded if None. Domains with fetches in progress or
+                still inside their interval are never forgotten.
+        """
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.max_domains = max_domains
+        self._domains = OrderedDict()  # domain -> _DomainState, least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Wait for a fetch slot on the URL's domain and hold it for the duration of the block.
+
+        Args:
+            url (str): The URL about to be fetched
+        """
+        domain = get_domain(url)
+        with self._lock:
+            state = self._domains.get(domain)
+            if state is None:
+                state = self._domains[domain] = _DomainState(threading.BoundedSemaphore(self.max_concurrency))
+            else:
+                self._domains.move_to_end(domain)
+            state.users += 1
+            self._forget_idle_domains()
+
+        try:
+            with state.semaphore:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, state.next_start)
+                    state.next_start = start + self.min_interval
+                if start > now:
+                    time.sleep(start - now)
+                yield
+        finally:
+            with self._lock:
+                state.users -= 1
+
+    def _forget_idle_domains(self) -> None:
+        # Called with the lock held; forgetting a domain that is in use or rate limited would lift its limits
+        if self.max_domains is None or len(self._domains) <= self.max_domains:
+            return
+        excess = len(self._domains) - self.max_domains
+        now = time.monotonic()
+        idle = []
+        for domain, state in self._domains.items():
+            if len(idle) == excess:
+                break
+            if state.users == 0 and state.next_start <= now:
+                idle.append(domain)
+        for domain in idle:
+            del self._domains[domain]
+
+
+class UrlFrontier:
+    def __init__(self, registry: Optional[FetchedRegistry] = None):
+        """
+        Initialize a session's frontier.
+
+        Args:
+            registry (FetchedRegistry, optional): Shared registry of fetched URLs,
+                defaults to the process-wide registry
+        """
+        self.registry = registry or get_fetched_registry()
+        self._fetched = {}  # canonical URL -> URL as first fetched, in fetch order
+        self._candidates = []
+        self._candidate_priority = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def mark_fetched(self, url: str) -> bool:
+        """
+        Record that a URL was fetched in this session.
+
+        Args:
+            url (str): The fetched URL, in any spelling
+
+        Returns:
+            bool: True if the page had not been fetched in this session before
+        """
+        canonical = normalize_url(url)
+        with self._lock:
+            if canonical in self._fetched:
+                return False
+            self._fetched[canonical] = url
+            self._candidate_priority.pop(canonical, None)
+        self.registry.add(canonical)
+        return True
+
+    def is_fetched(self, url: str) -> bool:
+        """
+        Check whether this session already fetched a page.
+
+        Args:
+            url (str): The URL, in any spelling
+
+        Returns:
+            bool: True if any spelling of the URL was fetched in this session
+        """
+        return normalize_url(url) in self._fetched
+
+    def first_fetched_as(self, url: str) -> Optional[str]:
+        """
+        Get the spelling under which this session first fetched a page.
+
+        Args:
+            url (str): The URL, in any spelling
+
+        Returns:
+            Optional[str]: The URL as first fetched, or None if not fetched
+        """
+        return self._fetched.get(normalize_url(url))
+
+    def fetched_anywhere(self, url: str) -> bool:
+        """
+        Check whether any session in the process fetched a page.
+
+        Args:
+            url (str): The URL, in any spelling
+
+        Returns:
+            bool: True if the URL is in the shared registry
+        """
+        return normalize_url(url) in self.registry
+
+    def fetched_urls(self) -> List[str]:
+        """
+        Get the URLs fetched in this session, in fetch order.
+
+        Returns:
+            List[str]: One URL per distinct page
+        """
+        return list(self._fetched.values())
+
+    def add_candidate(self, url: str, priority: float = 0.0) -> None:
+        """
+        Queue a URL that may be worth fetching.
+
+        Args:
+            url (str): The candidate URL
+            priority (float): Higher priorities are returned first by next_candidate()
+        """
+        canonical = normalize_url(url)
+        with self._lock:
+            if canonical in self._fetched or self._candidate_priority.get(canonical, float("-inf")) >= priority:
+                return
+            self._candidate_priority[canonical] = priority
+            heapq.heappush(self._candidates, (-priority, next(self._sequence), canonical, url))
+
+    def add_candidates(self, urls: Iterable[str], priority: float = 0.0) -> None:
+        """
+        Queue ranked URLs, giving earlier URLs a higher priority.
+
+        Args:
+            urls (Iterable[str]): Candidate URLs, best first
+            priority (float): Priority of the first URL
+        """
+        urls = list(urls)
+        for rank, url in enumerate(urls):
+            self.add_candidate(url, priority + (len(urls) - rank) / (len(urls) + 1))
+
+    def next_candidate(self) -> Optional[str]:
+        """
+        Pop the highest priority candidate that has not been fetched yet.
+
+        Returns:
+            Optional[str]: The candidate URL, or None if the queue is empty
+        """
+        with self._lock:
+            while self._candidates:
+                negative_priority, _, canonical, url = heapq.heappop(self._candidates)
+                # Skip fetched URLs and entries superseded by a higher priority
+                if canonical in self._fetched or self._candidate_priority.get(canonical) != -negative_priority:
+                    continue
+                del self._candidate_priority[canonical]
+                return url
+        return None
+
+    def candidate_count(self) -> int:
+        """
+        Get the number of queued candidates.
+
+        Returns:
+            int: Candidates waiting in the queue
+        """
+        return len(self._candidate_priority)
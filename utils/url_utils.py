@@ -0,0 +1,68 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only carry tracking information and never change page content
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "_hsenc", "_hsmi"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that different spellings of the same page compare equal.
+
+    The scheme is folded to https, the host is lower-cased with any "www." prefix
+    and default port removed, fragments and tracking parameters (utm_* and friends)
+    are dropped, the remaining query parameters are sorted and trailing slashes
+    are removed from the path.
+
+    Args:
+        url (str): The URL to normalize
+
+    Returns:
+        str: The canonical form of the URL
+
+    Example:
+        >>> normalize_url("HTTP://www.Example.com:80/about/?utm_source=x&b=2&a=1#team")
+        'https://example.com/about?a=1&b=2'
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/")
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    query.sort()
+
+    if scheme in DEFAULT_PORTS:
+        scheme = "https"
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def get_domain(url: str) -> str:
+    """
+    Get the host of a URL without any "www." prefix or port.
+
+    Args:
+        url (str): The URL to inspect
+
+    Returns:
+        str: The lower-cased domain, e.g. "en.wikipedia.org"
+    """
+    if "://" not in url:
+        url = f"https://{url}"
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host